@@ -0,0 +1,93 @@
+# file: benchmarks/bench_deck.py
+"""
+Microbenchmark for Deck creation, shuffling and drawing.
+
+Compares the current array-backed Deck with the previous list-based
+implementation (reproduced below as LegacyListDeck) on both deck compositions.
+
+Usage:
+    python -m benchmarks.bench_deck [--seconds 1.0]
+"""
+import argparse
+import random
+import time
+
+from logic.constants import CARD_PROTOTYPES
+from logic.deck import Deck
+
+
+def _no_log(msg):
+    pass
+
+
+class LegacyListDeck:
+    """The pre-array Deck: a list of prototypes rebuilt per deck, drawn with pop(0)."""
+
+    def __init__(self, num_players, log_callback, rng=None):
+        self.cards = []
+        self.log_callback = log_callback
+        self.rng = rng if rng is not None else random.Random()
+        composition_key = 'count_classic' if num_players <= 4 else 'count_large'
+        self.log_callback(
+            f"Chồng bài: Sử dụng bộ bài cho {'2-4 người chơi (cơ bản)' if composition_key == 'count_classic' else '5-8 người chơi (lớn)'}.")
+        for card_name, prototype in CARD_PROTOTYPES.items():
+            for _ in range(getattr(prototype, composition_key, 0)):
+                self.cards.append(prototype)
+        self.log_callback(f"Chồng bài: Đã tạo với {len(self.cards)} lá.")
+        self.shuffle()
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+        self.log_callback("Chồng bài: Đã xáo bài.")
+
+    def draw(self):
+        return self.cards.pop(0) if self.cards else None
+
+
+def _measure(fn, seconds):
+    """Runs fn repeatedly for about `seconds` and returns (calls, units, elapsed)."""
+    calls = units = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            units += fn()
+        calls += 100
+    return calls, units, time.perf_counter() - start
+
+
+def bench(deck_cls, num_players, seconds):
+    rng = random.Random(0)
+
+    def create_and_shuffle():
+        deck_cls(num_players, _no_log, rng)
+        return 1
+
+    shuffles, _, t_shuffle = _measure(create_and_shuffle, seconds)
+
+    # Draws are timed on their own: decks are built up front, outside the timed loop.
+    decks = [deck_cls(num_players, _no_log, rng) for _ in range(2000)]
+    draws = 0
+    start = time.perf_counter()
+    for deck in decks:
+        draw = deck.draw
+        while draw() is not None:
+            draws += 1
+    t_draw = time.perf_counter() - start
+    return shuffles / t_shuffle, draws / t_draw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=1.0, help="time budget per measurement")
+    args = parser.parse_args(argv)
+
+    print(f"{'Deck':<15} {'Players':>7} {'Decks/s (new+shuffle)':>22} {'Draws/s':>22}")
+    for num_players in (4, 8):
+        for deck_cls in (LegacyListDeck, Deck):
+            decks_per_s, draws_per_s = bench(deck_cls, num_players, args.seconds)
+            print(f"{deck_cls.__name__:<15} {num_players:>7} {decks_per_s:>22,.0f} {draws_per_s:>22,.0f}")
+
+
+if __name__ == '__main__':
+    main()
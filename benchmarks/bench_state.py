@@ -0,0 +1,128 @@
+# file: benchmarks/bench_state.py
+"""
+Microbenchmark for copying player state, as search code does for every what-if.
+
+Compares deep-copying the previous dict-backed Player (reproduced below as
+LegacyDictPlayer) with the slotted Player's packed snapshot (pack/unpack), and
+reports the memory held by one 8-player table of each. Also times a full
+GameRound.snapshot()/restore() round trip.
+
+Usage:
+    python -m benchmarks.bench_state [--seconds 1.0]
+"""
+import argparse
+import copy
+import random
+import time
+import tracemalloc
+
+from logic.constants import CARDS_BY_ID
+from logic.deck import Deck
+from logic.game_round import GameRound
+from logic.headless import HeadlessGame
+from logic.player import Player
+
+
+class LegacyDictPlayer:
+    """The pre-__slots__ Player: only the state, no behaviour."""
+
+    def __init__(self, id_num, name, is_cpu=False):
+        self.id = id_num
+        self.name = name
+        self.hand = []
+        self.discard_pile = []
+        self.tokens = 0
+        self.is_eliminated = False
+        self.is_protected = False
+        self.is_cpu = is_cpu
+        self.sycophant_target_self = False
+        self.jester_on_player_id = None
+        self.effective_value_end_round = 0
+        self.discard_sum_end_round = 0
+
+
+def _make_table(player_cls, num_players, rng):
+    players = []
+    for i in range(num_players):
+        p = player_cls(i, f"Máy {i}", is_cpu=True)
+        p.hand = [rng.choice(CARDS_BY_ID)]
+        p.discard_pile = [rng.choice(CARDS_BY_ID) for _ in range(3)]
+        p.tokens = rng.randrange(3)
+        players.append(p)
+    return players
+
+
+def _copies_per_second(copy_table, seconds):
+    copies = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            copy_table()
+        copies += 100
+    return copies / (time.perf_counter() - start)
+
+
+def _table_bytes(player_cls, num_players, count=1000):
+    rng = random.Random(0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tables = [_make_table(player_cls, num_players, rng) for _ in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del tables
+    return used / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=1.0, help="time budget per measurement")
+    args = parser.parse_args(argv)
+    num_players = 8
+    rng = random.Random(0)
+
+    legacy = _make_table(LegacyDictPlayer, num_players, rng)
+    slotted = _make_table(Player, num_players, rng)
+    packed = [p.pack() for p in slotted]
+
+    def restore_slotted():
+        for p, snap in zip(slotted, packed):
+            p.unpack(snap)
+
+    rows = [
+        ("LegacyDictPlayer deepcopy", lambda: copy.deepcopy(legacy), LegacyDictPlayer),
+        ("Player.pack", lambda: [p.pack() for p in slotted], Player),
+        ("Player.unpack", restore_slotted, Player),
+        ("Player.clone", lambda: [p.clone() for p in slotted], Player),
+    ]
+    print(f"{num_players}-player table")
+    print(f"{'Operation':<26} {'Tables/s':>12} {'us/table':>10} {'Bytes/table':>12}")
+    for label, fn, cls in rows:
+        per_s = _copies_per_second(fn, args.seconds)
+        print(f"{label:<26} {per_s:>12,.0f} {1e6 / per_s:>10.2f} {_table_bytes(cls, num_players):>12,.0f}")
+    print(f"{'packed snapshot':<26} {'':>12} {'':>10} {_packed_bytes(slotted):>12,.0f}")
+
+    game = HeadlessGame(num_players, seed=0)
+    deck = Deck(num_players, game.log_message, rng=random.Random(0))
+    deck.burn_one_card(num_players)
+    game_round = GameRound(game.players, deck, -1, game.log_message, game.ui_callbacks, scheduler=game.scheduler)
+    game_round.start_round()
+    snap = game_round.snapshot()
+    for label, fn in (("GameRound.snapshot", game_round.snapshot),
+                      ("GameRound.restore", lambda: game_round.restore(snap))):
+        per_s = _copies_per_second(fn, args.seconds)
+        print(f"{label:<26} {per_s:>12,.0f} {1e6 / per_s:>10.2f}")
+
+
+def _packed_bytes(players):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    snaps = [[p.pack() for p in players] for _ in range(1000)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del snaps
+    return used / 1000
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+# file: logic/batch_engine.py
+"""
+Vectorized batch engine: advances many independent classic rounds in lockstep.
+
+The state of K rounds is held in NumPy arrays (hands, deck order, discard sums,
+protection and elimination flags) and every step plays one turn in each round
+that is still running, resolving Guard/Priest/Baron/Handmaid/Prince/King/
+Countess/Princess as masked array operations. CPU decisions follow the same
+policy as GameRound's CPU: obey the Countess rule, never discard the Princess
+voluntarily, otherwise pick a card, target and Guard guess uniformly at random.
+
+Only the classic (2-4 player) deck is supported: it is the one where every
+card value names exactly one card, so card values double as card ids.
+The expansion cards have no batch implementation.
+
+Requires NumPy (`pip install numpy`); nothing else in the game depends on it.
+
+Usage:
+    python -m logic.batch_engine --rounds 100000 --players 4 --seed 0
+    python -m logic.batch_engine --rounds 20000 --players 3 --validate
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from .constants import CARDS_DATA_RAW, COMPOSITIONS
+from .deck import Deck
+
+_CLASSIC = COMPOSITIONS['count_classic']
+
+GUARD, PRIEST, BARON, HANDMAID, PRINCE, KING, COUNTESS, PRINCESS = (
+    CARDS_DATA_RAW[name]['value'] for name in
+    ('Guard', 'Priest', 'Baron', 'Handmaid', 'Prince', 'King', 'Countess', 'Princess'))
+
+_values_in_classic = [CARDS_DATA_RAW[name]['value'] for name in _CLASSIC.card_names]
+if len(set(_values_in_classic)) != len(_values_in_classic):
+    raise ImportError("batch_engine needs every classic card to have a distinct value.")
+
+# The classic deck as card values, e.g. [1, 1, 1, 1, 1, 2, 2, 3, ...].
+CLASSIC_DECK = np.repeat(np.arange(len(_CLASSIC.counts_by_value), dtype=np.int8),
+                         _CLASSIC.counts_by_value)
+GUARD_GUESS_VALUES = np.array(_CLASSIC.guard_guess_values, dtype=np.int8)
+
+
+def _no_log(msg):
+    pass
+
+
+class BatchResult:
+    """Outcome of K rounds: `winners` is a bool array [K, players], `turns` the turns played per round."""
+
+    def __init__(self, winners, turns):
+        self.winners = winners
+        self.turns = turns
+
+    def summary(self):
+        rounds = len(self.turns)
+        return {
+            'rounds': rounds,
+            'mean_round_length': float(self.turns.mean()) if rounds else 0.0,
+            'round_win_rate_by_seat': (self.winners.sum(axis=0) / rounds).tolist() if rounds else [],
+            'drawn_rounds': int((self.winners.sum(axis=1) != 1).sum()),
+        }
+
+
+class BatchEngine:
+    """
+    K classic Love Letter rounds played in lockstep.
+
+    Either pass `seed` to shuffle fresh decks, or pass explicit `decks`
+    ([K, 16] card values in draw order, top first), `burned` ([K]) and
+    `first_players` ([K]) to replay specific deals.
+
+    With `first_choice=True` every CPU choice takes the first option instead of
+    a random one (keep the held card, lowest seat as target, lowest Guard guess),
+    mirroring GameRound driven by FirstChoiceRandom; used for exact validation.
+    """
+
+    def __init__(self, num_rounds, num_players, seed=None, decks=None, burned=None, first_players=None,
+                 first_choice=False):
+        if not 2 <= num_players <= 4:
+            raise ValueError("BatchEngine only supports the classic deck (2-4 players).")
+        self.num_rounds = K = num_rounds
+        self.num_players = P = num_players
+        self.rng = np.random.default_rng(seed)
+        self.first_choice = first_choice
+
+        if decks is None:
+            order = self.rng.random((K, len(CLASSIC_DECK))).argsort(axis=1)
+            shuffled = CLASSIC_DECK[order]
+            burned, decks = shuffled[:, 0], shuffled[:, 1:]
+            first_players = self.rng.integers(0, P, K)
+        self.decks = np.ascontiguousarray(decks, dtype=np.int8)
+        self.burned = np.array(burned, dtype=np.int8)
+        self.deck_size = self.decks.shape[1]
+
+        self.hands = self.decks[:, :P].copy()
+        self.deck_pos = np.full(K, P, dtype=np.int16)
+        self.discard_sum = np.zeros((K, P), dtype=np.int16)
+        self.protected = np.zeros((K, P), dtype=bool)
+        self.eliminated = np.zeros((K, P), dtype=bool)
+        self.current = np.array(first_players, dtype=np.int64)
+        self.active = np.ones(K, dtype=bool)
+        self.winners = np.zeros((K, P), dtype=bool)
+        self.turns = np.zeros(K, dtype=np.int16)
+        self.cards_played = np.zeros(len(_CLASSIC.counts_by_value), dtype=np.int64)  # by card value
+
+    # --- Round end ---
+
+    def _showdown(self, games):
+        """Deck ran out: highest hand wins, ties broken by the sum of discarded values."""
+        alive = ~self.eliminated[games]
+        hand_vals = np.where(alive, self.hands[games], -1)
+        best = hand_vals == hand_vals.max(axis=1, keepdims=True)
+        tie_sums = np.where(best, self.discard_sum[games], -1)
+        self.winners[games] = best & (tie_sums == tie_sums.max(axis=1, keepdims=True))
+        self.active[games] = False
+
+    # --- One turn in every running round ---
+
+    def step(self):
+        """Plays one turn in each active round. Returns False when all rounds are over."""
+        out_of_cards = self.active & (self.deck_pos >= self.deck_size)
+        if out_of_cards.any():
+            self._showdown(np.flatnonzero(out_of_cards))
+
+        g = np.flatnonzero(self.active)
+        n = len(g)
+        if n == 0:
+            return False
+        P, rng, rows = self.num_players, self.rng, np.arange(n)
+        c = self.current[g]
+
+        # Draw.
+        drawn = self.decks[g, self.deck_pos[g]]
+        self.deck_pos[g] += 1
+        self.turns[g] += 1
+        self.protected[g, c] = False
+        held = self.hands[g, c]
+
+        # Choose which card to play.
+        play_drawn = np.zeros(n, dtype=bool) if self.first_choice else rng.random(n) < 0.5
+        play_drawn[held == PRINCESS] = True
+        play_drawn[drawn == PRINCESS] = False
+        royalty_held = (held == KING) | (held == PRINCE)
+        royalty_drawn = (drawn == KING) | (drawn == PRINCE)
+        countess_rule = ((held == COUNTESS) & royalty_drawn) | ((drawn == COUNTESS) & royalty_held)
+        play_drawn[countess_rule] = (drawn == COUNTESS)[countess_rule]
+        played = np.where(play_drawn, drawn, held)
+        kept = np.where(play_drawn, held, drawn)
+        self.hands[g, c] = kept
+        self.discard_sum[g, c] += played
+        self.cards_played += np.bincount(played, minlength=len(self.cards_played))
+
+        # Choose a target uniformly among valid players (the Prince may target its player).
+        is_self = np.zeros((n, P), dtype=bool)
+        is_self[rows, c] = True
+        valid = ~self.eliminated[g] & ~self.protected[g] & ~is_self
+        valid |= is_self & (played == PRINCE)[:, None]
+        scores = np.broadcast_to(P - np.arange(P), (n, P)) if self.first_choice else rng.random((n, P))
+        target = np.where(valid, scores, -1).argmax(axis=1)
+        has_target = valid.any(axis=1)
+        target_card = self.hands[g, target]
+
+        eliminate_target = np.zeros(n, dtype=bool)
+        eliminate_self = played == PRINCESS
+
+        # Guard: guess a value other than 1.
+        guess = GUARD_GUESS_VALUES[0] if self.first_choice else \
+            GUARD_GUESS_VALUES[rng.integers(0, len(GUARD_GUESS_VALUES), n)]
+        eliminate_target |= (played == GUARD) & has_target & (target_card == guess)
+
+        # Baron: lower hand is eliminated.
+        baron = (played == BARON) & has_target
+        eliminate_target |= baron & (target_card < kept)
+        eliminate_self |= baron & (kept < target_card)
+
+        # Handmaid: protected until the player's next turn.
+        handmaid = played == HANDMAID
+        self.protected[g[handmaid], c[handmaid]] = True
+
+        # Prince: target discards (eliminated if it is the Princess) and draws, or takes the burned card.
+        prince = (played == PRINCE) & has_target
+        if prince.any():
+            pg, pt, pcard = g[prince], target[prince], target_card[prince]
+            self.discard_sum[pg, pt] += pcard
+            discards_princess = pcard == PRINCESS
+            eliminate_target[prince] |= discards_princess
+            self.hands[pg, pt] = 0
+            # Everyone else draws a replacement: from the deck, or the burned card once the deck is empty.
+            pg, pt = pg[~discards_princess], pt[~discards_princess]
+            from_deck = self.deck_pos[pg] < self.deck_size
+            new_card = np.where(from_deck, self.decks[pg, np.minimum(self.deck_pos[pg], self.deck_size - 1)],
+                                self.burned[pg])
+            self.burned[pg[~from_deck]] = 0
+            self.deck_pos[pg[from_deck]] += 1
+            self.hands[pg, pt] = new_card
+
+        # King: swap hands.
+        king = (played == KING) & has_target
+        if king.any():
+            kg, kc, kt = g[king], c[king], target[king]
+            self.hands[kg, kc], self.hands[kg, kt] = target_card[king], kept[king]
+
+        self.eliminated[g[eliminate_target], target[eliminate_target]] = True
+        self.eliminated[g[eliminate_self], c[eliminate_self]] = True
+
+        # Last player standing wins; everyone else moves on to the next surviving seat.
+        alive = ~self.eliminated[g]
+        finished = alive.sum(axis=1) <= 1
+        if finished.any():
+            self.winners[g[finished]] = alive[finished]
+            self.active[g[finished]] = False
+
+        seats = (c[:, None] + np.arange(1, P)) % P
+        next_alive = alive[rows[:, None], seats]
+        self.current[g] = seats[rows, next_alive.argmax(axis=1)]
+        return True
+
+    def run(self):
+        while self.step():
+            pass
+        return BatchResult(self.winners, self.turns)
+
+
+# --- Validation against GameRound ---
+
+def deals_from_seeds(round_seeds, num_players):
+    """
+    Reproduces GameRound's deal for each round seed: the shuffled Deck, the burned
+    card and the first player, exactly as HeadlessGame.play_round(seed) would see them.
+    """
+    decks, burned, first_players = [], [], []
+    for seed in round_seeds:
+        deck = Deck(num_players, _no_log, rng=random.Random(seed))
+        deck.burn_one_card(num_players)
+        decks.append([card.value for card in deck.cards])
+        burned.append(deck.burned_card.value)
+        first_players.append(deck.rng.randrange(num_players))
+    return np.array(decks, dtype=np.int8), np.array(burned, dtype=np.int8), np.array(first_players)
+
+
+class FirstChoiceRandom(random.Random):
+    """A random.Random whose choice() always returns the first option; shuffles and randrange are unchanged."""
+
+    def choice(self, seq):
+        return seq[0]
+
+
+def _play_reference_rounds(round_seeds, num_players, round_rng_class):
+    from .cpu_policy import RandomPolicy
+    from .headless import HeadlessGame
+
+    # The batch engine mirrors the random CPU, not the card-counting default.
+    game = HeadlessGame(num_players, tokens_to_win=10 ** 9, round_rng_class=round_rng_class, cpu_policy=RandomPolicy())
+    winners = np.zeros((len(round_seeds), num_players), dtype=bool)
+    turns = np.zeros(len(round_seeds), dtype=np.int16)
+    for i, round_seed in enumerate(round_seeds):
+        result = game.play_round(round_seed)
+        winners[i, [p.id for p in result.winners]] = True
+        turns[i] = result.turns_played
+    return BatchResult(winners, turns)
+
+
+def validate_against_game_round(num_rounds, num_players, seed=0):
+    """
+    Plays the same deals (identical round seeds) through GameRound and BatchEngine.
+
+    First both engines make every CPU choice deterministically (FirstChoiceRandom /
+    first_choice=True); the outcome of every round must then match exactly, and the
+    number of mismatching rounds is returned. Then both run their random policies;
+    those draw from different random streams, so they are compared on outcome
+    distributions. Returns (mismatches, game_round_summary, batch_summary).
+    """
+    seed_rng = random.Random(seed)
+    round_seeds = [seed_rng.getrandbits(64) for _ in range(num_rounds)]
+    decks, burned, first_players = deals_from_seeds(round_seeds, num_players)
+
+    reference = _play_reference_rounds(round_seeds, num_players, FirstChoiceRandom)
+    batch = BatchEngine(num_rounds, num_players, decks=decks, burned=burned, first_players=first_players,
+                        first_choice=True).run()
+    mismatches = int(((reference.winners != batch.winners).any(axis=1) | (reference.turns != batch.turns)).sum())
+
+    reference = _play_reference_rounds(round_seeds, num_players, random.Random).summary()
+    batch = BatchEngine(num_rounds, num_players, seed=seed, decks=decks, burned=burned,
+                        first_players=first_players).run().summary()
+    return mismatches, reference, batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m logic.batch_engine", description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=100000)
+    parser.add_argument('--players', type=int, default=4, help="2-4 (classic deck only)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--validate', action='store_true', help="compare outcomes with GameRound on the same deals")
+    args = parser.parse_args(argv)
+
+    if args.validate:
+        mismatches, reference, batch = validate_against_game_round(args.rounds, args.players, args.seed)
+        print(f"Lựa chọn cố định: {mismatches}/{args.rounds} vòng có kết quả khác GameRound")
+        for key in ('rounds', 'mean_round_length', 'drawn_rounds', 'round_win_rate_by_seat'):
+            print(f"{key:<24} GameRound: {reference[key]}\n{'':<24} Batch:     {batch[key]}")
+        return
+
+    start = time.perf_counter()
+    result = BatchEngine(args.rounds, args.players, seed=args.seed).run()
+    elapsed = time.perf_counter() - start
+    summary = result.summary()
+    print(f"{summary['rounds']} vòng trong {elapsed:.2f}s ({summary['rounds'] / elapsed:,.0f} vòng/giây)")
+    print(f"Độ dài vòng trung bình: {summary['mean_round_length']:.2f} lượt")
+    print("Tỉ lệ thắng theo ghế: " + ", ".join(f"{r:.3f}" for r in summary['round_win_rate_by_seat']))
+
+
+if __name__ == '__main__':
+    main()
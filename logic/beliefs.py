@@ -0,0 +1,107 @@
+# file: logic/beliefs.py
+"""
+Card counting for CPU decisions.
+
+A BeliefTracker lives on each GameRound (`game_round.beliefs`) and is fed the
+public events of the round as they happen. Every update touches a bounded
+amount of state (a per-value counter, one small dict per player), so the
+tracker never has to be rebuilt from the discard piles.
+
+Knowledge is kept per (observer, target): a Priest only informs the player who
+played it, a King swap informs both players, while Guard and Baron results are
+announced to everyone (observer None). From that, `distribution(observer, target)`
+gives the probability of each card value being in the target's hand.
+"""
+
+
+class BeliefTracker:
+    __slots__ = ('remaining', 'known', 'excluded')
+
+    def __init__(self, composition, num_players):
+        # Copies of each card value not yet seen face up (indexed by value).
+        self.remaining = list(composition.counts_by_value)
+        # known[target_id][observer_id or None] -> value the observer knows the target holds.
+        self.known = [{} for _ in range(num_players)]
+        # excluded[target_id] -> bitmask of values everyone knows the target does NOT hold.
+        self.excluded = [0] * num_players
+
+    # --- Public events ---
+
+    def card_played(self, player, card):
+        """`player` played `card` face up. Knowledge of that card is dropped; of the kept card, kept."""
+        value = card.value
+        self.remaining[value] -= 1
+        self.excluded[player.id] = 0  # the hand now includes the freshly drawn card
+        known = self.known[player.id]
+        if value in known.values():
+            self.known[player.id] = {obs: v for obs, v in known.items() if v != value}
+
+    def card_discarded(self, player, card):
+        """`player` was forced to discard `card` (Prince, Assassin) and drew a fresh card."""
+        if card is not None:
+            self.remaining[card.value] -= 1
+        self.known[player.id] = {}
+        self.excluded[player.id] = 0
+
+    def revealed(self, observer, target):
+        """`observer` privately looked at `target`'s hand (Priest)."""
+        if target.hand:
+            self.known[target.id][observer.id] = target.hand[0].value
+
+    def exposed(self, player, card):
+        """Everyone learned that `player` holds `card` (Guard hit, Baron comparison)."""
+        self.known[player.id][None] = card.value
+
+    def guard_missed(self, target, guessed_value):
+        """A Guard guess on `target` failed: everyone now knows `target` does not hold that value."""
+        self.excluded[target.id] |= 1 << guessed_value
+
+    def swapped(self, player, target):
+        """`player` and `target` traded hands (King). Call after the swap."""
+        known = self.known
+        known[player.id], known[target.id] = known[target.id], known[player.id]
+        self.excluded[player.id], self.excluded[target.id] = self.excluded[target.id], self.excluded[player.id]
+        if player.hand:
+            known[player.id][target.id] = player.hand[0].value
+        if target.hand:
+            known[target.id][player.id] = target.hand[0].value
+
+    # --- Queries ---
+
+    def known_value(self, observer, target):
+        """The value `observer` knows `target` holds, or None."""
+        known = self.known[target.id]
+        return known.get(observer.id, known.get(None))
+
+    def value_weights(self, observer, target):
+        """Unseen copies per value `target` might hold, from `observer`'s point of view: {value: weight}."""
+        value = self.known_value(observer, target)
+        if value is not None:
+            return {value: 1}
+        weights = list(self.remaining)
+        for card in observer.hand:
+            weights[card.value] -= 1
+        for other_id, known in enumerate(self.known):
+            if other_id != target.id and other_id != observer.id:
+                other_value = known.get(observer.id, known.get(None))
+                if other_value is not None:
+                    weights[other_value] -= 1
+        mask = self.excluded[target.id]
+        return {v: w for v, w in enumerate(weights) if w > 0 and not (mask >> v) & 1}
+
+    def distribution(self, observer, target):
+        """{value: probability} for `target`'s hand as seen by `observer`. Empty if nothing is consistent."""
+        weights = self.value_weights(observer, target)
+        total = sum(weights.values())
+        return {v: w / total for v, w in weights.items()} if total else {}
+
+    # --- Snapshots ---
+
+    def pack(self):
+        return tuple(self.remaining), tuple(tuple(k.items()) for k in self.known), tuple(self.excluded)
+
+    def unpack(self, packed):
+        remaining, known, excluded = packed
+        self.remaining = list(remaining)
+        self.known = [dict(k) for k in known]
+        self.excluded = list(excluded)
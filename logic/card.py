@@ -1,15 +1,41 @@
 # file: logic/card.py
 class Card:
-    def __init__(self, name, value, description, image_path, vietnamese_name, count_classic, count_large, effect_handler, needs_target):
-        self.name = name
-        self.value = value
-        self.description = description
-        self.image_path = image_path
-        self.vietnamese_name = vietnamese_name
-        self.count_classic = count_classic
-        self.count_large = count_large
-        self.effect = effect_handler
-        self.needs_target = needs_target
+    """
+    An immutable card type. One instance exists per card name (the prototypes in
+    constants.CARD_PROTOTYPES, also indexed by `card_id` in constants.CARDS_BY_ID);
+    decks and hands hold references to these shared instances, never copies.
+    """
+    __slots__ = ('name', 'value', 'description', 'image_path', 'vietnamese_name',
+                 'count_classic', 'count_large', 'effect', 'needs_target', 'card_id')
+
+    def __init__(self, name, value, description, image_path, vietnamese_name, count_classic, count_large, effect_handler, needs_target, card_id=None):
+        _set = object.__setattr__
+        _set(self, 'name', name)
+        _set(self, 'value', value)
+        _set(self, 'description', description)
+        _set(self, 'image_path', image_path)
+        _set(self, 'vietnamese_name', vietnamese_name)
+        _set(self, 'count_classic', count_classic)
+        _set(self, 'count_large', count_large)
+        _set(self, 'effect', effect_handler)
+        _set(self, 'needs_target', needs_target)
+        _set(self, 'card_id', card_id)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"Card is immutable (tried to set '{key}')")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"Card is immutable (tried to delete '{key}')")
+
+    # Cards are interned: copying returns the same instance and pickling refers to the prototype by id.
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (_card_by_id, (self.card_id,))
 
     def __repr__(self):
         return f"Card({self.name}, V:{self.value})"
@@ -21,3 +47,6 @@ class Card:
         }
 
 
+def _card_by_id(card_id):
+    from .constants import CARDS_BY_ID  # deferred: constants imports this module
+    return CARDS_BY_ID[card_id]
@@ -1,341 +1,320 @@
 # file: logic/card_effects.py
 """
 This module contains the effect logic for each card.
-Each function handles the complete effect of a card being played,
-including player interaction, state changes, and UI updates via callbacks.
 
-Each effect function has the signature:
-def effect_function(game_round, acting_player, played_card, **kwargs)
-
-- game_round: The main GameRound instance, providing access to game state and UI callbacks.
+Cards do not have hand-written effect functions. Each entry of
+constants.CARDS_DATA_RAW carries a declarative `effect` spec, and
+`compile_effects` turns every spec into an effect once, at startup
+(constants.initialize_card_prototypes stores it on the Card prototype).
+A spec is a dict with:
+
+    title    -- Vietnamese card name used in log messages
+    target   -- a TARGET_RULES key ('other', 'any', 'pair'), or absent for untargeted cards
+    picks    -- (min, max) number of distinct targets, default (1, 1)
+    confirm  -- untargeted cards that ask a human to confirm before resolving
+    action   -- an ACTIONS key; the remaining keys are that action's parameters:
+                guess:    guesses (DeckComposition field listing the values that may be named),
+                          on_hit ('eliminate' or 'token')
+                compare:  loser ('lower' or 'higher' card value)
+                swap:     reveal (the player then looks at one of the swapped hands)
+                passive:  message
+                reveal, protect, discard_draw, bet_on_winner, force_self_target, unreachable: none
+
+Adding a card is a data change as long as its effect combines existing actions;
+nothing branches on card names while a card resolves.
+
+Each compiled effect has the signature:
+def effect(game_round, acting_player, played_card)
+
+- game_round: The main GameRound instance, providing access to game state.
 - acting_player: The player who played the card.
 - played_card: The card object that was played.
-- **kwargs: For effects that need data from a previous step (e.g., a selected target).
 
-The function should return True if it requires further user input (and has shown a popup),
-or False if the effect is resolved and the game can proceed to the next turn.
+Effects are generators: they yield a request from effect_requests.py whenever they
+need something from the outside world (a target, a guessed value, a confirmation, an
+animation) and receive the answer; GameRound.run_effect drives them, for the Kivy UI
+and the headless engine alike. CPU players are answered by their policy
+(`game_round.policy_for`, see cpu_policy.py), humans by the UI popups; if a human
+cancels, the effect is closed and the card goes back to their hand. The effect is
+complete when the generator returns; the driver then proceeds to the next turn.
+
+Log calls pass a template and its arguments (`game_round.log_message("{0.name} ...", player)`)
+instead of an f-string, so the text is only built when someone displays the log (see game_log.py).
+
+CPU decisions draw randomness from `game_round.rng`, never the global `random`
+module, so that seeded rounds stay reproducible.
 """
-import random
-from .constants import CARD_PROTOTYPES
+from collections import namedtuple
+
+from .effect_requests import ChooseTarget, ChooseGuardValue, Confirm, Animate, AnimateKingSwap
+from .ui_regions import UI_OPPONENTS, UI_HAND
+
+# How a targeted card picks its targets. Protected players are never valid (except oneself).
+#   include_self:     the acting player may be picked
+#   allow_no_hand:    players without a card may be picked
+#   self_when_forced: under the Sycophant the acting player becomes the (first) target;
+#                     cards without it lose their effect instead
+TargetRule = namedtuple('TargetRule', 'include_self allow_no_hand self_when_forced')
+
+TARGET_RULES = {
+    'other': TargetRule(include_self=False, allow_no_hand=False, self_when_forced=False),
+    'any': TargetRule(include_self=True, allow_no_hand=True, self_when_forced=True),
+    'pair': TargetRule(include_self=True, allow_no_hand=False, self_when_forced=True),
+}
+
+# A compiled spec. `target` is a TargetRule or None; `params` holds the action parameters.
+EffectSpec = namedtuple('EffectSpec', 'name title target min_picks max_picks confirm action params')
+
+EFFECT_SPECS = {}  # card name -> EffectSpec, filled by compile_effects()
 
 
 # --- Helper Functions ---
 
-def _prepare_animation_data(acting_player, target_player, card, outcome, details):
+def _prepare_animation_data(acting_player, target_player, card, outcome, details, action):
     """A consistent way to create the data dictionary for the effect animation panel."""
     return {
         'acting_player': acting_player,
         'target_player': target_player,
         'card': card,
+        'action': action,
         'outcome': outcome,
         'details': details
     }
 
 
-def _get_generic_targets(game_round, acting_player, include_self=False, unprotected_only=True, allow_no_hand=False):
-    """A generic target-finding utility used by many card effects."""
-    return game_round.get_valid_targets(
-        acting_player,
-        include_self=include_self,
-        targeted_effect_requires_unprotected=unprotected_only,
-        allow_no_hand=allow_no_hand
-    )
-
-
-# --- Guard Effect ---
-
-def effect_guard(game_round, acting_player, card_played, **kwargs):
-    valid_targets = _get_generic_targets(game_round, acting_player)
-    if acting_player.sycophant_target_self:
-        game_round.log_message(
-            f"Kẻ nịnh bợ: {acting_player.name} phải tự chọn mình, nhưng Cận vệ không thể. Hiệu ứng mất.")
-        return False
-    if not valid_targets:
-        game_round.log_message("Cận vệ: Không có mục tiêu hợp lệ.")
-        return False
-
-    if 'target_player_id' in kwargs:
-        return _resolve_guard_target_selected(game_round, acting_player, card_played, kwargs['target_player_id'])
-
-    if acting_player.is_cpu:
-        target_player = random.choice(valid_targets)
-        possible_values = sorted(list(set(proto.value for name, proto in CARD_PROTOTYPES.items()
-                                          if proto.value != 1 and game_round.is_card_in_current_deck(name))))
+def targets_for(game_round, player, card):
+    """The players `card` could target if `player` played it now (empty for untargeted cards)."""
+    spec = EFFECT_SPECS.get(card.name)
+    rule = spec.target if spec else None
+    if rule is None:
+        return []
+    if player.sycophant_target_self:
+        return [player] if rule.self_when_forced else []
+    return game_round.get_valid_targets(player, include_self=rule.include_self, allow_no_hand=rule.allow_no_hand)
+
+
+def guess_values_for(game_round, card):
+    """The values `card` lets its player name (empty for cards that do not guess)."""
+    spec = EFFECT_SPECS.get(card.name)
+    if spec is None or spec.action != 'guess':
+        return ()
+    return getattr(game_round.composition, spec.params['guesses'])
+
+
+def _choose_targets(game_round, acting_player, card_played, spec, forced_self):
+    """Yields the target requests of `spec`; returns the chosen players, or None if the effect is lost."""
+    rule = spec.target
+    chosen = []
+    if forced_self:
+        if not rule.self_when_forced:
+            game_round.log_message.warning(
+                "Kẻ nịnh bợ: {0.name} phải tự chọn mình, nhưng {1} không thể. Hiệu ứng mất.", acting_player, spec.title)
+            return None
+        chosen.append(acting_player)
+        if spec.max_picks == 1:
+            return chosen
+
+    candidates = game_round.get_valid_targets(acting_player, include_self=rule.include_self,
+                                              allow_no_hand=rule.allow_no_hand)
+    if chosen:
+        candidates = [p for p in candidates if p is not acting_player]
+    if len(chosen) + len(candidates) < spec.min_picks:
+        game_round.log_message.warning("{0}: Không có mục tiêu hợp lệ.", spec.title)
+        return None
+
+    while len(chosen) < spec.max_picks and candidates:
+        target_player = yield ChooseTarget(acting_player, card_played, candidates,
+                                           optional=len(chosen) >= spec.min_picks)
+        if target_player is None:  # the chooser stopped after the required picks
+            break
+        chosen.append(target_player)
+        candidates = [p for p in candidates if p is not target_player]
+    return chosen
+
+
+# --- Guess (Guard, Bishop) ---
+
+def _guess_action(spec):
+    guesses = spec.params['guesses']
+    on_hit = spec.params['on_hit']
+
+    def resolve(game_round, acting_player, card_played, targets):
+        target_player = targets[0]
+        possible_values = getattr(game_round.composition, guesses)
         if not possible_values:
-            game_round.log_message("Cận vệ (Máy): Không có giá trị hợp lệ để đoán!")
-            return False
-        guess_val = random.choice(possible_values)
-        game_round.log_message(
-            f"Máy ({acting_player.name}) chơi Cận vệ lên {target_player.name}, đoán giá trị {guess_val}.")
-        _resolve_guard_guess(game_round, acting_player, target_player, guess_val, game_round.finish_effect_and_proceed)
-        return True
-    else:
-        game_round.ui['request_target_selection_callback'](
-            acting_player, card_played, valid_targets,
-            lambda ap, tid: effect_guard(game_round, ap, card_played, target_player_id=tid),
-            game_round.cancel_played_card_action
-        )
-        return True
-
-
-def _resolve_guard_target_selected(game_round, acting_player, card_played, target_player_id):
-    target_player = next(p for p in game_round.players if p.id == target_player_id)
-    possible_values = sorted(list(set(proto.value for name, proto in CARD_PROTOTYPES.items()
-                                      if proto.value != 1 and game_round.is_card_in_current_deck(name))))
-    if not possible_values:
-        game_round.log_message(f"Cận vệ: Không có giá trị hợp lệ để đoán {target_player.name}! Hiệu ứng mất.")
-        game_round.finish_effect_and_proceed()
-        return True  # Handled
-
-    game_round.ui['request_guard_value_popup_callback'](
-        acting_player, target_player, possible_values,
-        lambda ap, tp, gv: _resolve_guard_guess(game_round, ap, tp, gv, game_round.finish_effect_and_proceed),
-        game_round.cancel_played_card_action
-    )
-    return True  # Handled
+            if acting_player.is_cpu:
+                game_round.log_message.warning("{0} (Máy): Không có giá trị hợp lệ để đoán!", spec.title)
+            else:
+                game_round.log_message.warning("{0}: Không có giá trị hợp lệ để đoán {1.name}! Hiệu ứng mất.",
+                                               spec.title, target_player)
+            return
+
+        guess_val = yield ChooseGuardValue(acting_player, target_player, possible_values)
+        if acting_player.is_cpu:
+            game_round.log_message("Máy ({0.name}) chơi {3} lên {1.name}, đoán giá trị {2}.",
+                                   acting_player, target_player, guess_val, spec.title)
+        yield from _resolve_guess(game_round, acting_player, target_player, guess_val, card_played, spec.title, on_hit)
+    return resolve
 
 
-def _resolve_guard_guess(game_round, acting_player, target_player, guessed_value, continuation):
-    game_round.log_message(f"{acting_player.name} (Cận vệ) đoán giá trị {guessed_value} cho {target_player.name}.")
+def _resolve_guess(game_round, acting_player, target_player, guessed_value, card_played, title, on_hit):
+    game_round.log_message("{0.name} ({3}) đoán giá trị {1} cho {2.name}.", acting_player, guessed_value, target_player, title)
 
-    # --- FIX APPLIED ---
-    # Handle the case where the target has no hand by routing it through the animation panel.
     if not target_player.hand:
-        game_round.log_message(f"Đoán vào {target_player.name}, nhưng họ không có bài.")
-        outcome = 'fail'
+        game_round.log_message("Đoán vào {0.name}, nhưng họ không có bài.", target_player)
         details = {'guessed_value': guessed_value, 'target_card': None, 'reason': f"{target_player.name} không có bài."}
-        animation_data = _prepare_animation_data(acting_player, target_player, CARD_PROTOTYPES['Guard'], outcome,
-                                                 details)
-        game_round.ui['animate_card_effect_callback'](animation_data, continuation)
+        yield Animate(_prepare_animation_data(acting_player, target_player, card_played, 'fail', details, 'guess'))
         return
 
     target_card = target_player.hand[0]
-    is_assassin = game_round.is_card_in_current_deck('Assassin') and target_card.name == 'Assassin'
-    is_correct_guess = target_card.value == guessed_value
-    outcome = 'reversed' if is_assassin else 'success' if is_correct_guess else 'fail'
+    # The Assassin only turns Guard-style (eliminating) guesses back on the guesser.
+    is_assassin = on_hit == 'eliminate' and game_round.is_card_in_current_deck('Assassin') and target_card.name == 'Assassin'
+    if is_assassin:
+        outcome = 'reversed'
+    elif target_card.value != guessed_value:
+        outcome = 'fail'
+    else:
+        outcome = 'success' if on_hit == 'eliminate' else 'token'
     details = {'guessed_value': guessed_value, 'target_card': target_card}
+    yield Animate(_prepare_animation_data(acting_player, target_player, card_played, outcome, details, 'guess'))
+
+    if outcome == 'reversed':
+        game_round.log_message("{0.name} lộ ra Sát thủ! {1.name} bị loại!", target_player, acting_player)
+        yield from game_round.elimination_steps(acting_player)
+        if game_round.ui.get('add_to_global_discard_callback'):
+            game_round.ui['add_to_global_discard_callback'](target_player, target_card)
+        target_player.play_card('Assassin')
+        game_round.beliefs.card_discarded(target_player, target_card)
+        new_card = game_round.draw_from_deck_or_burned()
+        if new_card: target_player.add_card_to_hand(new_card)
+        game_round.log_message("{0.name} bỏ Sát thủ và rút một lá bài mới.", target_player)
+    elif outcome == 'success':
+        game_round.log_message("Đoán đúng! {0.name} có {1.name}. Đã bị loại.", target_player, target_card)
+        game_round.beliefs.exposed(target_player, target_card)
+        yield from game_round.elimination_steps(target_player)
+    elif outcome == 'token':
+        game_round.log_message("Đoán đúng! {0.name} có {1.name}. {2.name} nhận được một tín vật!",
+                               target_player, target_card, acting_player)
+        game_round.award_token(acting_player)
+        # The target may trade the exposed card for a fresh one. A human target is asked; for a CPU it is
+        # always worth it, unless it is the Princess.
+        if target_player.is_cpu:
+            redraw = not (game_round.is_card_in_current_deck('Princess') and target_card.name == 'Princess')
+        else:
+            redraw = yield Confirm(target_player, target_card,
+                                   f"{acting_player.name} đã đoán đúng lá {target_card.name} của bạn. "
+                                   f"Bỏ lá này và rút một lá mới?")
+        if not redraw:
+            if not target_player.is_cpu:
+                game_round.log_message("{0.name} giữ lại lá {1.name}.", target_player, target_card)
+            game_round.beliefs.exposed(target_player, target_card)
+        else:
+            game_round.log_message("{0.name} bỏ lá {1.name} và rút một lá mới.", target_player, target_card)
+            if game_round.ui.get('add_to_global_discard_callback'):
+                game_round.ui['add_to_global_discard_callback'](target_player, target_card)
+            game_round.beliefs.card_discarded(target_player, target_card)
+            target_player.force_discard(game_round, draw_new=True)
+    else:  # Fail
+        game_round.log_message("Đoán sai. {0.name} không có lá bài giá trị {1}.", target_player, guessed_value)
+        game_round.beliefs.guard_missed(target_player, guessed_value)
 
-    def final_logic():
-        if outcome == 'reversed':
-            game_round.log_message(f"{target_player.name} lộ ra Sát thủ! {acting_player.name} bị loại!")
-
-            def assassin_continuation():
-                if game_round.ui.get('add_to_global_discard_callback'):
-                    game_round.ui['add_to_global_discard_callback'](target_player, target_card)
-                target_player.play_card('Assassin')
-                new_card = game_round.draw_from_deck_or_burned()
-                if new_card: target_player.add_card_to_hand(new_card)
-                game_round.log_message(f"{target_player.name} bỏ Sát thủ và rút một lá bài mới.")
-                if continuation: continuation()
-
-            game_round.eliminate_player(acting_player, assassin_continuation)
-        elif outcome == 'success':
-            game_round.log_message(f"Đoán đúng! {target_player.name} có {target_card.name}. Đã bị loại.")
-            game_round.eliminate_player(target_player, continuation)
-        else:  # Fail
-            game_round.log_message(f"Đoán sai. {target_player.name} không có lá bài giá trị {guessed_value}.")
-            if continuation: continuation()
-
-    animation_data = _prepare_animation_data(acting_player, target_player, CARD_PROTOTYPES['Guard'], outcome, details)
-    game_round.ui['animate_card_effect_callback'](animation_data, final_logic)
-
-
-# --- Priest Effect ---
 
-def effect_priest(game_round, acting_player, card_played, **kwargs):
-    valid_targets = _get_generic_targets(game_round, acting_player)
-    if acting_player.sycophant_target_self:
-        game_round.log_message(
-            f"Kẻ nịnh bợ: {acting_player.name} phải tự chọn mình, nhưng Mục sư không thể. Hiệu ứng mất.")
-        return False
-    if not valid_targets:
-        game_round.log_message("Mục sư: Không có mục tiêu hợp lệ.")
-        return False
+# --- Reveal (Priest, Baroness) ---
 
-    if 'target_player_id' in kwargs:
-        target_player = next(p for p in game_round.players if p.id == kwargs['target_player_id'])
-        _resolve_priest_effect(game_round, acting_player, target_player, game_round.finish_effect_and_proceed)
-        return True
-
-    if acting_player.is_cpu:
-        target_player = random.choice(valid_targets)
-        _resolve_priest_effect(game_round, acting_player, target_player, game_round.finish_effect_and_proceed)
-        return True
-    else:
-        game_round.ui['request_target_selection_callback'](
-            acting_player, card_played, valid_targets,
-            lambda ap, tid: effect_priest(game_round, ap, card_played, target_player_id=tid),
-            game_round.cancel_played_card_action
-        )
-        return True
+def _reveal_action(spec):
+    def resolve(game_round, acting_player, card_played, targets):
+        for target_player in targets:
+            yield from _reveal_hand(game_round, acting_player, target_player, card_played, spec.title)
+    return resolve
 
 
-def _resolve_priest_effect(game_round, acting_player, target_player, continuation):
-    # --- FIX APPLIED ---
+def _reveal_hand(game_round, acting_player, target_player, card_played, title):
     if not target_player.hand:
-        game_round.log_message(f"{target_player.name} không có bài để xem (Mục sư).")
-        outcome = 'fail'
+        game_round.log_message.warning("{0.name} không có bài để xem ({1}).", target_player, title)
         details = {'reason': f"{target_player.name} không có bài."}
-        animation_data = _prepare_animation_data(acting_player, target_player, CARD_PROTOTYPES['Priest'], outcome,
-                                                 details)
-        game_round.ui['animate_card_effect_callback'](animation_data, continuation)
+        yield Animate(_prepare_animation_data(acting_player, target_player, card_played, 'fail', details, 'reveal'))
         return
 
     target_card = target_player.hand[0]
     details = {'target_card': target_card}
-
-    def final_logic():
-        log_msg = f"{acting_player.name} nhìn vào tay của {target_player.name}."
-        if not acting_player.is_cpu:
-            log_msg += f" Họ thấy lá {target_card.name}."
-        game_round.log_message(log_msg)
-        if continuation: continuation()
-
-    animation_data = _prepare_animation_data(acting_player, target_player, card=CARD_PROTOTYPES['Priest'],
-                                             outcome='neutral', details=details)
-    game_round.ui['animate_card_effect_callback'](animation_data, final_logic)
-
-
-# --- Baron Effect ---
-
-def effect_baron(game_round, acting_player, card_played, **kwargs):
-    valid_targets = _get_generic_targets(game_round, acting_player)
-    if acting_player.sycophant_target_self:
-        game_round.log_message(
-            f"Kẻ nịnh bợ: {acting_player.name} phải tự chọn mình, nhưng Nam tước không thể. Hiệu ứng mất.")
-        return False
-    if not valid_targets:
-        game_round.log_message("Nam tước: Không có mục tiêu hợp lệ.")
-        return False
-
-    if 'target_player_id' in kwargs:
-        target_player = next(p for p in game_round.players if p.id == kwargs['target_player_id'])
-        _resolve_baron_effect(game_round, acting_player, target_player, game_round.finish_effect_and_proceed)
-        return True
+    yield Animate(_prepare_animation_data(acting_player, target_player, card_played, 'neutral', details, 'reveal'))
 
     if acting_player.is_cpu:
-        target_player = random.choice(valid_targets)
-        _resolve_baron_effect(game_round, acting_player, target_player, game_round.finish_effect_and_proceed)
-        return True
+        game_round.log_message("{0.name} nhìn vào tay của {1.name}.", acting_player, target_player)
     else:
-        game_round.ui['request_target_selection_callback'](
-            acting_player, card_played, valid_targets,
-            lambda ap, tid: effect_baron(game_round, ap, card_played, target_player_id=tid),
-            game_round.cancel_played_card_action
-        )
-        return True
-
-
-def _resolve_baron_effect(game_round, player, target_player, continuation):
-    # --- FIX APPLIED ---
-    if not player.hand or not target_player.hand:
-        game_round.log_message("So bài Nam tước cần cả hai người chơi đều có bài. Hiệu ứng mất.")
-        outcome = 'fail'
-        details = {'reason': "Một trong hai người chơi không có bài."}
-        animation_data = _prepare_animation_data(player, target_player, CARD_PROTOTYPES['Baron'], outcome, details)
-        game_round.ui['animate_card_effect_callback'](animation_data, continuation)
-        return
-
-    player_card = player.hand[0];
-    opponent_card = target_player.hand[0]
-    winner, loser = (player, target_player) if player_card.value > opponent_card.value else \
-        (target_player, player) if opponent_card.value > player_card.value else (None, None)
+        game_round.log_message("{0.name} nhìn vào tay của {1.name}. Họ thấy lá {2.name}.",
+                               acting_player, target_player, target_card)
+    game_round.beliefs.revealed(acting_player, target_player)
+
+
+# --- Compare (Baron, Queen Mother) ---
+
+def _compare_action(spec):
+    higher_loses = spec.params['loser'] == 'higher'
+
+    def resolve(game_round, player, card_played, targets):
+        target_player = targets[0]
+        if not player.hand or not target_player.hand:
+            game_round.log_message.warning("So bài {0} cần cả hai người chơi đều có bài. Hiệu ứng mất.", spec.title)
+            details = {'reason': "Một trong hai người chơi không có bài."}
+            yield Animate(_prepare_animation_data(player, target_player, card_played, 'fail', details, 'compare'))
+            return
+
+        player_card = player.hand[0]
+        opponent_card = target_player.hand[0]
+        if player_card.value == opponent_card.value:
+            winner, loser = None, None
+        elif (player_card.value > opponent_card.value) != higher_loses:
+            winner, loser = player, target_player
+        else:
+            winner, loser = target_player, player
 
-    outcome = 'win' if winner == player else 'loss' if loser == player else 'tie'
-    details = {'player_card': player_card, 'opponent_card': opponent_card}
+        outcome = 'win' if winner == player else 'loss' if loser == player else 'tie'
+        details = {'player_card': player_card, 'opponent_card': opponent_card}
+        yield Animate(_prepare_animation_data(player, target_player, card_played, outcome, details, 'compare'))
 
-    def final_logic():
+        # The comparison is announced with both values, so everyone learns both cards.
+        game_round.beliefs.exposed(player, player_card)
+        game_round.beliefs.exposed(target_player, opponent_card)
         if loser:
-            game_round.log_message(
-                f"So bài Nam tước: {player.name}({player_card.value}) vs {target_player.name}({opponent_card.value}). {loser.name} bị loại.")
-            game_round.eliminate_player(loser, continuation)
+            game_round.log_message("So bài {5}: {0.name}({1.value}) vs {2.name}({3.value}). {4.name} bị loại.",
+                                   player, player_card, target_player, opponent_card, loser, spec.title)
+            yield from game_round.elimination_steps(loser)
         else:
-            game_round.log_message(
-                f"So bài Nam tước: {player.name}({player_card.value}) vs {target_player.name}({opponent_card.value}). Hòa!")
-            if continuation: continuation()
+            game_round.log_message("So bài {4}: {0.name}({1.value}) vs {2.name}({3.value}). Hòa!",
+                                   player, player_card, target_player, opponent_card, spec.title)
+    return resolve
 
-    animation_data = _prepare_animation_data(player, target_player, CARD_PROTOTYPES['Baron'], outcome, details)
-    game_round.ui['animate_card_effect_callback'](animation_data, final_logic)
-
-
-# --- Handmaid Effect ---
-
-def effect_handmaid(game_round, acting_player, card_played, **kwargs):
-    if 'confirmed' in kwargs:
-        _resolve_handmaid_effect(game_round, acting_player, game_round.finish_effect_and_proceed)
-        return True
-
-    if acting_player.is_cpu:
-        _resolve_handmaid_effect(game_round, acting_player, game_round.finish_effect_and_proceed)
-        # --- FIX APPLIED ---
-        # Changed from False to True to wait for the animation.
-        return True
-    else:
-        game_round.ui['request_confirmation_popup_callback'](
-            acting_player, card_played,
-            lambda ap: effect_handmaid(game_round, ap, card_played, confirmed=True),
-            game_round.cancel_played_card_action
-        )
-        return True
 
+# --- Protect (Handmaid) ---
 
-def _resolve_handmaid_effect(game_round, player, continuation):
-    def final_logic():
-        player.is_protected = True
-        game_round.log_message(f"{player.name} chơi Cô hầu và được bảo vệ.")
-        game_round.ui['update_ui_full_callback']()
-        if continuation: continuation()
+def _protect_action(spec):
+    def resolve(game_round, acting_player, card_played, targets):
+        yield Animate(_prepare_animation_data(acting_player, acting_player, card_played, 'neutral', {}, 'protect'))
+        acting_player.is_protected = True
+        game_round.log_message("{0.name} chơi {1} và được bảo vệ.", acting_player, spec.title)
+        game_round.request_ui_update(UI_OPPONENTS | UI_HAND)
+    return resolve
 
-    animation_data = _prepare_animation_data(player, player, CARD_PROTOTYPES['Handmaid'], 'neutral', {})
-    game_round.ui['animate_card_effect_callback'](animation_data, final_logic)
 
+# --- Discard and draw (Prince) ---
 
-# --- Prince Effect ---
-
-def effect_prince(game_round, acting_player, card_played, **kwargs):
-    valid_targets = []
-    if acting_player.sycophant_target_self:
-        if not acting_player.is_eliminated: valid_targets = [acting_player]
-        if not valid_targets:
-            game_round.log_message(
-                f"Hoàng tử (Kẻ nịnh bợ): {acting_player.name} phải tự chọn mình nhưng không hợp lệ. Hiệu ứng mất.")
-            return False
-    else:
-        valid_targets = _get_generic_targets(game_round, acting_player, include_self=True, unprotected_only=True,
-                                             allow_no_hand=True)
-    if not valid_targets:
-        game_round.log_message("Hoàng tử: Không có mục tiêu hợp lệ.")
-        return False
-
-    if 'target_player_id' in kwargs:
-        target_player = next(p for p in game_round.players if p.id == kwargs['target_player_id'])
-        game_round.log_message(f"{acting_player.name} (Hoàng tử) chọn {target_player.name} để bỏ bài và rút.")
-        _resolve_prince_effect(game_round, target_player, game_round.finish_effect_and_proceed)
-        return True
-
-    if acting_player.is_cpu:
-        target_player = random.choice(valid_targets)
-        game_round.log_message(f"Máy ({acting_player.name}) chơi Hoàng tử, chọn {target_player.name}.")
-        _resolve_prince_effect(game_round, target_player, game_round.finish_effect_and_proceed)
-        return True
-    else:
-        game_round.ui['request_target_selection_callback'](
-            acting_player, card_played, valid_targets,
-            lambda ap, tid: effect_prince(game_round, ap, card_played, target_player_id=tid),
-            game_round.cancel_played_card_action
-        )
-        return True
+def _discard_draw_action(spec):
+    def resolve(game_round, acting_player, card_played, targets):
+        target_player = targets[0]
+        if acting_player.is_cpu:
+            game_round.log_message("Máy ({0.name}) chơi {2}, chọn {1.name}.", acting_player, target_player, spec.title)
+        else:
+            game_round.log_message("{0.name} ({2}) chọn {1.name} để bỏ bài và rút.", acting_player, target_player, spec.title)
+        yield from _resolve_discard_draw(game_round, acting_player, target_player, card_played, spec.title)
+    return resolve
 
 
-def _resolve_prince_effect(game_round, target_player, continuation):
-    # --- FIX APPLIED ---
+def _resolve_discard_draw(game_round, acting_player, target_player, card_played, title):
     if not target_player.hand and not game_round.shared_burned_card_ref['card'] and game_round.deck.is_empty():
-        game_round.log_message(f"{target_player.name} không có bài và không có lá nào để rút (Hoàng tử).")
-        outcome = 'fail'
+        game_round.log_message.warning("{0.name} không có bài và không có lá nào để rút ({1}).", target_player, title)
         details = {'reason': f"{target_player.name} không có bài và không có lá nào để rút."}
-        animation_data = _prepare_animation_data(game_round.players[game_round.current_player_idx], target_player,
-                                                 CARD_PROTOTYPES['Prince'], outcome, details)
-        game_round.ui['animate_card_effect_callback'](animation_data, continuation)
+        yield Animate(_prepare_animation_data(acting_player, target_player, card_played, 'fail', details, 'discard_draw'))
         return
 
     discarded_card = target_player.hand[0] if target_player.hand else None
@@ -343,165 +322,177 @@ def _resolve_prince_effect(game_round, target_player, continuation):
         'Princess') and discarded_card.name == 'Princess'
     outcome = 'eliminated' if is_princess else 'neutral'
     details = {'discarded_card': discarded_card}
-
-    def final_logic():
-        if is_princess:
-            game_round.log_message(f"{target_player.name} đã bỏ Công chúa (bị ép bởi Hoàng tử) và bị loại!")
-            if game_round.ui.get('add_to_global_discard_callback'): game_round.ui['add_to_global_discard_callback'](
-                target_player, discarded_card)
-            target_player.force_discard(game_round, draw_new=False)
-            game_round.eliminate_player(target_player, continuation)
-        else:
-            if discarded_card:
-                game_round.log_message(
-                    f"{target_player.name} bị buộc phải bỏ lá {discarded_card.name} và rút một lá mới.")
-                if game_round.ui.get('add_to_global_discard_callback'): game_round.ui['add_to_global_discard_callback'](
-                    target_player, discarded_card)
-                target_player.force_discard(game_round, draw_new=True)
-            else:  # Target had no hand, just draws
-                game_round.log_message(f"{target_player.name} không có bài, rút một lá mới.")
-                new_card = game_round.draw_from_deck_or_burned()
-                if new_card: target_player.add_card_to_hand(new_card)
-
-            if continuation: continuation()
-
-    current_player = game_round.players[game_round.current_player_idx]
-    animation_data = _prepare_animation_data(current_player, target_player, CARD_PROTOTYPES['Prince'], outcome, details)
-    game_round.ui['animate_card_effect_callback'](animation_data, final_logic)
-
-
-# --- King Effect ---
-
-def effect_king(game_round, acting_player, card_played, **kwargs):
-    valid_targets = _get_generic_targets(game_round, acting_player)
-    if acting_player.sycophant_target_self:
+    yield Animate(_prepare_animation_data(acting_player, target_player, card_played, outcome, details, 'discard_draw'))
+
+    if is_princess:
+        game_round.log_message("{0.name} đã bỏ Công chúa (bị ép bởi {1}) và bị loại!", target_player, title)
+        if game_round.ui.get('add_to_global_discard_callback'): game_round.ui['add_to_global_discard_callback'](
+            target_player, discarded_card)
+        game_round.beliefs.card_discarded(target_player, discarded_card)
+        target_player.force_discard(game_round, draw_new=False)
+        yield from game_round.elimination_steps(target_player)
+    elif discarded_card:
         game_round.log_message(
-            f"Kẻ nịnh bợ: {acting_player.name} phải tự chọn mình, nhưng Vua không thể. Hiệu ứng mất.")
-        return False
-    if not valid_targets:
-        game_round.log_message("Vua: Không có mục tiêu hợp lệ.")
-        return False
-
-    if 'target_player_id' in kwargs:
-        target_player = next(p for p in game_round.players if p.id == kwargs['target_player_id'])
-        _resolve_king_effect(game_round, acting_player, target_player, game_round.finish_effect_and_proceed)
-        return True
-
-    if acting_player.is_cpu:
-        target_player = random.choice(valid_targets)
-        _resolve_king_effect(game_round, acting_player, target_player, game_round.finish_effect_and_proceed)
-        return True
-    else:
-        game_round.ui['request_target_selection_callback'](
-            acting_player, card_played, valid_targets,
-            lambda ap, tid: effect_king(game_round, ap, card_played, target_player_id=tid),
-            game_round.cancel_played_card_action
-        )
-        return True
-
-
-def _resolve_king_effect(game_round, player, target_player, continuation):
-    # --- FIX APPLIED ---
-    if not player.hand or not target_player.hand:
-        game_round.log_message("Tráo bài Vua cần cả hai người chơi đều có bài. Hiệu ứng mất.")
-        outcome = 'fail'
-        details = {'reason': 'Một trong hai người chơi không có bài.'}
-        animation_data = _prepare_animation_data(player, target_player, CARD_PROTOTYPES['King'], outcome, details)
-        game_round.ui['animate_card_effect_callback'](animation_data, continuation)
-        return
-
-    p_card, o_card = player.hand[0], target_player.hand[0]
-
-    def perform_swap_animation():
-        def final_logic():
-            player.hand[0], target_player.hand[0] = o_card, p_card  # Actual swap
-            log_details = f"{player.name} (Vua) tráo bài với {target_player.name}. {player.name} nhận {o_card.name}, {target_player.name} nhận {p_card.name}."
-            game_round.log_message(log_details)
-            if continuation: continuation()
-
-        game_round.ui['animate_king_swap_callback'](player, target_player, p_card, o_card, final_logic)
-
-    animation_data = _prepare_animation_data(player, target_player, CARD_PROTOTYPES['King'], 'neutral', {})
-    game_round.ui['animate_card_effect_callback'](animation_data, perform_swap_animation)
+            "{0.name} bị buộc phải bỏ lá {1.name} và rút một lá mới.", target_player, discarded_card)
+        if game_round.ui.get('add_to_global_discard_callback'): game_round.ui['add_to_global_discard_callback'](
+            target_player, discarded_card)
+        game_round.beliefs.card_discarded(target_player, discarded_card)
+        target_player.force_discard(game_round, draw_new=True)
+    else:  # Target had no hand, just draws
+        game_round.log_message("{0.name} không có bài, rút một lá mới.", target_player)
+        game_round.beliefs.card_discarded(target_player, None)
+        new_card = game_round.draw_from_deck_or_burned()
+        if new_card: target_player.add_card_to_hand(new_card)
+
+
+# --- Swap (King, Cardinal) ---
+
+def _swap_action(spec):
+    reveal = spec.params.get('reveal', False)
+
+    def resolve(game_round, acting_player, card_played, targets):
+        # One target: the acting player trades with it (King). Two: those two trade (Cardinal).
+        player, target_player = (acting_player, targets[0]) if len(targets) == 1 else targets
+        if not player.hand or not target_player.hand:
+            game_round.log_message.warning("Tráo bài {0} cần cả hai người chơi đều có bài. Hiệu ứng mất.", spec.title)
+            details = {'reason': 'Một trong hai người chơi không có bài.'}
+            yield Animate(_prepare_animation_data(player, target_player, card_played, 'fail', details, 'swap'))
+            return
+
+        p_card, o_card = player.hand[0], target_player.hand[0]
+        yield Animate(_prepare_animation_data(player, target_player, card_played, 'neutral', {}, 'swap'))
+        yield AnimateKingSwap(player, target_player, p_card, o_card)
+
+        player.hand[0], target_player.hand[0] = o_card, p_card  # Actual swap
+        game_round.beliefs.swapped(player, target_player)
+        if player is acting_player:
+            game_round.log_message(
+                "{0.name} ({4}) tráo bài với {1.name}. {0.name} nhận {2.name}, {1.name} nhận {3.name}.",
+                player, target_player, o_card, p_card, spec.title)
+        else:
+            game_round.log_message("{0.name} ({3}) buộc {1.name} và {2.name} tráo bài cho nhau.",
+                                   acting_player, player, target_player, spec.title)
+
+        if reveal:
+            if acting_player is player or acting_player is target_player:
+                looked_at = target_player if acting_player is player else player
+            else:
+                # The swap is done: the player picks whose hand to see but cannot take the card back.
+                looked_at = yield ChooseTarget(acting_player, card_played, [player, target_player], cancellable=False)
+            yield from _reveal_hand(game_round, acting_player, looked_at, card_played, spec.title)
+    return resolve
+
+
+# --- Bet on the round winner (Jester), force a self-target (Sycophant) ---
+
+def _bet_on_winner_action(spec):
+    def resolve(game_round, acting_player, card_played, targets):
+        target_player = targets[0]
+        yield Animate(_prepare_animation_data(acting_player, target_player, card_played, 'neutral', {}, 'bet_on_winner'))
+        acting_player.jester_on_player_id = target_player.id
+        game_round.log_message("{0.name} ({2}) đặt cược vào {1.name}: nếu {1.name} thắng vòng này, {0.name} cũng nhận một tín vật.",
+                               acting_player, target_player, spec.title)
+    return resolve
+
+
+def _force_self_target_action(spec):
+    def resolve(game_round, acting_player, card_played, targets):
+        target_player = targets[0]
+        yield Animate(_prepare_animation_data(acting_player, target_player, card_played, 'neutral', {}, 'force_self_target'))
+        target_player.sycophant_target_self = True
+        game_round.log_message("{0.name} ({2}) buộc {1.name} phải tự chọn mình cho lá bài hiệu ứng tiếp theo.",
+                               acting_player, target_player, spec.title)
+    return resolve
+
+
+# --- Passive cards ---
+
+def _passive_action(spec):
+    message = spec.params['message']
+
+    def resolve(game_round, acting_player, card_played, targets):
+        game_round.log_message(message)
+        yield from ()
+    return resolve
+
+
+def _unreachable_action(spec):
+    def resolve(game_round, acting_player, card_played, targets):
+        # The Princess is resolved by GameRound._phase_resolve before any effect would run.
+        game_round.log_message.error("LỖI: Hiệu ứng {0} đã được thực thi, đáng lẽ phải bị chặn sớm hơn.", spec.title)
+        yield from ()
+    return resolve
+
+
+# Action name -> factory(spec) returning resolve(game_round, acting_player, card_played, targets), a generator.
+ACTIONS = {
+    'guess': _guess_action,
+    'reveal': _reveal_action,
+    'compare': _compare_action,
+    'protect': _protect_action,
+    'discard_draw': _discard_draw_action,
+    'swap': _swap_action,
+    'bet_on_winner': _bet_on_winner_action,
+    'force_self_target': _force_self_target_action,
+    'passive': _passive_action,
+    'unreachable': _unreachable_action,
+}
+
+_SPEC_KEYS = frozenset(('title', 'target', 'picks', 'confirm', 'action'))
+
+
+# --- Compilation ---
+
+def compile_spec(card_name, raw_spec):
+    """Validates the `effect` dict of a CARDS_DATA_RAW entry and returns its EffectSpec."""
+    action = raw_spec['action']
+    if action not in ACTIONS:
+        raise ValueError(f"Card '{card_name}': unknown effect action '{action}'.")
+    target = raw_spec.get('target')
+    if target is not None and target not in TARGET_RULES:
+        raise ValueError(f"Card '{card_name}': unknown target rule '{target}'.")
+    min_picks, max_picks = raw_spec.get('picks', (1, 1))
+    return EffectSpec(
+        name=card_name,
+        title=raw_spec['title'],
+        target=TARGET_RULES[target] if target is not None else None,
+        min_picks=min_picks,
+        max_picks=max_picks,
+        confirm=raw_spec.get('confirm', False),
+        action=action,
+        params={k: v for k, v in raw_spec.items() if k not in _SPEC_KEYS},
+    )
 
 
-# --- Countess Effect ---
+def compile_effect(spec):
+    """Builds the effect generator function for an EffectSpec."""
+    resolve = ACTIONS[spec.action](spec)
 
-def effect_countess(game_round, acting_player, card_played, **kwargs):
-    if 'confirmed' in kwargs:
-        _resolve_countess_effect(game_round, acting_player)
-        game_round.finish_effect_and_proceed()
-        return True
+    if spec.target is None:
+        confirm = spec.confirm
 
-    if acting_player.is_cpu:
-        _resolve_countess_effect(game_round, acting_player)
-        return False
+        def effect(game_round, acting_player, card_played):
+            acting_player.sycophant_target_self = False  # spent on a card without a target
+            if confirm:
+                yield Confirm(acting_player, card_played)
+            yield from resolve(game_round, acting_player, card_played, ())
     else:
-        game_round.ui['request_confirmation_popup_callback'](
-            acting_player, card_played,
-            lambda ap: effect_countess(game_round, ap, card_played, confirmed=True),
-            game_round.cancel_played_card_action
-        )
-        return True
-
-
-def _resolve_countess_effect(game_round, player):
-    game_round.log_message("Nữ Bá tước được chơi. Không có hiệu ứng đặc biệt.")
-
-
-# --- Princess Effect ---
-
-def effect_princess(game_round, acting_player, card_played, **kwargs):
-    # This effect is passive. The check is in GameRound._handle_card_played_logic.
-    # This function is here for completeness but should not be called.
-    game_round.log_message(f"LỖI: Hiệu ứng Công chúa đã được thực thi, đáng lẽ phải bị chặn sớm hơn.")
-    return False
-
-
-# --- Passive/Placeholder Effects for new cards ---
-# These cards have passive effects or effects not yet implemented.
-# They don't require user input, so they return False.
-
-def effect_assassin(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Sát thủ được chơi. Không có hiệu ứng khi tự chơi.")
-    return False
-
-
-def effect_jester(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Hiệu ứng Tên hề chưa được cài đặt.")
-    return False
-
-
-def effect_cardinal(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Hiệu ứng Hồng y chưa được cài đặt.")
-    return False
-
-
-def effect_baroness(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Hiệu ứng Nữ nam tước chưa được cài đặt.")
-    return False
-
-
-def effect_sycophant(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Hiệu ứng Kẻ nịnh bợ chưa được cài đặt.")
-    return False
-
-
-def effect_count(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Bá tước được chơi. Hiệu ứng của nó là bị động.")
-    return False
-
-
-def effect_sheriff(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Nguyên soái được chơi. Hiệu ứng của nó là bị động.")
-    return False
-
-
-def effect_queen_mother(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Hiệu ứng Nữ hoàng chưa được cài đặt.")
-    return False
-
-
-def effect_bishop(game_round, acting_player, card_played, **kwargs):
-    game_round.log_message("Hiệu ứng Giám mục chưa được cài đặt.")
-    return False
\ No newline at end of file
+        def effect(game_round, acting_player, card_played):
+            forced_self = acting_player.sycophant_target_self
+            acting_player.sycophant_target_self = False
+            targets = yield from _choose_targets(game_round, acting_player, card_played, spec, forced_self)
+            if targets is not None:
+                yield from resolve(game_round, acting_player, card_played, targets)
+
+    effect.__name__ = effect.__qualname__ = f"effect_{spec.name.lower().replace(' ', '_')}"
+    return effect
+
+
+def compile_effects(cards_data):
+    """Compiles the `effect` spec of every card in `cards_data` (CARDS_DATA_RAW). Returns {card name: effect}."""
+    effects = {}
+    for card_name, data in cards_data.items():
+        spec = compile_spec(card_name, data['effect'])
+        EFFECT_SPECS[card_name] = spec
+        effects[card_name] = compile_effect(spec)
+    return effects
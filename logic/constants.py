@@ -1,6 +1,8 @@
 # file: logic/constants.py
 import os
 import sys
+from collections import namedtuple
+from types import MappingProxyType
 from .card import Card
 
 def resource_path(relative_path):
@@ -19,63 +21,146 @@ CARD_FOLDER = resource_path("assets/cards")
 CARD_BACK_IMAGE = resource_path("assets/cards/back.png")
 ELIMINATED_IMAGE = resource_path("assets/cards/back.png")
 
+# Tokens of Affection needed to win the game, by player count.
+TOKENS_TO_WIN_BY_PLAYER_COUNT = {2: 7, 3: 5, 4: 4, 5: 3, 6: 3, 7: 3, 8: 3}
+
+def tokens_to_win_for(num_players):
+    """ Number of tokens a player needs to win a game with `num_players` players. """
+    return TOKENS_TO_WIN_BY_PLAYER_COUNT.get(num_players, 4)
+
+# 'effect' is the declarative effect spec compiled by card_effects.compile_effects (format documented there).
 CARDS_DATA_RAW = {
     # Card Name: { data }
-    'Guard': {'value': 1, 'vietnamese_name': 'canve', 'effect_name': 'effect_guard', 'needs_target': True,
+    'Guard': {'value': 1, 'vietnamese_name': 'canve', 'needs_target': True,
               'description': "Đoán lá bài của người chơi khác (không phải Cận vệ). Nếu đúng, người đó bị loại.",
+              'effect': {'title': 'Cận vệ', 'target': 'other', 'action': 'guess', 'guesses': 'guard_guess_values', 'on_hit': 'eliminate'},
               'count_classic': 5, 'count_large': 8},
-    'Priest': {'value': 2, 'vietnamese_name': 'mucsu', 'effect_name': 'effect_priest', 'needs_target': True,
+    'Priest': {'value': 2, 'vietnamese_name': 'mucsu', 'needs_target': True,
                'description': "Nhìn bài trên tay một người chơi khác.",
+               'effect': {'title': 'Mục sư', 'target': 'other', 'action': 'reveal'},
                'count_classic': 2, 'count_large': 0},
-    'Baron': {'value': 3, 'vietnamese_name': 'namtuoc', 'effect_name': 'effect_baron', 'needs_target': True,
+    'Baron': {'value': 3, 'vietnamese_name': 'namtuoc', 'needs_target': True,
               'description': "So bài; người có bài giá trị thấp hơn sẽ bị loại.",
+              'effect': {'title': 'Nam tước', 'target': 'other', 'action': 'compare', 'loser': 'lower'},
               'count_classic': 2, 'count_large': 0},
-    'Handmaid': {'value': 4, 'vietnamese_name': 'cohau', 'effect_name': 'effect_handmaid', 'needs_target': False,
+    'Handmaid': {'value': 4, 'vietnamese_name': 'cohau', 'needs_target': False,
                  'description': "Miễn nhiễm với hiệu ứng của các lá bài khác cho đến lượt tiếp theo của bạn.",
+                 'effect': {'title': 'Cô hầu', 'confirm': True, 'action': 'protect'},
                  'count_classic': 2, 'count_large': 0},
-    'Prince': {'value': 5, 'vietnamese_name': 'hoangtu', 'effect_name': 'effect_prince', 'needs_target': True,
+    'Prince': {'value': 5, 'vietnamese_name': 'hoangtu', 'needs_target': True,
                'description': "Chọn một người chơi (có thể là bạn) để bỏ bài trên tay và rút một lá mới.",
+               'effect': {'title': 'Hoàng tử', 'target': 'any', 'action': 'discard_draw'},
                'count_classic': 2, 'count_large': 0},
-    'King': {'value': 6, 'vietnamese_name': 'nhavua', 'effect_name': 'effect_king', 'needs_target': True,
+    'King': {'value': 6, 'vietnamese_name': 'nhavua', 'needs_target': True,
              'description': "Tráo đổi bài trên tay với một người chơi khác.",
+             'effect': {'title': 'Vua', 'target': 'other', 'action': 'swap'},
              'count_classic': 1, 'count_large': 0},
-    'Countess': {'value': 7, 'vietnamese_name': 'nubatuoc', 'effect_name': 'effect_countess', 'needs_target': False,
+    'Countess': {'value': 7, 'vietnamese_name': 'nubatuoc', 'needs_target': False,
                  'description': "Phải bỏ lá này nếu trên tay bạn có Vua hoặc Hoàng tử.",
+                 'effect': {'title': 'Nữ Bá tước', 'confirm': True, 'action': 'passive',
+                            'message': "Nữ Bá tước được chơi. Không có hiệu ứng đặc biệt."},
                  'count_classic': 1, 'count_large': 0},
-    'Princess': {'value': 8, 'vietnamese_name': 'congchua', 'effect_name': 'effect_princess', 'needs_target': False,
+    'Princess': {'value': 8, 'vietnamese_name': 'congchua', 'needs_target': False,
                  'description': "Bạn sẽ bị loại nếu bỏ lá bài này.",
+                 'effect': {'title': 'Công chúa', 'action': 'unreachable'},
                  'count_classic': 1, 'count_large': 0},
-    'Assassin': {'value': 0, 'vietnamese_name': 'satthu', 'effect_name': 'effect_assassin', 'needs_target': False,
+    'Assassin': {'value': 0, 'vietnamese_name': 'satthu', 'needs_target': False,
                  'description': "Nếu bị Cận vệ nhắm đến, người chơi Cận vệ sẽ bị loại. Bỏ lá này và rút lá mới.",
+                 'effect': {'title': 'Sát thủ', 'action': 'passive',
+                            'message': "Sát thủ được chơi. Không có hiệu ứng khi tự chơi."},
                  'count_classic': 0, 'count_large': 1},
-    'Jester': {'value': 0, 'vietnamese_name': 'tenhe', 'effect_name': 'effect_jester', 'needs_target': True,
+    'Jester': {'value': 0, 'vietnamese_name': 'tenhe', 'needs_target': True,
                'description': "Chọn một người chơi. Nếu họ thắng vòng này, bạn cũng nhận được một tín vật.",
+               'effect': {'title': 'Tên hề', 'target': 'other', 'action': 'bet_on_winner'},
                'count_classic': 0, 'count_large': 1},
-    'Cardinal': {'value': 2, 'vietnamese_name': 'hongy', 'effect_name': 'effect_cardinal', 'needs_target': True,
+    'Cardinal': {'value': 2, 'vietnamese_name': 'hongy', 'needs_target': True,
                  'description': "Hai người chơi đổi bài cho nhau. Bạn được nhìn một trong hai lá bài đó.",
+                 'effect': {'title': 'Hồng y', 'target': 'pair', 'picks': (2, 2), 'action': 'swap', 'reveal': True},
                  'count_classic': 0, 'count_large': 2},
-    'Baroness': {'value': 3, 'vietnamese_name': 'nunamtuoc', 'effect_name': 'effect_baroness', 'needs_target': True,
+    'Baroness': {'value': 3, 'vietnamese_name': 'nunamtuoc', 'needs_target': True,
                  'description': "Nhìn bài trên tay của 1 hoặc 2 người chơi khác.",
+                 'effect': {'title': 'Nữ nam tước', 'target': 'other', 'picks': (1, 2), 'action': 'reveal'},
                  'count_classic': 0, 'count_large': 2},
-    'Sycophant': {'value': 4, 'vietnamese_name': 'keninhbo', 'effect_name': 'effect_sycophant', 'needs_target': True,
+    'Sycophant': {'value': 4, 'vietnamese_name': 'keninhbo', 'needs_target': True,
                   'description': "Người bị chọn phải tự chọn mình làm mục tiêu cho lá bài hiệu ứng tiếp theo.",
+                  'effect': {'title': 'Kẻ nịnh bợ', 'target': 'other', 'action': 'force_self_target'},
                   'count_classic': 0, 'count_large': 2},
-    'Count': {'value': 5, 'vietnamese_name': 'batuoc', 'effect_name': 'effect_count', 'needs_target': False,
+    'Count': {'value': 5, 'vietnamese_name': 'batuoc', 'needs_target': False,
               'description': "+1 vào giá trị bài trên tay nếu lá này nằm trong chồng bài bỏ của bạn.",
+              'effect': {'title': 'Bá tước', 'action': 'passive',
+                         'message': "Bá tước được chơi. Hiệu ứng của nó là bị động."},
               'count_classic': 0, 'count_large': 2},
-    'Sheriff': {'value': 6, 'vietnamese_name': 'nguyensoai', 'effect_name': 'effect_sheriff', 'needs_target': False,
+    'Sheriff': {'value': 6, 'vietnamese_name': 'nguyensoai', 'needs_target': False,
                 'description': "Nếu bạn bị loại khi có lá này trong chồng bài bỏ, bạn nhận được một tín vật.",
+                'effect': {'title': 'Nguyên soái', 'action': 'passive',
+                           'message': "Nguyên soái được chơi. Hiệu ứng của nó là bị động."},
                 'count_classic': 0, 'count_large': 1},
-    'Queen Mother': {'value': 7, 'vietnamese_name': 'nuhoang', 'effect_name': 'effect_queen_mother', 'needs_target': True,
+    'Queen Mother': {'value': 7, 'vietnamese_name': 'nuhoang', 'needs_target': True,
                      'description': "So bài; người có bài giá trị cao hơn sẽ bị loại.",
+                     'effect': {'title': 'Nữ hoàng', 'target': 'other', 'action': 'compare', 'loser': 'higher'},
                      'count_classic': 0, 'count_large': 1},
-    'Bishop': {'value': 9, 'vietnamese_name': 'giammuc', 'effect_name': 'effect_bishop', 'needs_target': True,
+    'Bishop': {'value': 9, 'vietnamese_name': 'giammuc', 'needs_target': True,
                'description': "Đoán giá trị lá bài (không phải Cận vệ). Nhận một tín vật nếu đúng. Người bị đoán có thể rút lại bài.",
+               'effect': {'title': 'Giám mục', 'target': 'other', 'action': 'guess', 'guesses': 'bishop_guess_values', 'on_hit': 'token'},
                'count_classic': 0, 'count_large': 1},
 }
 
+# --- Deck compositions ---
+
+DeckComposition = namedtuple('DeckComposition', [
+    'key',                  # 'count_classic' or 'count_large'
+    'card_names',           # frozenset of card names present in this deck
+    'card_mask',            # bitmask of present card ids (bit i = CARD_NAMES_BY_ID[i])
+    'guard_guess_values',   # sorted values a Guard may name (present cards, excluding Guard's 1)
+    'bishop_guess_values',  # sorted values a Bishop may name (same rule as the Guard)
+    'counts_by_value',      # tuple: card value -> number of copies in the deck
+    'counts_by_name',       # read-only mapping: card name -> number of copies
+    'total',                # number of cards in the deck
+    'countess_rule_active', # Countess and King/Prince are both in the deck
+])
+
+
+def _build_composition(composition_key):
+    counts_by_name = {name: data.get(composition_key, 0) for name, data in CARDS_DATA_RAW.items()}
+    present = [name for name, count in counts_by_name.items() if count > 0]
+    counts_by_value = [0] * (max(data['value'] for data in CARDS_DATA_RAW.values()) + 1)
+    for name in present:
+        counts_by_value[CARDS_DATA_RAW[name]['value']] += counts_by_name[name]
+    guess_values = tuple(sorted({CARDS_DATA_RAW[name]['value'] for name in present} - {CARDS_DATA_RAW['Guard']['value']}))
+    card_names = frozenset(present)
+    return DeckComposition(
+        key=composition_key,
+        card_names=card_names,
+        card_mask=sum(1 << CARD_IDS[name] for name in present),
+        guard_guess_values=guess_values,
+        bishop_guess_values=guess_values,
+        counts_by_value=tuple(counts_by_value),
+        counts_by_name=MappingProxyType(counts_by_name),
+        total=sum(counts_by_name.values()),
+        countess_rule_active='Countess' in card_names and bool({'King', 'Prince'} & card_names),
+    )
+
+
+def composition_key_for(num_players):
+    """ Which deck a game with `num_players` players uses. """
+    return 'count_classic' if num_players <= 4 else 'count_large'
+
+
+def composition_for(num_players):
+    """ The precomputed DeckComposition for a game with `num_players` players. """
+    return COMPOSITIONS[composition_key_for(num_players)]
+
+
 CARD_PROTOTYPES = {}
 
+# Compact card ids (index into CARDS_DATA_RAW order), used by array-backed structures such as Deck.
+CARD_NAMES_BY_ID = tuple(CARDS_DATA_RAW)
+CARD_IDS = {name: card_id for card_id, name in enumerate(CARD_NAMES_BY_ID)}
+CARDS_BY_ID = []  # card id -> prototype, filled by initialize_card_prototypes()
+
+# Built once per deck type; GameRound and the card effects consult these instead of rescanning prototypes.
+COMPOSITIONS = {key: _build_composition(key) for key in ('count_classic', 'count_large')}
+
 def initialize_card_prototypes():
     """
     Populates the CARD_PROTOTYPES dictionary with Card objects.
@@ -85,6 +170,7 @@ def initialize_card_prototypes():
         return
 
     from . import card_effects # <- Import is moved here, inside the function
+    effects = card_effects.compile_effects(CARDS_DATA_RAW)
 
     for eng_name, data in CARDS_DATA_RAW.items():
         # Construct image path
@@ -94,11 +180,6 @@ def initialize_card_prototypes():
         # Use PNG if it exists, otherwise JPG, otherwise fall back to back image
         actual_path = next((p for p in [path_png, path_jpg] if os.path.exists(p)), CARD_BACK_IMAGE)
 
-        # Get the effect handler function from the card_effects module
-        effect_handler = getattr(card_effects, data['effect_name'], None)
-        if not effect_handler:
-            print(f"Warning: No effect implementation found for '{eng_name}' (expected function '{data['effect_name']}').")
-
         # Create the Card object
         CARD_PROTOTYPES[eng_name] = Card(
             name=eng_name,
@@ -108,9 +189,11 @@ def initialize_card_prototypes():
             vietnamese_name=viet_name,
             count_classic=data.get('count_classic', 0),
             count_large=data.get('count_large', 0),
-            effect_handler=effect_handler,
-            needs_target=data.get('needs_target', False)
+            effect_handler=effects[eng_name],
+            needs_target=data.get('needs_target', False),
+            card_id=CARD_IDS[eng_name]
         )
+    CARDS_BY_ID.extend(CARD_PROTOTYPES[name] for name in CARD_NAMES_BY_ID)
 
 # Automatically initialize prototypes when this module is imported
 initialize_card_prototypes()
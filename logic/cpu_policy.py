@@ -0,0 +1,168 @@
+# file: logic/cpu_policy.py
+"""
+CPU decision policies.
+
+GameRound asks the acting CPU player's policy (Player.cpu_policy, or
+DEFAULT_CPU_POLICY when unset) for every decision: which card to play, which
+player to target and which value to guess with the Guard.
+
+A policy implements:
+    begin_turn(game_round, player, on_ready)   -> called before the CPU plays; must call on_ready() once,
+                                                  possibly later (e.g. after a background search)
+    choose_card(game_round, player, playable_cards)            -> Card
+    choose_target(game_round, player, card, valid_targets)     -> Player
+    choose_guard_guess(game_round, player, target, values)     -> int
+
+Policies must draw randomness from `game_round.rng` so seeded rounds replay exactly.
+"""
+from .constants import CARD_PROTOTYPES
+from .card_effects import EFFECT_SPECS, targets_for, guess_values_for
+from .policy_table import load_policy_table
+
+
+class RandomPolicy:
+    """The original CPU behaviour: uniformly random among the legal choices."""
+
+    def begin_turn(self, game_round, player, on_ready):
+        on_ready()
+
+    def choose_card(self, game_round, player, playable_cards):
+        return game_round.rng.choice(playable_cards)
+
+    def choose_target(self, game_round, player, card, valid_targets):
+        return game_round.rng.choice(valid_targets)
+
+    def choose_guard_guess(self, game_round, player, target, possible_values):
+        return game_round.rng.choice(possible_values)
+
+
+class BeliefPolicy(RandomPolicy):
+    """
+    Card-counting CPU: reads `game_round.beliefs` to guess the most likely value with
+    the Guard, aim Baron/Prince/King where they pay off most, and play the card whose
+    effect plus the card kept in hand has the highest expected value. Cards are scored by
+    their effect action (card_effects.EFFECT_SPECS), so expansion cards that reuse an action
+    (Bishop, Queen Mother, Cardinal, Baroness) are scored too. Ties are broken with
+    `game_round.rng` so no seat is singled out.
+    """
+    PRIEST_VALUE = 0.1      # information is worth a little while the target is still unknown
+    HANDMAID_VALUE = 0.15   # a round of protection
+    KEEP_WEIGHT = 0.02      # per point of the card left in hand (showdown strength)
+
+    def choose_card(self, game_round, player, playable_cards):
+        if len({c.name for c in playable_cards}) == 1:
+            return playable_cards[0]
+        rng = game_round.rng
+        return max(playable_cards, key=lambda c: (self._card_value(game_round, player, c), rng.random()))
+
+    def choose_target(self, game_round, player, card, valid_targets):
+        scored = self._score_targets(game_round, player, card, valid_targets, self._kept_card(player, card))
+        if not scored:
+            return super().choose_target(game_round, player, card, valid_targets)
+        rng = game_round.rng
+        return max(scored, key=lambda item: (item[1], rng.random()))[0]
+
+    def choose_guard_guess(self, game_round, player, target, possible_values):
+        dist = game_round.beliefs.distribution(player, target)
+        if not dist:
+            return super().choose_guard_guess(game_round, player, target, possible_values)
+        rng = game_round.rng
+        return max(possible_values, key=lambda v: (dist.get(v, 0.0), rng.random()))
+
+    # --- Scoring ---
+
+    @staticmethod
+    def _kept_card(player, card):
+        for c in player.hand:
+            if c is not card:
+                return c
+        return card  # holding two copies
+
+    def _card_value(self, game_round, player, card):
+        kept = self._kept_card(player, card)
+        if EFFECT_SPECS[card.name].action == 'protect':
+            effect = self.HANDMAID_VALUE
+        else:
+            scored = self._score_targets(game_round, player, card, targets_for(game_round, player, card), kept)
+            effect = max((score for _, score in scored), default=0.0)
+        return effect + self.KEEP_WEIGHT * kept.value
+
+    def _score_targets(self, game_round, player, card, targets, kept):
+        """[(target, expected value)] for playing `card` against each of `targets`."""
+        beliefs = game_round.beliefs
+        spec = EFFECT_SPECS[card.name]
+        action = spec.action
+        scored = []
+        self_index = None
+        for target in targets:
+            if target is player:
+                self_index = len(scored)  # scored once the other targets are
+                continue
+            dist = beliefs.distribution(player, target)
+            if not dist:
+                continue
+            if action == 'guess':
+                score = max((dist.get(v, 0.0) for v in guess_values_for(game_round, card)), default=0.0)
+            elif action == 'compare':
+                wins = sum(p for v, p in dist.items() if v < kept.value)
+                losses = sum(p for v, p in dist.items() if v > kept.value)
+                score = losses - wins if spec.params['loser'] == 'higher' else wins - losses
+            elif action == 'discard_draw':
+                score = dist.get(CARD_PROTOTYPES['Princess'].value, 0.0)
+            elif action == 'swap':
+                score = 0.5 * (sum(v * p for v, p in dist.items()) - kept.value) / 8
+            elif action == 'reveal':
+                score = 0.0 if beliefs.known_value(player, target) is not None else self.PRIEST_VALUE
+            else:
+                score = 0.0
+            scored.append((target, score))
+        if self_index is not None:
+            scored.insert(self_index, (player, self._self_target_score(action, kept, scored)))
+        return scored
+
+    def _self_target_score(self, action, kept, scored_others):
+        if action == 'discard_draw':
+            # Prince on oneself: trade the kept card for a random one.
+            return -self.KEEP_WEIGHT * kept.value
+        if action == 'swap':
+            # A swap pair including oneself (Cardinal): take the other player's card, at best the best swap.
+            return max((score for _, score in scored_others), default=0.0)
+        return 0.0
+
+
+class TablePolicy(BeliefPolicy):
+    """
+    Plays from the precomputed policy table (logic/policy_table.py): the card to play and
+    the Guard guess are one lookup each. Targets, Guard guesses at a known hand, and
+    situations the table has no data for are left to BeliefPolicy, as is everything
+    when no table file was built.
+    """
+
+    def __init__(self, table=None):
+        self.table = table if table is not None else load_policy_table()
+
+    def choose_card(self, game_round, player, playable_cards):
+        if self.table is not None and len(playable_cards) == 2 and playable_cards[0].name != playable_cards[1].name:
+            card = self.table.card_to_play(game_round, playable_cards)
+            if card is not None:
+                return card
+        return super().choose_card(game_round, player, playable_cards)
+
+    def choose_guard_guess(self, game_round, player, target, possible_values):
+        beliefs = game_round.beliefs
+        if (self.table is not None and player.hand and game_round.play_history[-1] == (player.id, 'Guard')
+                and beliefs.known_value(player, target) is None):
+            guess = self.table.guard_guess(game_round, player.hand[0])
+            if guess in possible_values and not (beliefs.excluded[target.id] >> guess) & 1:
+                return guess
+        return super().choose_guard_guess(game_round, player, target, possible_values)
+
+
+DEFAULT_CPU_POLICY = BeliefPolicy()
+
+# Policies selectable by name (e.g. `python -m logic.simulate --policy random`).
+CPU_POLICIES = {
+    'random': RandomPolicy,
+    'belief': BeliefPolicy,
+    'table': TablePolicy,
+}
@@ -1,60 +1,94 @@
 # file: logic/deck.py
 import random
-from .constants import CARD_PROTOTYPES
+from array import array
+from .constants import CARD_PROTOTYPES, CARD_IDS, CARDS_BY_ID, composition_key_for
+from .game_log import GameLog
+
+
+def _build_template(composition_key):
+    """Card ids for one deck composition, built once and copied for every new deck."""
+    template = array('B')
+    for card_name, prototype in CARD_PROTOTYPES.items():
+        template.extend([CARD_IDS[card_name]] * getattr(prototype, composition_key, 0))
+    return template
+
+
+DECK_TEMPLATES = {key: _build_template(key) for key in ('count_classic', 'count_large')}
+
 
 class Deck:
-    def __init__(self, num_players, log_callback):
-        self.cards = []
+    """
+    The draw pile, stored as a compact array of card ids.
+
+    The top of the deck is the END of the array, so drawing is an O(1) pop.
+    `cards` exposes the pile as Card objects in draw order (top first) for
+    code that needs to inspect or set it (e.g. the tutorial).
+    """
+    def __init__(self, num_players, log_callback, rng=None):
+        self._card_ids = array('B')
         self.burned_card = None
-        self.log_callback = log_callback
+        self.log_callback = GameLog.wrap(log_callback)
+        # Each deck owns its RNG so seeded rounds replay exactly and parallel simulations never share state.
+        self.rng = rng if rng is not None else random.Random()
         self._create_deck(num_players)
         self.shuffle()
 
+    @property
+    def cards(self):
+        return [CARDS_BY_ID[card_id] for card_id in reversed(self._card_ids)]
+
+    @cards.setter
+    def cards(self, cards_in_draw_order):
+        self._card_ids = array('B', [card.card_id for card in reversed(cards_in_draw_order)])
+
     def _create_deck(self, num_players):
-        self.cards = []
-        composition_key = 'count_classic' if num_players <= 4 else 'count_large'
-        self.log_callback(
-            f"Chồng bài: Sử dụng bộ bài cho {'2-4 người chơi (cơ bản)' if composition_key == 'count_classic' else '5-8 người chơi (lớn)'}.")
-
-        for card_name, prototype in CARD_PROTOTYPES.items():
-            count = getattr(prototype, composition_key, 0)
-            for _ in range(count):
-                self.cards.append(prototype)
-
-        if not self.cards:
-            self.log_callback(
+        composition_key = composition_key_for(num_players)
+        self.log_callback.debug(
+            "Chồng bài: Sử dụng bộ bài cho {0}.",
+            '2-4 người chơi (cơ bản)' if composition_key == 'count_classic' else '5-8 người chơi (lớn)')
+
+        self._card_ids = array('B', DECK_TEMPLATES[composition_key])
+
+        if not self._card_ids:
+            self.log_callback.error(
                 "LỖI: Không có lá bài nào được định nghĩa cho số người chơi này! Kiểm tra số lượng trong CARD_PROTOTYPES.")
-            if composition_key == 'count_large' and any(
-                    proto.count_classic > 0 for proto in CARD_PROTOTYPES.values()):
-                self.log_callback("Chồng bài: Quay lại dùng bộ cơ bản vì bộ lớn chưa được định nghĩa.")
-                composition_key = 'count_classic'
-                for card_name, prototype in CARD_PROTOTYPES.items():
-                    count = getattr(prototype, composition_key, 0)
-                    for _ in range(count): self.cards.append(prototype)
+            if composition_key == 'count_large' and DECK_TEMPLATES['count_classic']:
+                self.log_callback.warning("Chồng bài: Quay lại dùng bộ cơ bản vì bộ lớn chưa được định nghĩa.")
+                self._card_ids = array('B', DECK_TEMPLATES['count_classic'])
 
-        self.log_callback(f"Chồng bài: Đã tạo với {len(self.cards)} lá.")
+        self.log_callback.debug("Chồng bài: Đã tạo với {0} lá.", len(self._card_ids))
 
     def shuffle(self):
-        random.shuffle(self.cards)
-        self.log_callback("Chồng bài: Đã xáo bài.")
+        self.rng.shuffle(self._card_ids)
+        self.log_callback.debug("Chồng bài: Đã xáo bài.")
 
     def draw(self):
-        return self.cards.pop(0) if self.cards else None
+        try:
+            return CARDS_BY_ID[self._card_ids.pop()]
+        except IndexError:  # empty deck
+            return None
 
     def burn_one_card(self, num_players):
-        if num_players > 1 and self.cards:
+        if num_players > 1 and self._card_ids:
             self.burned_card = self.draw()
             if self.burned_card:
                 log_prefix = "Chồng bài (2P):" if num_players == 2 else "Chồng bài:"
-                self.log_callback(
-                    f"{log_prefix} Đã đốt một lá ({self.burned_card.name}). Còn lại {len(self.cards)} lá.")
+                self.log_callback.debug(
+                    "{0} Đã đốt một lá ({1.name}). Còn lại {2} lá.", log_prefix, self.burned_card, len(self._card_ids))
             else:
-                self.log_callback("Chồng bài: Thử đốt bài nhưng chồng bài đã hết.")
+                self.log_callback.warning("Chồng bài: Thử đốt bài nhưng chồng bài đã hết.")
 
 
+    def snapshot(self):
+        """The remaining pile as immutable bytes of card ids (top of the deck last)."""
+        return bytes(self._card_ids)
+
+    def restore(self, card_ids):
+        """Restores a pile captured by `snapshot`; the bytes are copied, never shared."""
+        self._card_ids = array('B', card_ids)
+
     def is_empty(self):
-        return not self.cards
+        return not self._card_ids
 
     def count(self):
-        return len(self.cards)
-
+        return len(self._card_ids)
@@ -0,0 +1,30 @@
+# file: logic/effect_requests.py
+"""
+Requests a card effect yields to its driver (GameRound.run_effect).
+
+Card effects are generators: they yield one of these and are resumed with the
+answer. CPU choices are answered by the player's policy, human choices by the
+UI popups, and animations by the UI animation callbacks. An animation whose
+callback is missing from the UI dict completes instantly, which is how the
+headless driver runs effects without allocating any continuation.
+"""
+from collections import namedtuple
+
+# -> the chosen Player. A human may cancel, which takes the card back (the effect is closed), unless
+# `cancellable` is False: choices asked after the effect has changed the table cannot be taken back.
+# `optional` picks (beyond the card's minimum, e.g. the Baroness's second player) may be declined
+# by a human, answering None; CPU policies always take them.
+ChooseTarget = namedtuple('ChooseTarget', 'player card valid_targets cancellable optional', defaults=(True, False))
+# -> the guessed card value (Guard). Cancellable like ChooseTarget.
+ChooseGuardValue = namedtuple('ChooseGuardValue', 'player target possible_values')
+# -> True once a human confirms playing an untargeted card; CPUs confirm immediately. Cancellable.
+# With a `question`, `player` is asked a yes/no choice about `card` instead (e.g. the Bishop's target
+# may redraw): the answer is True or False and cannot take the played card back. Effects decide such
+# choices themselves for CPUs.
+Confirm = namedtuple('Confirm', 'player card question', defaults=(None,))
+# -> None when the effect animation panel finishes. `data` is the dict built by _prepare_animation_data.
+Animate = namedtuple('Animate', 'data')
+# -> None when the King swap animation finishes.
+AnimateKingSwap = namedtuple('AnimateKingSwap', 'player target player_card target_card')
+# -> None when the elimination animation finishes.
+AnimateElimination = namedtuple('AnimateElimination', 'player')
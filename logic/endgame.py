@@ -0,0 +1,469 @@
+# file: logic/endgame.py
+"""
+Exact endgame solver for the classic (2-4 player) deck.
+
+Once only a few cards are left in the deck, every way the cards a CPU player
+cannot see could be arranged (unknown opponent hands, deck order, burned card)
+can be enumerated. Arrangements that contradict what the player knows (its own
+hand, the face-up discards, hands it learned through Priest/King/Guard/Baron,
+values ruled out by missed Guard guesses) are skipped; the rest are weighted by
+how many physical deals produce them.
+
+Each deal is then solved to the end of the round as a perfect-information game
+in which every player maximises its own chance of winning the round (max^n).
+Opponents therefore play as if they could see the cards too: a pessimistic but
+sound model for a handful of turns. Root actions (card, target, guessed value)
+are scored by their average over all deals, and the best one is played.
+
+Positions are memoized in a bounded transposition table (logic.transposition), keyed
+on a canonical tuple (turn, hands, deck, burned card, eliminated/protected
+masks, discard sums) and shared by every deal and by the following turns, so
+positions reached through different deals or move orders are solved once.
+Deeper results (more cards left in the deck) win slot conflicts. A node budget bounds the
+work per decision; when it runs out the solver gives up and the caller falls
+back to its regular policy.
+
+In the classic deck a card's value is its identity (as in logic.batch_engine),
+so states are tuples of small ints and nothing touches a GameRound while solving.
+
+Usage (strength and speed check, seat 0 solves endgames, the others use --opponents):
+    python -m logic.endgame --games 200 --players 4 --max-deck 3 --opponents belief
+"""
+import argparse
+import random
+import threading
+import time
+
+from .constants import CARDS_DATA_RAW, CARD_PROTOTYPES
+from .cpu_policy import BeliefPolicy, CPU_POLICIES
+from .headless import HeadlessGame
+from .ismcts import legal_actions
+from .transposition import TranspositionTable, DEPTH_PREFERRED
+
+GUARD = CARDS_DATA_RAW['Guard']['value']
+PRIEST = CARDS_DATA_RAW['Priest']['value']
+BARON = CARDS_DATA_RAW['Baron']['value']
+HANDMAID = CARDS_DATA_RAW['Handmaid']['value']
+PRINCE = CARDS_DATA_RAW['Prince']['value']
+KING = CARDS_DATA_RAW['King']['value']
+COUNTESS = CARDS_DATA_RAW['Countess']['value']
+PRINCESS = CARDS_DATA_RAW['Princess']['value']
+
+_TARGETED = frozenset((GUARD, PRIEST, BARON, PRINCE, KING))
+NO_CARD = 0  # Hand slot of a player without a card; no classic card has value 0.
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class EndgameStats:
+    """Outcome of one solve: deals and positions examined, wall time, chosen action and its win rate."""
+    __slots__ = ('deals', 'nodes', 'cache_hits', 'elapsed', 'action', 'win_rate')
+
+    def __init__(self, deals, nodes, cache_hits, elapsed, action, win_rate):
+        self.deals = deals
+        self.nodes = nodes
+        self.cache_hits = cache_hits
+        self.elapsed = elapsed
+        self.action = action  # None when the node budget ran out
+        self.win_rate = win_rate
+
+    @property
+    def complete(self):
+        return self.action is not None
+
+
+class _Solver:
+    """Max^n search over perfect-information classic positions, with a shared transposition table."""
+
+    def __init__(self, num_players, node_budget, table):
+        self.n = num_players
+        self.node_budget = node_budget
+        self.table = table
+        self.nodes = 0
+        self.cache_hits = 0
+
+    def turn(self, seat, hands, deck, burned, alive, protected, dsum):
+        """Win shares per seat when `seat` (alive) is about to start its turn."""
+        protected &= ~(1 << seat)  # Handmaid protection ends as the turn starts
+        key = (seat, hands, deck, burned, alive, protected, dsum)
+        result = self.table.get(key)
+        if result is not None:
+            self.cache_hits += 1
+            return result
+        self.nodes += 1
+        if self.nodes > self.node_budget:
+            raise _OutOfBudget
+
+        if not deck:
+            result = self.showdown(hands, alive, dsum)
+        else:
+            drawn = deck[-1]
+            deck = deck[:-1]
+            result = None
+            for played, kept in self.plays(hands[seat], drawn):
+                for target, guess in self.choices(seat, played, hands, alive, protected, None):
+                    value = self.after(seat, *self.apply(seat, played, kept, target, guess,
+                                                         hands, deck, burned, alive, protected, dsum))
+                    if result is None or value[seat] > result[seat]:
+                        result = value
+        self.table.store(key, result, len(deck) + 1)
+        return result
+
+    @staticmethod
+    def plays(held, drawn):
+        """(played, kept) pairs a player may choose between, following the Countess rule and the CPU's Princess rule."""
+        hand = (held, drawn)
+        if COUNTESS in hand and (KING in hand or PRINCE in hand):
+            return ((COUNTESS, drawn if held == COUNTESS else held),)
+        if held == drawn:
+            return ((held, held),)
+        if PRINCESS in hand:
+            other = drawn if held == PRINCESS else held
+            return ((other, PRINCESS),)
+        return ((held, drawn), (drawn, held))
+
+    def choices(self, seat, played, hands, alive, protected, guess_values):
+        """
+        (target seat, guess) pairs for playing `played`; (None, None) when nobody can be targeted.
+        Below the root, a Guard names the target's actual card (None if it is a Guard); at the root
+        every value in `guess_values` is a separate choice.
+        """
+        if played not in _TARGETED:
+            return ((None, None),)
+        targets = [s for s in range(self.n)
+                   if (alive >> s) & 1 and (s == seat and played == PRINCE
+                                            or s != seat and not (protected >> s) & 1 and hands[s] != NO_CARD)]
+        if not targets:
+            return ((None, None),)
+        if played != GUARD:
+            return [(t, None) for t in targets]
+        if guess_values is None:
+            return [(t, hands[t] if hands[t] != GUARD else None) for t in targets]
+        return [(t, g) for t in targets for g in guess_values]
+
+    @staticmethod
+    def apply(seat, played, kept, target, guess, hands, deck, burned, alive, protected, dsum):
+        """The position after `seat` plays `played` (keeping `kept`) on `target`, before the next turn."""
+        hands = list(hands)
+        hands[seat] = kept
+        dsum = list(dsum)
+        dsum[seat] += played
+        if played == PRINCESS:
+            alive &= ~(1 << seat)
+        elif played == HANDMAID:
+            protected |= 1 << seat
+        elif target is not None:
+            if played == GUARD:
+                if guess is not None and hands[target] == guess:
+                    alive &= ~(1 << target)
+            elif played == BARON:
+                mine, theirs = kept, hands[target]
+                if mine > theirs:
+                    alive &= ~(1 << target)
+                elif theirs > mine:
+                    alive &= ~(1 << seat)
+            elif played == KING:
+                hands[seat], hands[target] = hands[target], kept
+            elif played == PRINCE:
+                discarded = hands[target]
+                dsum[target] += discarded
+                if discarded == PRINCESS:
+                    alive &= ~(1 << target)
+                    hands[target] = NO_CARD
+                elif deck:
+                    hands[target] = deck[-1]
+                    deck = deck[:-1]
+                elif burned != NO_CARD:
+                    hands[target], burned = burned, NO_CARD
+                else:
+                    hands[target] = NO_CARD
+        return tuple(hands), deck, burned, alive, protected, tuple(dsum)
+
+    def after(self, seat, hands, deck, burned, alive, protected, dsum):
+        """Win shares once `seat`'s card has resolved: the round ends or passes to the next living player."""
+        if alive & (alive - 1) == 0:  # at most one player left
+            return tuple(float((alive >> s) & 1) for s in range(self.n))
+        nxt = (seat + 1) % self.n
+        while not (alive >> nxt) & 1:
+            nxt = (nxt + 1) % self.n
+        return self.turn(nxt, hands, deck, burned, alive, protected, dsum)
+
+    def showdown(self, hands, alive, dsum):
+        """Deck ran out: highest card wins, ties go to the highest discard sum, remaining ties all win."""
+        contenders = [s for s in range(self.n) if (alive >> s) & 1 and hands[s] != NO_CARD]
+        if not contenders:
+            return (0.0,) * self.n
+        best = max(hands[s] for s in contenders)
+        contenders = [s for s in contenders if hands[s] == best]
+        best = max(dsum[s] for s in contenders)
+        winners = {s for s in contenders if dsum[s] == best}
+        return tuple(1.0 if s in winners else 0.0 for s in range(self.n))
+
+
+def _deals(pool, slot_masks):
+    """
+    Yields (values, weight) for every distinct way to fill the slots from the `pool` (count per value).
+    slot_masks[i] is a bitmask of values slot i cannot hold. The weight is the number of
+    physical deals producing that arrangement, up to a factor shared by all of them.
+    """
+    values = []
+
+    def fill(i, weight):
+        if i == len(slot_masks):
+            yield tuple(values), weight
+            return
+        mask = slot_masks[i]
+        for value, count in enumerate(pool):
+            if count and not (mask >> value) & 1:
+                pool[value] -= 1
+                values.append(value)
+                yield from fill(i + 1, weight * count)
+                values.pop()
+                pool[value] += 1
+
+    return fill(0, 1)
+
+class EndgameProblem:
+    """
+    Everything the solver needs about one decision, read from the round on the caller's thread.
+    `run()` touches nothing else, so it may run on a worker thread while the round goes on.
+    """
+    __slots__ = ('num_players', 'me', 'hands', 'unknown_seats', 'pool', 'slot_masks', 'deck_size',
+                 'burned_slot', 'alive', 'protected', 'dsum', 'held', 'actions')
+
+    def __init__(self, game_round, player):
+        players = game_round.players
+        seat_of = {p.id: seat for seat, p in enumerate(players)}
+        beliefs = game_round.beliefs
+        self.num_players = len(players)
+        self.me = seat_of[player.id]
+
+        pool = list(game_round.composition.counts_by_value)
+        for p in players:
+            for card in p.discard_pile:
+                pool[card.value] -= 1
+        for card in player.hand:
+            pool[card.value] -= 1
+
+        hands = [NO_CARD] * len(players)
+        self.unknown_seats = []
+        for seat, p in enumerate(players):
+            if p is player or not p.hand:
+                continue
+            known = beliefs.known_value(player, p)
+            if p.is_eliminated:
+                if known is not None:
+                    pool[known] -= 1
+                continue  # an unseen eliminated hand stays in the pool, out of play
+            if known is None:
+                self.unknown_seats.append(seat)
+            else:
+                hands[seat] = known
+                pool[known] -= 1
+        self.hands = hands
+        self.pool = pool
+        self.burned_slot = game_round.shared_burned_card_ref['card'] is not None
+        self.deck_size = game_round.deck.count()
+        self.slot_masks = ([beliefs.excluded[players[seat].id] for seat in self.unknown_seats]
+                           + [0] * (self.deck_size + self.burned_slot))
+
+        self.alive = self.protected = 0
+        for seat, p in enumerate(players):
+            if not p.is_eliminated:
+                self.alive |= 1 << seat
+            if p.is_protected:
+                self.protected |= 1 << seat
+        self.dsum = tuple(sum(c.value for c in p.discard_pile) for p in players)
+        self.held, drawn = (c.value for c in player.hand)
+
+        playable = ([c for c in player.hand if c.name == 'Countess'] if game_round._check_countess_rule(player)
+                    else game_round.cpu_playable_cards(player))
+        self.actions = []  # (action, played value, kept value, target seat, guess)
+        for action in legal_actions(game_round, player, playable):
+            played = CARD_PROTOTYPES[action[0]].value
+            kept = drawn if played == self.held else self.held
+            self.actions.append((action, played, kept, None if action[1] is None else seat_of[action[1]], action[2]))
+
+    def run(self, node_budget, table):
+        """
+        Solves every consistent deal and returns EndgameStats (action None if the budget ran out).
+        `table` is a TranspositionTable; results stored there stay valid for later problems of the same game.
+        """
+        start = time.perf_counter()
+        pool = list(self.pool)
+        if min(pool) < 0 or sum(pool) < len(self.slot_masks) or not self.actions:
+            return EndgameStats(0, 0, 0, time.perf_counter() - start, None, 0.0)  # beliefs out of step with the table
+
+        me, deck_size, n_unknown = self.me, self.deck_size, len(self.unknown_seats)
+        alive, protected, dsum = self.alive, self.protected, self.dsum
+        hands = list(self.hands)
+        hands[me] = self.held
+        solver = _Solver(self.num_players, node_budget, table)
+        totals = [0.0] * len(self.actions)
+        total_weight = deals = 0
+        try:
+            for values, weight in _deals(pool, self.slot_masks):
+                deals += 1
+                solver.nodes += 1
+                for seat, value in zip(self.unknown_seats, values):
+                    hands[seat] = value
+                deck = values[n_unknown:n_unknown + deck_size]
+                burned = values[n_unknown + deck_size] if self.burned_slot else NO_CARD
+                position = tuple(hands)
+                for i, (_, played, kept, target, guess) in enumerate(self.actions):
+                    state = solver.apply(me, played, kept, target, guess, position, deck, burned, alive, protected, dsum)
+                    totals[i] += weight * solver.after(me, *state)[me]
+                total_weight += weight
+        except _OutOfBudget:
+            return EndgameStats(deals, solver.nodes, solver.cache_hits, time.perf_counter() - start, None, 0.0)
+
+        if not total_weight:
+            return EndgameStats(deals, solver.nodes, solver.cache_hits, time.perf_counter() - start, None, 0.0)
+        best = max(range(len(self.actions)), key=lambda i: totals[i])
+        return EndgameStats(deals, solver.nodes, solver.cache_hits, time.perf_counter() - start,
+                            self.actions[best][0], totals[best] / total_weight)
+
+
+class EndgameSolver:
+    """
+    Solves the rest of a classic round exactly for the player about to move.
+
+    max_deck: largest deck size at which `applies` is true. node_budget: positions (plus deals)
+    examined per decision before giving up. table_size/table_policy: the transposition table
+    kept from one decision to the next.
+    """
+
+    def __init__(self, max_deck=3, node_budget=200000, table_size=1 << 17, table_policy=DEPTH_PREFERRED):
+        self.max_deck = max_deck
+        self.node_budget = node_budget
+        self.table = TranspositionTable(table_size, table_policy)
+
+    def applies(self, game_round, player):
+        return (game_round.composition.key == 'count_classic' and game_round.deck.count() <= self.max_deck
+                and len(player.hand) == 2)
+
+    def solve(self, game_round, player):
+        """Returns EndgameStats for `player`'s turn (after its draw). Reads the round, never changes it."""
+        return self.run(EndgameProblem(game_round, player))
+
+    def run(self, problem):
+        """Solves a prepared EndgameProblem; safe on a worker thread while no other solve is running."""
+        self.table.new_search()
+        return problem.run(self.node_budget, self.table)
+
+
+class EndgamePolicy:
+    """
+    CPU policy that plays the last few turns of a classic round exactly and leaves the rest to `fallback`.
+
+    The decision is taken in `begin_turn` and followed by the choose_* calls. background: solve
+    on a worker thread and resume the round through its scheduler (the Kivy clock), as
+    ISMCTSPolicy does. When the solver does not apply or runs out of budget, the turn is
+    handed to the fallback policy unchanged.
+    """
+
+    def __init__(self, fallback=None, max_deck=3, node_budget=200000, background=False):
+        self.fallback = fallback if fallback is not None else BeliefPolicy()
+        self.solver = EndgameSolver(max_deck, node_budget)
+        self.background = background
+        self.decisions = {}  # player id -> solved action for the turn in progress
+        self.last_stats = None
+        self.solved_turns = 0
+        self.abandoned_turns = 0
+        self.total_nodes = 0
+        self.total_solve_time = 0.0
+
+    def begin_turn(self, game_round, player, on_ready):
+        self.decisions.pop(player.id, None)
+        if not self.solver.applies(game_round, player):
+            self.fallback.begin_turn(game_round, player, on_ready)
+            return
+
+        problem = EndgameProblem(game_round, player)
+
+        def finish(stats):
+            self.last_stats = stats
+            self.total_nodes += stats.nodes
+            self.total_solve_time += stats.elapsed
+            if not stats.complete:
+                self.abandoned_turns += 1
+                self.fallback.begin_turn(game_round, player, on_ready)
+                return
+            self.solved_turns += 1
+            self.decisions[player.id] = stats.action
+            game_round.log_message.debug(
+                "Máy ({0.name}) giải tàn cuộc: {1} cách chia, {2} thế cờ trong {3:.3f}s, tỉ lệ thắng {4:.0%}.",
+                player, stats.deals, stats.nodes, stats.elapsed, stats.win_rate)
+            on_ready()
+
+        if not self.background:
+            finish(self.solver.run(problem))
+            return
+
+        def work():
+            stats = self.solver.run(problem)
+            game_round.schedule(lambda: finish(stats), 0)
+
+        threading.Thread(target=work, name=f"endgame-{player.id}", daemon=True).start()
+
+    def choose_card(self, game_round, player, playable_cards):
+        action = self.decisions.get(player.id)
+        if action:
+            card = next((c for c in playable_cards if c.name == action[0]), None)
+            if card is not None:
+                return card
+        return self.fallback.choose_card(game_round, player, playable_cards)
+
+    def choose_target(self, game_round, player, card, valid_targets):
+        action = self.decisions.get(player.id)
+        if action and action[0] == card.name and action[1] is not None:
+            target = next((t for t in valid_targets if t.id == action[1]), None)
+            if target is not None:
+                return target
+        return self.fallback.choose_target(game_round, player, card, valid_targets)
+
+    def choose_guard_guess(self, game_round, player, target, possible_values):
+        action = self.decisions.get(player.id)
+        if action and action[2] is not None and action[2] in possible_values:
+            return action[2]
+        return self.fallback.choose_guard_guess(game_round, player, target, possible_values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m logic.endgame", description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=100, help="number of full games to play")
+    parser.add_argument('--players', type=int, default=4, help="players per game (2-4, classic deck)")
+    parser.add_argument('--max-deck', type=int, default=3, help="solve once the deck has at most this many cards")
+    parser.add_argument('--budget', type=int, default=200000, help="node budget per decision")
+    parser.add_argument('--seed', type=int, default=0, help="base seed")
+    parser.add_argument('--opponents', choices=sorted(CPU_POLICIES), default='belief', help="policy of the other seats")
+    args = parser.parse_args(argv)
+
+    policy = EndgamePolicy(BeliefPolicy(), max_deck=args.max_deck, node_budget=args.budget)
+    rng = random.Random(args.seed)
+    rounds = round_wins = game_wins = 0
+    for _ in range(args.games):
+        game = HeadlessGame(args.players, seed=rng.getrandbits(64), cpu_policy=CPU_POLICIES[args.opponents]())
+        game.players[0].cpu_policy = policy
+        game.play()
+        game_wins += game.game_winner.id == 0
+        rounds += len(game.round_results)
+        round_wins += sum(1 for r in game.round_results if any(p.id == 0 for p in r.winners))
+
+    fair = 1 / args.players
+    print(f"Ghế 0 (tàn cuộc) thắng {game_wins}/{args.games} ván ({game_wins / args.games:.3f}), "
+          f"{round_wins}/{rounds} vòng ({round_wins / rounds:.3f}); chia đều là {fair:.3f}.")
+    attempts = policy.solved_turns + policy.abandoned_turns
+    if attempts:
+        print(f"Tàn cuộc: giải trọn {policy.solved_turns}/{attempts} lượt, bỏ dở {policy.abandoned_turns}; "
+              f"{policy.total_nodes} thế cờ trong {policy.total_solve_time:.2f}s "
+              f"(trung bình {policy.total_solve_time / attempts * 1000:.1f} ms/lượt).")
+        table = policy.solver.table
+        print(f"Bảng chuyển vị: {len(table)}/{table.capacity} ô, trúng {table.hits}/{table.probes} "
+              f"({table.hit_rate:.1%}), thay thế {table.evictions}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# file: logic/game_log.py
+"""
+Structured, lazily formatted game log.
+
+Game logic logs events as a `str.format` template plus its arguments, e.g.
+    game_round.log_message("{0.name} chơi lá {1.name}.", player, card)
+and the text is only built by sinks that actually display it. A GameLog with
+no sinks (simulations, tree search) returns after a single level comparison,
+so logging costs nothing there beyond the call itself.
+
+Sinks are callables taking a LogRecord. Records reference live Player/Card
+objects, so a sink that keeps records around should read `record.text` when it
+receives them if it needs the wording of that moment.
+"""
+from collections import namedtuple
+
+DEBUG = 10    # Bookkeeping (deck built, shuffled, burned).
+INFO = 20     # Regular game events.
+WARNING = 30  # Rule reminders, effects that fizzled.
+ERROR = 40    # Situations the rules should have prevented.
+
+_SILENT = ERROR + 1
+
+
+class LogRecord(namedtuple('LogRecord', 'level template args')):
+    __slots__ = ()
+
+    @property
+    def text(self):
+        # Templates without arguments are plain messages and may contain literal braces.
+        return self.template.format(*self.args) if self.args else self.template
+
+
+def text_sink(callback):
+    """Adapts a `callback(message)` that wants plain strings into a sink."""
+    return lambda record: callback(record.text)
+
+
+class GameLog:
+    __slots__ = ('_sinks', 'level')
+
+    def __init__(self, *sinks, level=INFO):
+        self._sinks = []
+        # Lowest level any sink listens to; anything below is dropped before a record is built.
+        self.level = _SILENT
+        for sink in sinks:
+            self.add_sink(sink, level)
+
+    @classmethod
+    def wrap(cls, log_callback):
+        """Returns `log_callback` if it is a GameLog, a silent GameLog for None, else a GameLog with a text sink."""
+        if isinstance(log_callback, GameLog):
+            return log_callback
+        if log_callback is None:
+            return cls()
+        return cls(text_sink(log_callback), level=DEBUG)
+
+    def add_sink(self, sink, level=INFO):
+        self._sinks.append((sink, level))
+        self.level = min(self.level, level)
+
+    def remove_sink(self, sink):
+        self._sinks = [(s, lvl) for s, lvl in self._sinks if s is not sink]
+        self.level = min((lvl for _, lvl in self._sinks), default=_SILENT)
+
+    def enabled_for(self, level):
+        return level >= self.level
+
+    def log(self, level, template, *args):
+        if level < self.level:
+            return
+        record = LogRecord(level, template, args)
+        for sink, sink_level in self._sinks:
+            if level >= sink_level:
+                sink(record)
+
+    def __call__(self, template, *args):
+        if INFO < self.level:
+            return
+        self.log(INFO, template, *args)
+
+    def debug(self, template, *args):
+        if DEBUG < self.level:
+            return
+        self.log(DEBUG, template, *args)
+
+    def warning(self, template, *args):
+        self.log(WARNING, template, *args)
+
+    def error(self, template, *args):
+        self.log(ERROR, template, *args)
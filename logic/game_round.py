@@ -1,32 +1,212 @@
 # file: logic/game_round.py
+from collections import namedtuple, deque
+
 from .player import Player
 from .deck import Deck
-from .constants import CARD_PROTOTYPES
-import random
-from kivy.clock import Clock
+from .constants import composition_for, CARDS_BY_ID
+from .cpu_policy import DEFAULT_CPU_POLICY
+from .beliefs import BeliefTracker
+from .game_log import GameLog
+from .latency import timed
+from .ui_regions import UI_ALL, UI_SCORE, UI_TURN, UI_DECK, UI_DISCARDS, UI_OPPONENTS, UI_HAND
+from .effect_requests import (ChooseTarget, ChooseGuardValue, Confirm, Animate, AnimateKingSwap,
+                              AnimateElimination)
+
+
+# Immutable, compact capture of a round (see GameRound.snapshot). Cards are stored as ids,
+# the deck as bytes and players as Player.pack() tuples, so snapshots are cheap to take,
+# hashable, and can be shared freely between search branches: restoring never mutates them.
+RoundSnapshot = namedtuple('RoundSnapshot', [
+    'deck_ids', 'burned_card_id', 'players', 'current_player_idx', 'first_player_idx',
+    'round_active', 'game_over_pending', 'game_over_winner_id', 'turns_played', 'play_history',
+    'beliefs', 'rng_state',
+])
+
+
+# Turn phases. The round is a queue of (phase, args) steps run by GameRound's trampoline.
+PHASE_DEAL = 'deal'          # deal one card to everyone and pick the first player
+PHASE_DRAW = 'draw'          # start of a turn: the current player draws
+PHASE_CHOOSE = 'choose'      # the current player picks a card (CPU policy or human input)
+PHASE_RESOLVE = 'resolve'    # the played card's effect resolves
+PHASE_ADVANCE = 'advance'    # move to the next player still in the round
+PHASE_SCORE = 'score'        # the round is over: decide and award the winners
+
+
+def _kivy_scheduler(callback, delay):
+    """Default scheduler: defers the callback through the Kivy clock."""
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback(), delay)
+
 
 class GameRound:
     """
     Manages the state and logic for a single round of the game.
     It acts as a service provider for card effects, offering a stable API
     for them to interact with the game state (e.g., getting targets, eliminating players).
+
+    Animation callbacks in `ui_callbacks` are optional: a missing one completes
+    instantly, which is how headless drivers skip them.
+
+    Delayed actions (the CPU "thinking" pause) go through `scheduler`, a callable
+    `scheduler(callback, delay)`. It defaults to the Kivy clock; headless drivers
+    (see logic/headless.py) inject their own so rounds run without an event loop.
+
+    All randomness (first player, CPU choices, card effects) comes from `self.rng`,
+    which defaults to the deck's RNG, so a round seeded through its Deck replays exactly.
+
+    CPU decisions are delegated to each player's policy (see logic/cpu_policy.py).
+
+    The round is a state machine: each step enqueues the next phase with `_goto`
+    instead of calling it, and a trampoline loop runs the queue. Synchronous UI
+    callbacks therefore never nest turn inside turn, so headless games run in
+    constant stack depth. `pause()`, `resume()` and `step()` let the UI hold, single-step
+    or release the phases; animations that finish while paused just queue their phase.
+
+    `instrument(recorder)` opts the round into latency recording (see logic/latency.py).
     """
-    def __init__(self, players_list, deck_obj, human_player_id, log_callback, ui_callbacks):
+    CPU_THINK_DELAY = 2.5
+
+    def __init__(self, players_list, deck_obj, human_player_id, log_callback, ui_callbacks, scheduler=None, rng=None):
         self.players = players_list
         self.deck = deck_obj
         self.human_player_id = human_player_id
-        self.log_message = log_callback
+        self.log_message = GameLog.wrap(log_callback)
         self.ui = ui_callbacks
+        self.schedule = scheduler or _kivy_scheduler
+        self.rng = rng if rng is not None else deck_obj.rng
+        self.composition = composition_for(len(players_list))
 
         self.current_player_idx = 0
+        self.first_player_idx = 0
         self.round_active = False
         self.game_over_pending_from_round = False
         self.game_over_winner = None
         self.shared_burned_card_ref = {'card': self.deck.burned_card}
+        self.turns_played = 0
+        self.phase = None
+        self.paused = False
+        self._phase_queue = deque()
+        self._trampoline_running = False
+        self.play_history = []  # (player_id, card_name) for every card played this round
+        self.beliefs = BeliefTracker(self.composition, len(players_list))
+        self._undo_snapshot = None  # taken before a human play, consumed by cancel_played_card_action
+        self.latency = None  # LatencyRecorder while instrumented
+
+    # --- Snapshots ---
+
+    def snapshot(self, include_rng=False):
+        """
+        Captures deck order, the burned card, every player's state and the turn position
+        in an immutable RoundSnapshot. With `include_rng`, the RNG state is captured too
+        so a restored round also replays the same random choices.
+        """
+        burned = self.shared_burned_card_ref['card']
+        winner = self.game_over_winner
+        return RoundSnapshot(
+            self.deck.snapshot(),
+            burned.card_id if burned else None,
+            tuple(p.pack() for p in self.players),
+            self.current_player_idx,
+            self.first_player_idx,
+            self.round_active,
+            self.game_over_pending_from_round,
+            winner.id if winner else None,
+            self.turns_played,
+            tuple(self.play_history),
+            self.beliefs.pack(),
+            self.rng.getstate() if include_rng else None,
+        )
+
+    def restore(self, snap):
+        """Rolls the round back to `snap`. The snapshot itself is left untouched and can be reused."""
+        self.deck.restore(snap.deck_ids)
+        burned = CARDS_BY_ID[snap.burned_card_id] if snap.burned_card_id is not None else None
+        self.shared_burned_card_ref['card'] = burned
+        for player, packed in zip(self.players, snap.players):
+            player.unpack(packed)
+        self.current_player_idx = snap.current_player_idx
+        self.first_player_idx = snap.first_player_idx
+        self.round_active = snap.round_active
+        self.game_over_pending_from_round = snap.game_over_pending
+        self.game_over_winner = next((p for p in self.players if p.id == snap.game_over_winner_id), None)
+        self.turns_played = snap.turns_played
+        self.play_history = list(snap.play_history)
+        self.beliefs.unpack(snap.beliefs)
+        if snap.rng_state is not None:
+            self.rng.setstate(snap.rng_state)
+        self._phase_queue.clear()  # queued steps belong to the abandoned timeline
+
+    # --- Phase trampoline ---
+
+    def _goto(self, phase, *args):
+        """Queues the next phase. Runs the queue unless it is already running (or paused)."""
+        self._phase_queue.append((phase, args))
+        if not self._trampoline_running and not self.paused:
+            self._run_phases()
+
+    def _run_phases(self):
+        self._trampoline_running = True
+        try:
+            while self._phase_queue and not self.paused:
+                self._run_next_phase()
+        finally:
+            self._trampoline_running = False
+
+    def _run_next_phase(self):
+        phase, args = self._phase_queue.popleft()
+        self.phase = phase
+        if self.latency is None:
+            self._PHASE_HANDLERS[phase](self, *args)
+        else:
+            self._run_timed_phase(phase, args)
+
+    def _run_timed_phase(self, phase, args):
+        latency = self.latency
+        if phase == PHASE_DRAW and self.round_active and not self.players[self.current_player_idx].is_eliminated:
+            latency.begin('turn')
+        elif phase == PHASE_ADVANCE or phase == PHASE_SCORE:
+            latency.end('turn')
+        with latency.span('phase.' + phase):
+            self._PHASE_HANDLERS[phase](self, *args)
+
+    def pause(self):
+        """Stops before the next phase; anything finishing meanwhile just queues its phase."""
+        self.paused = True
+
+    def resume(self):
+        """Releases a pause and runs every queued phase."""
+        self.paused = False
+        if not self._trampoline_running:
+            self._run_phases()
+
+    def step(self):
+        """Runs exactly one queued phase (even while paused). Returns its name, or None if nothing is queued."""
+        if not self._phase_queue or self._trampoline_running:
+            return None
+        self._trampoline_running = True
+        try:
+            self._run_next_phase()
+        finally:
+            self._trampoline_running = False
+        return self.phase
+
+    @property
+    def next_phase(self):
+        return self._phase_queue[0][0] if self._phase_queue else None
+
+    # --- Instrumentation ---
+
+    def instrument(self, recorder):
+        """Records this round's phase, effect, CPU and UI callback latencies into `recorder` (a LatencyRecorder)."""
+        self.latency = recorder
+        self.ui = recorder.wrap_callbacks(self.ui)
 
     # --- Round Lifecycle ---
 
     def start_round(self):
+        self._goto(PHASE_DEAL)
+
+    def _phase_deal(self):
         self.log_message("--- Bắt đầu vòng mới (Logic) ---")
         for p in self.players:
             p.reset_for_round()
@@ -34,15 +214,25 @@ class GameRound:
             if drawn_card:
                 p.add_card_to_hand(drawn_card)
             else:
-                self.log_message(f"Lỗi: Không đủ bài để chia cho {p.name}. Chồng bài đã hết.")
+                self.log_message.error("Lỗi: Không đủ bài để chia cho {0.name}. Chồng bài đã hết.", p)
                 p.is_eliminated = True
 
-        self.current_player_idx = random.randrange(len(self.players))
+        self.current_player_idx = self.rng.randrange(len(self.players))
+        self.first_player_idx = self.current_player_idx
         self.round_active = True
-        self.log_message(f"Vòng đấu bắt đầu. {self.players[self.current_player_idx].name} đi trước.")
+        self.log_message("Vòng đấu bắt đầu. {0.name} đi trước.", self.players[self.current_player_idx])
 
-        self.ui['animate_deal_callback'](self._process_current_player_turn_start)
+        animate = self.ui.get('animate_deal_callback')
+        if animate is None:
+            self._goto(PHASE_DRAW)
+        else:
+            animate(lambda: self._goto(PHASE_DRAW))
 
+    def _phase_score(self, by_elimination, active_players_list=None):
+        if by_elimination:
+            self._end_round_by_elimination(active_players_list)
+        else:
+            self._end_round_deck_empty()
 
     def _end_round_by_elimination(self, active_players_list=None):
         if not self.round_active: return
@@ -53,8 +243,11 @@ class GameRound:
 
         winner = active_players_list[0] if len(active_players_list) == 1 else None
         reason = f"{winner.name} là người cuối cùng còn lại." if winner else "Tất cả người chơi đã bị loại cùng lúc."
-        self.log_message(f"{reason} {'Người chiến thắng là ' + winner.name + '!' if winner else 'Không có ai thắng vòng này.'}")
-        self.ui['award_round_tokens_callback']([winner] if winner else [], reason)
+        if winner:
+            self.log_message("{0} Người chiến thắng là {1.name}!", reason, winner)
+        else:
+            self.log_message("{0} Không có ai thắng vòng này.", reason)
+        self._award_round([winner] if winner else [], reason)
 
     def _end_round_deck_empty(self):
         if not self.round_active: return
@@ -63,8 +256,8 @@ class GameRound:
         active_players_with_hands = [p for p in self.players if not p.is_eliminated and p.hand]
         if not active_players_with_hands:
             reason = "Không có người chơi nào còn bài để so."
-            self.log_message(f"{reason} Không có người thắng vòng này.")
-            self.ui['award_round_tokens_callback']([], reason)
+            self.log_message("{0} Không có người thắng vòng này.", reason)
+            self._award_round([], reason)
             return
 
         # Calculate effective value (considering Count card)
@@ -73,7 +266,8 @@ class GameRound:
             p.effective_value_end_round = p.hand[0].value
             if is_count_in_deck and p.has_discarded('Count'):
                 p.effective_value_end_round += 1
-                self.log_message(f"{p.name} có Bá tước trong bài bỏ. Bài: {p.hand[0].name}, Giá trị hiệu dụng: {p.effective_value_end_round}")
+                self.log_message("{0.name} có Bá tước trong bài bỏ. Bài: {1.name}, Giá trị hiệu dụng: {2}",
+                                 p, p.hand[0], p.effective_value_end_round)
 
         # Sort by card value
         active_players_with_hands.sort(key=lambda p: p.effective_value_end_round, reverse=True)
@@ -83,14 +277,14 @@ class GameRound:
         if len(winners_by_val) == 1:
             winner = winners_by_val[0]
             reason = f"{winner.name} có lá bài cao nhất ({winner.hand[0].name}, giá trị {winner.effective_value_end_round})!"
-            self.log_message(f"{reason} Người chiến thắng là {winner.name}.")
-            self.ui['award_round_tokens_callback'](winners_by_val, reason)
+            self.log_message("{0} Người chiến thắng là {1.name}.", reason, winner)
+            self._award_round(winners_by_val, reason)
         else:
             # Tie-breaker: sum of discarded cards
-            self.log_message(f"Hòa điểm ở giá trị {highest_val}. So tổng điểm các lá bài đã bỏ.")
+            self.log_message("Hòa điểm ở giá trị {0}. So tổng điểm các lá bài đã bỏ.", highest_val)
             for p in winners_by_val:
                 p.discard_sum_end_round = sum(c.value for c in p.discard_pile)
-                self.log_message(f"{p.name} (Bài: {p.hand[0].name}) tổng điểm bài bỏ: {p.discard_sum_end_round}")
+                self.log_message("{0.name} (Bài: {1.name}) tổng điểm bài bỏ: {2}", p, p.hand[0], p.discard_sum_end_round)
             winners_by_val.sort(key=lambda p: p.discard_sum_end_round, reverse=True)
             highest_discard_sum = winners_by_val[0].discard_sum_end_round
             final_winners = [p for p in winners_by_val if p.discard_sum_end_round == highest_discard_sum]
@@ -98,56 +292,85 @@ class GameRound:
             if len(final_winners) == 1:
                 winner = final_winners[0]
                 reason = f"{winner.name} thắng nhờ tổng điểm bài bỏ cao hơn ({highest_discard_sum})!"
-                self.log_message(f"{reason} Người chiến thắng là {winner.name}.")
+                self.log_message("{0} Người chiến thắng là {1.name}.", reason, winner)
             else:
                 winner_names = ", ".join([p.name for p in final_winners])
                 reason = f"Vẫn hòa! {winner_names} cùng thắng vòng này."
                 self.log_message(reason)
-            self.ui['award_round_tokens_callback'](final_winners, reason)
+            self._award_round(final_winners, reason)
+
+    def _award_round(self, winners, reason):
+        """
+        Hands the round result to the UI. Jester players who bet on a winner take a token too,
+        without counting as winners of the round.
+        """
+        self.ui['award_round_tokens_callback'](winners, reason)
+        if not winners or not self.is_card_in_current_deck('Jester'):
+            return
+        winner_ids = {w.id for w in winners}
+        for p in self.players:
+            if p.jester_on_player_id in winner_ids and p not in winners:
+                self.log_message("{0.name} đã đặt cược Tên hề vào người thắng và cũng nhận một tín vật!", p)
+                self.award_token(p)
+        # A round winner who reached the target has already ended the game; the Jester only ends it otherwise.
+        if self.game_over_pending_from_round and not any(
+                self.ui['check_game_over_token_callback'](w) for w in winners):
+            self.ui['game_over_callback'](self.game_over_winner)
 
     # --- Turn Management ---
 
-    def _process_current_player_turn_start(self):
+    def _phase_draw(self):
         if not self.round_active: return
 
         current_player = self.players[self.current_player_idx]
         if current_player.is_eliminated:
-            self._advance_to_next_turn()
+            self._goto(PHASE_ADVANCE)
             return
 
         current_player.is_protected = False
-        self.ui['update_ui_full_callback']()
+        self.request_ui_update(UI_TURN | UI_OPPONENTS | UI_HAND)
 
         if self.deck.is_empty():
             self.log_message("Chồng bài đã hết. Vòng đấu kết thúc.")
-            self._end_round_deck_empty()
+            self._goto(PHASE_SCORE, False)
             return
 
         drawn_card = self.deck.draw()
+        self.turns_played += 1
 
-        def after_draw_animation():
-            current_player.add_card_to_hand(drawn_card)
-            log_msg = f"Bạn ({current_player.name}) đã rút được {drawn_card.name}. Bài trên tay: {current_player.get_hand_card_names()}." if not current_player.is_cpu else f"{current_player.name} đã rút một lá bài. Số bài trên tay: {len(current_player.hand)}."
-            self.log_message(log_msg)
-            self.ui['update_ui_full_callback']()
-
-            if current_player.is_cpu:
-                self.log_message(f"Máy ({current_player.name}) đang suy nghĩ...")
-                Clock.schedule_once(lambda dt: self._execute_cpu_turn_after_delay(current_player), 2.5)
-            else:
-                self.log_message(f"Đến lượt bạn, {current_player.name}. Hãy chọn một lá bài để chơi.")
-                self.ui['set_waiting_flag_callback'](False)
-                if self._check_countess_rule(current_player):
-                    self.log_message("LƯU Ý: Bạn có Nữ Bá tước và Vua/Hoàng tử. Bạn PHẢI chơi Nữ Bá tước.")
+        animate = self.ui.get('animate_draw_callback')
+        if animate is None:
+            self._goto(PHASE_CHOOSE, current_player, drawn_card)
+        else:
+            animate(current_player, lambda: self._goto(PHASE_CHOOSE, current_player, drawn_card))
 
-        self.ui['animate_draw_callback'](current_player, after_draw_animation)
+    def _phase_choose(self, current_player, drawn_card):
+        current_player.add_card_to_hand(drawn_card)
+        if current_player.is_cpu:
+            self.log_message("{0.name} đã rút một lá bài. Số bài trên tay: {1}.", current_player, len(current_player.hand))
+        else:
+            self.log_message("Bạn ({0.name}) đã rút được {1.name}. Bài trên tay: {2}.",
+                             current_player, drawn_card, current_player.get_hand_card_names())
+        self.request_ui_update(UI_DECK | UI_OPPONENTS | UI_HAND)
+
+        if current_player.is_cpu:
+            self.log_message("Máy ({0.name}) đang suy nghĩ...", current_player)
+            take_turn = lambda: self._execute_cpu_turn_after_delay(current_player)
+            if self.latency is not None:
+                take_turn = self.latency.until('cpu.delay', take_turn)
+            self.schedule(take_turn, self.CPU_THINK_DELAY)
+        else:
+            self.log_message("Đến lượt bạn, {0.name}. Hãy chọn một lá bài để chơi.", current_player)
+            self.ui['set_waiting_flag_callback'](False)
+            if self._check_countess_rule(current_player):
+                self.log_message.warning("LƯU Ý: Bạn có Nữ Bá tước và Vua/Hoàng tử. Bạn PHẢI chơi Nữ Bá tước.")
 
-    def _advance_to_next_turn(self):
+    def _phase_advance(self):
         if not self.round_active: return
 
         active_players_count = sum(1 for p in self.players if not p.is_eliminated)
         if active_players_count <= 1:
-            self._end_round_by_elimination()
+            self._goto(PHASE_SCORE, True)
             return
 
         # Find next non-eliminated player
@@ -156,9 +379,8 @@ class GameRound:
             self.current_player_idx = (self.current_player_idx + 1) % len(self.players)
 
         next_player = self.players[self.current_player_idx]
-        log_msg = f"--- Đến lượt bạn ({next_player.name}) ---" if not next_player.is_cpu else f"--- Lượt của {next_player.name} ---"
-        self.log_message(log_msg)
-        self._process_current_player_turn_start()
+        self.log_message("--- Lượt của {0.name} ---" if next_player.is_cpu else "--- Đến lượt bạn ({0.name}) ---", next_player)
+        self._goto(PHASE_DRAW)
 
     def finish_effect_and_proceed(self):
         """Callback for card effects to call when they are fully resolved."""
@@ -173,11 +395,11 @@ class GameRound:
 
         active_players = [p for p in self.players if not p.is_eliminated]
         if len(active_players) <= 1:
-            self._end_round_by_elimination(active_players)
+            self._goto(PHASE_SCORE, True, active_players)
         elif self.round_active:
-            self._advance_to_next_turn()
+            self._goto(PHASE_ADVANCE)
 
-        self.ui['update_ui_full_callback']()
+        self.request_ui_update(UI_ALL)
 
 
     # --- Player Actions & Card Logic ---
@@ -186,84 +408,198 @@ class GameRound:
         player = self.players[self.current_player_idx]
         if player.is_cpu or not self.round_active: return
 
+        self._undo_snapshot = self.snapshot()
+
         # Enforce Countess rule
         actual_card_to_play_name = card_name_played
         if self._check_countess_rule(player) and card_name_played != 'Countess':
-            self.log_message("Luật Nữ Bá tước: Tự động chơi Nữ Bá tước vì có Vua/Hoàng tử trên tay.")
+            self.log_message.warning("Luật Nữ Bá tước: Tự động chơi Nữ Bá tước vì có Vua/Hoàng tử trên tay.")
             actual_card_to_play_name = 'Countess'
 
         card_object_played = player.play_card(actual_card_to_play_name)
         if card_object_played:
             self._handle_card_played_logic(player, card_object_played)
         else:
-            self.log_message(f"LỖI: {player.name} đã thử chơi {actual_card_to_play_name} nhưng thất bại.")
+            self.log_message.error("LỖI: {0.name} đã thử chơi {1} nhưng thất bại.", player, actual_card_to_play_name)
             self.ui['set_waiting_flag_callback'](False)
-            if self.round_active: self._advance_to_next_turn()
+            if self.round_active: self._goto(PHASE_ADVANCE)
+
+    def request_ui_update(self, regions=UI_ALL):
+        """Tells the UI which screen regions (UI_* flags) this change made stale."""
+        update = self.ui.get('update_ui_full_callback')
+        if update: update(regions)
+
+    def policy_for(self, player):
+        """The decision policy used for a CPU player."""
+        return player.cpu_policy or DEFAULT_CPU_POLICY
 
     def _execute_cpu_turn_after_delay(self, cpu_player):
         if not self.round_active or self.players[self.current_player_idx] != cpu_player:
             return # Stale turn, do nothing
-        self.log_message(f"Máy ({cpu_player.name}) quyết định chơi.")
-        self._cpu_play_turn(cpu_player)
+
+        def on_policy_ready():
+            if not self.round_active or self.players[self.current_player_idx] != cpu_player:
+                return  # The round moved on while the policy was thinking
+            self.log_message("Máy ({0.name}) quyết định chơi.", cpu_player)
+            self._cpu_play_turn(cpu_player)
+
+        if self.latency is not None:
+            on_policy_ready = self.latency.until('cpu.policy', on_policy_ready)
+        self.policy_for(cpu_player).begin_turn(self, cpu_player, on_policy_ready)
 
     def _cpu_play_turn(self, cpu_player):
         # Countess rule
         if self._check_countess_rule(cpu_player):
-            self.log_message(f"Máy ({cpu_player.name}) có Nữ Bá tước và Vua/Hoàng tử, phải chơi Nữ Bá tước.")
+            self.log_message("Máy ({0.name}) có Nữ Bá tước và Vua/Hoàng tử, phải chơi Nữ Bá tước.", cpu_player)
             card_object_played = cpu_player.play_card('Countess')
             self._handle_card_played_logic(cpu_player, card_object_played)
             return
 
+        playable_cards = self.cpu_playable_cards(cpu_player)
+        chosen_card_object = self.policy_for(cpu_player).choose_card(self, cpu_player, playable_cards)
+        card_object_played = cpu_player.play_card(chosen_card_object.name)
+        self._handle_card_played_logic(cpu_player, card_object_played)
+
+    def cpu_playable_cards(self, cpu_player):
+        """The cards a CPU player chooses between (the Countess rule is enforced before this)."""
         # Simple AI: avoid playing Princess if possible
         playable_cards = list(cpu_player.hand)
         if self.is_card_in_current_deck('Princess') and len(playable_cards) > 1:
             non_princess_cards = [c for c in playable_cards if c.name != 'Princess']
             if non_princess_cards:
                 playable_cards = non_princess_cards
+        return playable_cards
 
-        chosen_card_object = random.choice(playable_cards)
-        card_object_played = cpu_player.play_card(chosen_card_object.name)
-        self._handle_card_played_logic(cpu_player, card_object_played)
-
+    @timed('card_played')
     def _handle_card_played_logic(self, player, card_object_played):
-        self.log_message(f"{player.name} chơi lá {card_object_played.name}.")
+        self.log_message("{0.name} chơi lá {1.name}.", player, card_object_played)
+        self.play_history.append((player.id, card_object_played.name))
+        self.beliefs.card_played(player, card_object_played)
         if self.ui.get('add_to_global_discard_callback'):
             self.ui['add_to_global_discard_callback'](player, card_object_played)
 
-        def after_play_animation():
-            self.ui['update_ui_full_callback']()
-            # Handle Princess elimination before calling the effect
-            if self.is_card_in_current_deck('Princess') and card_object_played.name == 'Princess':
-                self.log_message(f"{player.name} đã bỏ Công chúa và bị loại!")
-                self.eliminate_player(player, self.finish_effect_and_proceed)
-                return
-
-            needs_input = self._execute_card_effect(player, card_object_played)
-            if not needs_input:
-                self.finish_effect_and_proceed()
+        animate = self.ui.get('animate_play_card_callback')
+        if animate is None:
+            self._goto(PHASE_RESOLVE, player, card_object_played)
+        else:
+            animate(player, card_object_played, lambda: self._goto(PHASE_RESOLVE, player, card_object_played))
+
+    def _phase_resolve(self, player, card_object_played):
+        self.request_ui_update(UI_DISCARDS | UI_OPPONENTS | UI_HAND)
+        # Handle Princess elimination before calling the effect
+        if self.is_card_in_current_deck('Princess') and card_object_played.name == 'Princess':
+            self.log_message("{0.name} đã bỏ Công chúa và bị loại!", player)
+            self.eliminate_player(player, self.finish_effect_and_proceed)
+            return
 
-        self.ui['animate_play_card_callback'](player, card_object_played, after_play_animation)
+        self._execute_card_effect(player, card_object_played)
 
     def _execute_card_effect(self, player, card):
-        """Dispatches to the appropriate card effect function."""
-        player.sycophant_target_self = False # Reset flag
+        """Dispatches to the appropriate card effect function and proceeds once it is resolved."""
         if card.effect:
-            return card.effect(self, player, card)
+            effect = card.effect(self, player, card)
+            if effect is not None:
+                if self.latency is not None:
+                    effect = self.latency.timed_steps('effect.' + card.name, effect)
+                self.run_effect(effect, self.finish_effect_and_proceed)
+                return
         else:
-            self.log_message(f"Hiệu ứng cho {card.name} chưa được cài đặt hoặc là bị động/tự động.")
-            return False # No input needed
+            self.log_message.warning("Hiệu ứng cho {0.name} chưa được cài đặt hoặc là bị động/tự động.", card)
+        self.finish_effect_and_proceed()
+
+    # --- Effect driver ---
+
+    def run_effect(self, effect, on_done=None):
+        """
+        Drives an effect generator (see card_effects.py and effect_requests.py) and calls
+        `on_done` when it returns. CPU choices come from the player's policy and complete
+        inline; human choices and animations hand the generator to a UI callback that
+        resumes it later. Animations without a UI callback complete inline.
+        """
+        self._drive_effect(effect, None, on_done)
+
+    def _drive_effect(self, effect, answer, on_done):
+        ui = self.ui
+        while True:
+            try:
+                request = effect.send(answer)
+            except StopIteration:
+                if on_done: on_done()
+                return
+            answer = None
+            kind = type(request)
+
+            if kind is Animate:
+                animate = ui.get('animate_card_effect_callback')
+                if animate is not None:
+                    animate(request.data, lambda: self._drive_effect(effect, None, on_done))
+                    return
+            elif kind is AnimateElimination:
+                animate = ui.get('animate_elimination_callback')
+                if animate is not None:
+                    animate(request.player, lambda: self._drive_effect(effect, None, on_done))
+                    return
+            elif kind is AnimateKingSwap:
+                animate = ui.get('animate_king_swap_callback')
+                if animate is not None:
+                    animate(request.player, request.target, request.player_card, request.target_card,
+                            lambda: self._drive_effect(effect, None, on_done))
+                    return
+            elif kind is ChooseTarget:
+                player = request.player
+                if player.is_cpu:
+                    answer = self.policy_for(player).choose_target(self, player, request.card, request.valid_targets)
+                else:
+                    ui['request_target_selection_callback'](
+                        player, request.card, request.valid_targets,
+                        lambda ap, tid: self._drive_effect(effect, self._player_by_id(tid), on_done),
+                        (lambda ap: self._cancel_effect(effect, ap)) if request.cancellable else None,
+                        (lambda ap: self._drive_effect(effect, None, on_done)) if request.optional else None)
+                    return
+            elif kind is ChooseGuardValue:
+                player = request.player
+                if player.is_cpu:
+                    answer = self.policy_for(player).choose_guard_guess(self, player, request.target,
+                                                                        request.possible_values)
+                else:
+                    ui['request_guard_value_popup_callback'](
+                        player, request.target, request.possible_values,
+                        lambda ap, tp, gv: self._drive_effect(effect, gv, on_done),
+                        lambda ap: self._cancel_effect(effect, ap))
+                    return
+            elif kind is Confirm:
+                if request.player.is_cpu:
+                    answer = True
+                else:
+                    ui['request_confirmation_popup_callback'](
+                        request.player, request.card,
+                        lambda ap: self._drive_effect(effect, True, on_done),
+                        (lambda ap: self._cancel_effect(effect, ap)) if request.question is None
+                        else (lambda ap: self._drive_effect(effect, False, on_done)),
+                        request.question)
+                    return
+            else:
+                raise TypeError(f"Unknown effect request: {request!r}")
+
+    def _cancel_effect(self, effect, acting_player):
+        effect.close()
+        self.cancel_played_card_action(acting_player)
+
+    def _player_by_id(self, player_id):
+        return next(p for p in self.players if p.id == player_id)
 
     def cancel_played_card_action(self, acting_player):
-        self.log_message(f"{acting_player.name} quyết định lấy lại lá bài của mình.")
-        if not acting_player.discard_pile:
-            self.log_message(f"LỖI: Không thể hủy hành động, không có bài trong chồng bài bỏ của {acting_player.name}.")
+        self.log_message("{0.name} quyết định lấy lại lá bài của mình.", acting_player)
+        undo_snapshot, self._undo_snapshot = self._undo_snapshot, None
+        if undo_snapshot is None:
+            self.log_message.error("LỖI: Không thể hủy hành động, không có nước đi nào để hoàn tác cho {0.name}.", acting_player)
         else:
-            card_to_return = acting_player.discard_pile.pop()
-            acting_player.add_card_to_hand(card_to_return)
+            self.restore(undo_snapshot)
+            if self.ui.get('remove_last_global_discard_callback'): self.ui['remove_last_global_discard_callback']()
 
         if self.ui.get('dismiss_active_popup_callback'): self.ui['dismiss_active_popup_callback']()
         if self.ui.get('set_waiting_flag_callback'): self.ui['set_waiting_flag_callback'](False)
-        if self.ui.get('update_ui_full_callback'): self.ui['update_ui_full_callback']()
+        self.request_ui_update(UI_ALL)
 
     # --- Game State API for Card Effects ---
 
@@ -280,24 +616,31 @@ class GameRound:
 
     def eliminate_player(self, player_to_eliminate, continuation=None):
         """Handles player elimination and checks for Sheriff bonus."""
+        steps = self.elimination_steps(player_to_eliminate)
+        if self.latency is not None:
+            steps = self.latency.timed_steps('elimination', steps)
+        self.run_effect(steps, continuation)
+
+    def elimination_steps(self, player_to_eliminate):
+        """Effect steps of an elimination, for card effects to `yield from`."""
         if player_to_eliminate.is_eliminated:
-            if continuation: continuation()
             return
 
         player_to_eliminate.is_eliminated = True
-        self.log_message(f"{player_to_eliminate.name} đã bị loại!")
+        self.log_message("{0.name} đã bị loại!", player_to_eliminate)
+        yield AnimateElimination(player_to_eliminate)
 
-        def after_elimination_animation():
-            if self.is_card_in_current_deck('Sheriff') and player_to_eliminate.has_discarded('Sheriff'):
-                self.log_message(f"{player_to_eliminate.name} có Nguyên soái trong bài bỏ và nhận được một tín vật!")
-                player_to_eliminate.tokens += 1
-                if self.ui['check_game_over_token_callback'](player_to_eliminate):
-                    self.game_over_pending_from_round = True
-                    self.game_over_winner = player_to_eliminate
-            if continuation:
-                continuation()
+        if self.is_card_in_current_deck('Sheriff') and player_to_eliminate.has_discarded('Sheriff'):
+            self.log_message("{0.name} có Nguyên soái trong bài bỏ và nhận được một tín vật!", player_to_eliminate)
+            self.award_token(player_to_eliminate)
 
-        self.ui['animate_elimination_callback'](player_to_eliminate, after_elimination_animation)
+    def award_token(self, player):
+        """Gives `player` a token mid-round (Sheriff, Bishop). A winning token ends the game once the effect resolves."""
+        player.tokens += 1
+        self.request_ui_update(UI_SCORE)
+        if self.ui['check_game_over_token_callback'](player):
+            self.game_over_pending_from_round = True
+            self.game_over_winner = player
 
     def draw_from_deck_or_burned(self):
         """Draws a card from the deck, or the burned card if the deck is empty."""
@@ -311,16 +654,20 @@ class GameRound:
 
     def is_card_in_current_deck(self, card_name):
         """Checks if a card type is part of the current game's deck composition."""
-        prototype = CARD_PROTOTYPES.get(card_name)
-        if not prototype: return False
-        composition_key = 'count_classic' if len(self.players) <= 4 else 'count_large'
-        return getattr(prototype, composition_key, 0) > 0
+        return card_name in self.composition.card_names
 
     def _check_countess_rule(self, player):
         """Checks if the Countess rule is active for a given player."""
-        hand_names = player.get_hand_card_names()
-        has_countess = self.is_card_in_current_deck('Countess') and 'Countess' in hand_names
-        has_royalty = (self.is_card_in_current_deck('King') and 'King' in hand_names) or \
-                      (self.is_card_in_current_deck('Prince') and 'Prince' in hand_names)
-        return has_countess and has_royalty
-
+        if not self.composition.countess_rule_active:
+            return False
+        hand_names = [card.name for card in player.hand]
+        return 'Countess' in hand_names and ('King' in hand_names or 'Prince' in hand_names)
+
+    _PHASE_HANDLERS = {
+        PHASE_DEAL: _phase_deal,
+        PHASE_DRAW: _phase_draw,
+        PHASE_CHOOSE: _phase_choose,
+        PHASE_RESOLVE: _phase_resolve,
+        PHASE_ADVANCE: _phase_advance,
+        PHASE_SCORE: _phase_score,
+    }
@@ -0,0 +1,157 @@
+# file: logic/headless.py
+"""
+Headless driver for GameRound.
+
+Runs complete rounds and games without Kivy: every UI callback resolves
+synchronously (animation callbacks are left out, so GameRound completes them
+instantly and nothing is drawn) and the CPU
+"thinking" delay is replaced by a FIFO run queue. All seats are CPU players,
+so no popup is ever requested. Intended for balance testing and AI tuning,
+where thousands of rounds need to be played as fast as the CPU allows.
+
+Example:
+    game = HeadlessGame(num_players=4)
+    winner = game.play()
+"""
+import random
+from collections import deque
+
+from .constants import tokens_to_win_for
+from .deck import Deck
+from .game_round import GameRound
+from .game_log import GameLog
+from .player import Player
+
+
+class HeadlessScheduler:
+    """
+    A GameRound scheduler that ignores delays and runs callbacks in FIFO order.
+
+    GameRound's phase trampoline already keeps the stack flat; the queue keeps
+    CPU "thinking" callbacks in the order they were scheduled.
+    """
+
+    def __init__(self):
+        self.queue = deque()
+
+    def __call__(self, callback, delay=0):
+        self.queue.append(callback)
+
+    def run(self):
+        while self.queue:
+            self.queue.popleft()()
+
+
+class RoundResult:
+    """Outcome of a single headless round."""
+
+    def __init__(self, winners, reason, game_round, seed):
+        self.seed = seed  # play_round(seed) replays this round exactly
+        self.winners = winners
+        self.reason = reason
+        self.turns_played = game_round.turns_played
+        self.first_player_idx = game_round.first_player_idx
+        self.play_history = game_round.play_history
+
+    def __repr__(self):
+        return f"RoundResult(winners={[p.name for p in self.winners]}, turns={self.turns_played})"
+
+
+class HeadlessGame:
+    """
+    Plays a full game (rounds until someone reaches the token target) with CPU players only.
+
+    The UI callbacks below mirror the contract of LoveLetterGame.start_new_round:
+    animations call their continuation immediately, popups are never requested,
+    and round/game results are recorded on this object instead of being displayed.
+
+    Each round gets its own random.Random seeded from the game's RNG, so a whole
+    game replays exactly from `seed` and any single round replays from its RoundResult.seed.
+
+    With a `latency` LatencyRecorder, every round is instrumented into it (see logic/latency.py).
+    """
+
+    def __init__(self, num_players, tokens_to_win=None, log_callback=None, seed=None, round_rng_class=random.Random,
+                 cpu_policy=None, latency=None):
+        self.num_players = num_players
+        self.rng = random.Random(seed)
+        self.round_rng_class = round_rng_class
+        self.tokens_to_win = tokens_to_win or tokens_to_win_for(num_players)
+        self.log_message = GameLog.wrap(log_callback)
+        self.players = [Player(id_num=i, name=f"Máy {i + 1}", is_cpu=True, cpu_policy=cpu_policy)
+                        for i in range(num_players)]
+        self.scheduler = HeadlessScheduler()
+        self.latency = latency
+        self.ui_callbacks = self._build_ui_callbacks()
+        self.current_round = None
+        self.current_round_seed = None
+        self.round_results = []
+        self.game_winner = None
+
+    # --- UI callback contract ---
+
+    def _build_ui_callbacks(self):
+        def no_op(*args):
+            pass
+
+        def no_popup(*args):
+            raise RuntimeError("Headless rounds have no human player; popups cannot be requested.")
+
+        return {
+            'update_ui_full_callback': no_op,
+            'set_waiting_flag_callback': no_op,
+            'get_active_popup_callback': lambda: None,
+            'dismiss_active_popup_callback': no_op,
+            'request_target_selection_callback': no_popup,
+            'request_confirmation_popup_callback': no_popup,
+            'request_guard_value_popup_callback': no_popup,
+            'award_round_tokens_callback': self._award_round_tokens,
+            'check_game_over_token_callback': self._check_game_over_on_token_gain,
+            'game_over_callback': self._handle_game_over,
+            'add_to_global_discard_callback': no_op,
+            'remove_last_global_discard_callback': no_op,
+        }
+
+    def _award_round_tokens(self, list_of_winner_players, reason_for_win=""):
+        winners = [p for p in list_of_winner_players if p]
+        for winner in winners:
+            winner.tokens += 1
+            if self._check_game_over_on_token_gain(winner):
+                self._handle_game_over(winner)
+        self.round_results.append(RoundResult(winners, reason_for_win, self.current_round, self.current_round_seed))
+
+    def _check_game_over_on_token_gain(self, player):
+        return self.game_winner is None and player.tokens >= self.tokens_to_win
+
+    def _handle_game_over(self, winner_of_game):
+        if self.game_winner is not None: return
+        self.game_winner = winner_of_game
+        if self.current_round: self.current_round.round_active = False
+
+    # --- Driving rounds ---
+
+    def play_round(self, round_seed=None):
+        """Plays one round to completion and returns its RoundResult."""
+        if round_seed is None:
+            round_seed = self.rng.getrandbits(64)
+        self.current_round_seed = round_seed
+        deck = Deck(self.num_players, self.log_message, rng=self.round_rng_class(round_seed))
+        deck.burn_one_card(self.num_players)
+        self.current_round = GameRound(self.players, deck, -1, self.log_message, self.ui_callbacks,
+                                       scheduler=self.scheduler)
+        if self.latency is not None:
+            self.current_round.instrument(self.latency)
+        results_before = len(self.round_results)
+        self.current_round.start_round()
+        self.scheduler.run()
+
+        if len(self.round_results) == results_before:
+            # The round was cut short by a game over (e.g. a Sheriff token) before scoring.
+            self.round_results.append(RoundResult([], "Trò chơi kết thúc.", self.current_round, round_seed))
+        return self.round_results[-1]
+
+    def play(self):
+        """Plays rounds until a player reaches the token target and returns the winner."""
+        while self.game_winner is None:
+            self.play_round()
+        return self.game_winner
@@ -3,6 +3,10 @@ from .card import Card
 from .deck import Deck
 from .player import Player
 from .game_round import GameRound
+from .game_log import GameLog
+from .headless import HeadlessGame, HeadlessScheduler
+from .cpu_policy import RandomPolicy
+from .ismcts import ISMCTSPolicy
 from .constants import CARD_PROTOTYPES, CARDS_DATA_RAW, CARD_FOLDER, CARD_BACK_IMAGE, ELIMINATED_IMAGE
 from . import card_effects
 
@@ -0,0 +1,355 @@
+# file: logic/ismcts.py
+"""
+Information-set Monte Carlo Tree Search (single-observer ISMCTS) CPU policy.
+
+Each iteration determinizes the round from the searching player's point of view
+(the cards it cannot see are shuffled and dealt back to the same places), then
+plays the round to the end on a private headless GameRound, walking a tree of
+public actions (card, target, guessed value) for every player with UCB selection
+and random play below the tree. The action with the most visits at the root is
+played.
+
+The search only ever reads a RoundSnapshot taken on the caller's thread, so it
+can run on a background thread (`background=True`, used by the Kivy UI) while
+the real round stays untouched; the result is handed back through the round's
+scheduler. Headless drivers search synchronously.
+
+Usage (strength and speed check, seat 0 searches, the others use --opponents):
+    python -m logic.ismcts --games 200 --players 4 --budget 0.05 --opponents random
+"""
+import argparse
+import math
+import random
+import threading
+import time
+
+from .constants import tokens_to_win_for
+from .cpu_policy import RandomPolicy, BeliefPolicy, CPU_POLICIES, targets_for, guess_values_for
+from .deck import Deck
+from .game_round import GameRound
+from .headless import HeadlessGame
+
+
+def legal_actions(game_round, player, playable_cards):
+    """All (card_name, target_id, guess) actions open to `player`, as hashable tuples."""
+    actions = []
+    seen = set()
+    for card in playable_cards:
+        if card.name in seen:
+            continue
+        seen.add(card.name)
+        targets = targets_for(game_round, player, card)
+        guesses = guess_values_for(game_round, card)
+        if not targets:
+            actions.append((card.name, None, None))
+        elif guesses:
+            actions.extend((card.name, t.id, v) for t in targets for v in guesses)
+        else:
+            actions.extend((card.name, t.id, None) for t in targets)
+    return actions
+
+
+class _Node:
+    """A tree node: statistics for the action leading here, from the acting player's point of view."""
+    __slots__ = ('player_id', 'visits', 'wins', 'avail', 'children')
+
+    def __init__(self, player_id):
+        self.player_id = player_id
+        self.visits = 0
+        self.wins = 0.0
+        self.avail = 1
+        self.children = {}
+
+
+class SearchStats:
+    """Outcome of one search: iterations run, wall time and the chosen action."""
+    __slots__ = ('iterations', 'elapsed', 'action')
+
+    def __init__(self, iterations, elapsed, action):
+        self.iterations = iterations
+        self.elapsed = elapsed
+        self.action = action
+
+    @property
+    def playouts_per_second(self):
+        return self.iterations / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class _TreeWalker(RandomPolicy):
+    """Policy installed on every player of the private rollout round: tree policy, then random."""
+
+    def __init__(self, search):
+        self.search = search
+        self.pending = None
+
+    def choose_card(self, game_round, player, playable_cards):
+        self.pending = None
+        if self.search.node is None:
+            return super().choose_card(game_round, player, playable_cards)
+        actions = legal_actions(game_round, player, playable_cards)
+        self.pending = action = self.search.descend(actions, player.id)
+        return next(c for c in playable_cards if c.name == action[0])
+
+    def choose_target(self, game_round, player, card, valid_targets):
+        pending = self.pending
+        if pending and pending[0] == card.name and pending[1] is not None:
+            target = next((t for t in valid_targets if t.id == pending[1]), None)
+            if target is not None:
+                return target
+        return super().choose_target(game_round, player, card, valid_targets)
+
+    def choose_guard_guess(self, game_round, player, target, possible_values):
+        pending = self.pending
+        if pending and pending[2] is not None and pending[2] in possible_values:
+            return pending[2]
+        return super().choose_guard_guess(game_round, player, target, possible_values)
+
+
+class _Search:
+    """One search from a root snapshot. Owns a private headless round reused by every iteration."""
+
+    def __init__(self, root_snapshot, searcher_id, num_players, tokens_to_win, exploration, rng, determinize):
+        self.root_snapshot = root_snapshot
+        self.searcher_id = searcher_id
+        self.exploration = exploration
+        self.rng = rng
+        self.determinize = determinize
+        self.root = _Node(None)
+        self.node = None
+        self.path = []
+
+        self.env = HeadlessGame(num_players, tokens_to_win=tokens_to_win)
+        walker = _TreeWalker(self)
+        for p in self.env.players:
+            p.cpu_policy = walker
+        deck = Deck(num_players, self.env.log_message, rng=rng)
+        self.round = GameRound(self.env.players, deck, -1, self.env.log_message, self.env.ui_callbacks,
+                               scheduler=self.env.scheduler, rng=rng)
+        self.env.current_round = self.round
+        self.searcher = next(p for p in self.env.players if p.id == searcher_id)
+
+    def descend(self, actions, player_id):
+        """Tree policy for one decision: expand an untried action or follow UCB. Returns the action."""
+        children = self.node.children
+        untried = []
+        for action in actions:
+            child = children.get(action)
+            if child is None:
+                untried.append(action)
+            else:
+                child.avail += 1
+        if untried:
+            action = self.rng.choice(untried)
+            child = children[action] = _Node(player_id)
+            self.path.append(child)
+            self.node = None  # leave the tree: the rest of the playout is random
+            return action
+
+        c = self.exploration
+        best_action, best_score = None, -1.0
+        for action in actions:
+            child = children[action]
+            score = child.wins / child.visits + c * math.sqrt(math.log(child.avail) / child.visits)
+            if score > best_score:
+                best_action, best_score = action, score
+        child = children[best_action]
+        self.path.append(child)
+        self.node = child
+        return best_action
+
+    def iterate(self):
+        env = self.env
+        self.round.restore(self.determinize(self.root_snapshot, self.searcher_id, self.rng))
+        env.round_results.clear()
+        env.game_winner = None
+        self.node = self.root
+        self.path = []
+
+        self.round._cpu_play_turn(self.searcher)
+        env.scheduler.run()
+
+        if env.round_results:
+            winner_ids = {p.id for p in env.round_results[-1].winners}
+        else:
+            winner_ids = {env.game_winner.id} if env.game_winner else set()
+        for node in self.path:
+            node.visits += 1
+            if node.player_id in winner_ids:
+                node.wins += 1.0
+        self.root.visits += 1
+
+    def best_action(self):
+        if not self.root.children:
+            return None
+        return max(self.root.children.items(), key=lambda item: item[1].visits)[0]
+
+
+def _known_to(searcher_id, beliefs_known):
+    """Player ids whose hand the searcher knows (privately or publicly), from a packed BeliefTracker."""
+    known_ids = set()
+    for target_id, entries in enumerate(beliefs_known):
+        for observer_id, _ in entries:
+            if observer_id is None or observer_id == searcher_id:
+                known_ids.add(target_id)
+    return known_ids
+
+
+def determinize_uniform(snapshot, searcher_id, rng):
+    """
+    Shuffles every card the searcher cannot see (unknown hands, deck, burned card)
+    and deals them back into the same slots. Hands the searcher knows from the
+    round's beliefs (Priest, King, Guard/Baron results) stay as they are.
+    """
+    fixed_ids = _known_to(searcher_id, snapshot.beliefs[1])
+    fixed_ids.add(searcher_id)
+    hidden = bytearray()
+    for player_id, packed in enumerate(snapshot.players):
+        if player_id not in fixed_ids:
+            hidden += packed[0]
+    hidden += snapshot.deck_ids
+    if snapshot.burned_card_id is not None:
+        hidden.append(snapshot.burned_card_id)
+    rng.shuffle(hidden)
+
+    pos = 0
+    players = []
+    for player_id, packed in enumerate(snapshot.players):
+        if player_id not in fixed_ids:
+            size = len(packed[0])
+            packed = (bytes(hidden[pos:pos + size]),) + packed[1:]
+            pos += size
+        players.append(packed)
+    deck_size = len(snapshot.deck_ids)
+    deck_ids = bytes(hidden[pos:pos + deck_size])
+    pos += deck_size
+    burned_card_id = hidden[pos] if snapshot.burned_card_id is not None else None
+    return snapshot._replace(deck_ids=deck_ids, burned_card_id=burned_card_id, players=tuple(players))
+
+
+class ISMCTSPolicy(BeliefPolicy):
+    """
+    CPU policy that searches before each move.
+
+    time_budget: seconds per move; iterations: playouts per move (whichever limit is hit first,
+    at least one must be set). exploration: UCB constant. background: run the search on a worker
+    thread and resume the round through its scheduler (the Kivy clock) when done.
+    """
+
+    def __init__(self, time_budget=0.5, iterations=None, exploration=0.7, background=False,
+                 tokens_to_win=None, seed=None, determinize=determinize_uniform):
+        if time_budget is None and iterations is None:
+            raise ValueError("ISMCTSPolicy needs a time_budget or an iterations limit")
+        self.time_budget = time_budget
+        self.iterations = iterations
+        self.exploration = exploration
+        self.background = background
+        self.tokens_to_win = tokens_to_win
+        self.determinize = determinize
+        self.rng = random.Random(seed)
+        self.decisions = {}  # player id -> chosen action for the turn in progress
+        self.last_stats = None
+        self.total_playouts = 0
+        self.total_search_time = 0.0
+
+    def search(self, root_snapshot, searcher_id, num_players):
+        """Runs one search and returns its SearchStats. Touches nothing but the snapshot."""
+        tokens_to_win = self.tokens_to_win or tokens_to_win_for(num_players)
+        search = _Search(root_snapshot, searcher_id, num_players, tokens_to_win, self.exploration,
+                         random.Random(self.rng.getrandbits(64)), self.determinize)
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        max_iterations = self.iterations
+        done = 0
+        while True:
+            search.iterate()
+            done += 1
+            if max_iterations is not None and done >= max_iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return SearchStats(done, time.perf_counter() - start, search.best_action())
+
+    def begin_turn(self, game_round, player, on_ready):
+        self.decisions.pop(player.id, None)
+        if game_round._check_countess_rule(player) or len(legal_actions(
+                game_round, player, game_round.cpu_playable_cards(player))) <= 1:
+            on_ready()  # forced move, nothing to search
+            return
+
+        root_snapshot = game_round.snapshot()
+        num_players = len(game_round.players)
+
+        def finish(stats):
+            self.decisions[player.id] = stats.action
+            self.last_stats = stats
+            self.total_playouts += stats.iterations
+            self.total_search_time += stats.elapsed
+            game_round.log_message.debug("Máy ({0.name}) đã mô phỏng {1} ván trong {2:.2f}s ({3:,.0f} ván/giây).",
+                                         player, stats.iterations, stats.elapsed, stats.playouts_per_second)
+            on_ready()
+
+        if not self.background:
+            finish(self.search(root_snapshot, player.id, num_players))
+            return
+
+        def work():
+            stats = self.search(root_snapshot, player.id, num_players)
+            game_round.schedule(lambda: finish(stats), 0)
+
+        threading.Thread(target=work, name=f"ismcts-{player.id}", daemon=True).start()
+
+    def choose_card(self, game_round, player, playable_cards):
+        action = self.decisions.get(player.id)
+        if action:
+            card = next((c for c in playable_cards if c.name == action[0]), None)
+            if card is not None:
+                return card
+        return super().choose_card(game_round, player, playable_cards)
+
+    def choose_target(self, game_round, player, card, valid_targets):
+        action = self.decisions.get(player.id)
+        if action and action[0] == card.name and action[1] is not None:
+            target = next((t for t in valid_targets if t.id == action[1]), None)
+            if target is not None:
+                return target
+        return super().choose_target(game_round, player, card, valid_targets)
+
+    def choose_guard_guess(self, game_round, player, target, possible_values):
+        action = self.decisions.get(player.id)
+        if action and action[2] is not None and action[2] in possible_values:
+            return action[2]
+        return super().choose_guard_guess(game_round, player, target, possible_values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m logic.ismcts", description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=100, help="number of full games to play")
+    parser.add_argument('--players', type=int, default=4, help="players per game (2-8)")
+    parser.add_argument('--budget', type=float, default=0.05, help="search time per move in seconds")
+    parser.add_argument('--iterations', type=int, default=None, help="playouts per move (overrides --budget)")
+    parser.add_argument('--seed', type=int, default=0, help="base seed")
+    parser.add_argument('--opponents', choices=sorted(CPU_POLICIES), default='belief', help="policy of the other seats")
+    args = parser.parse_args(argv)
+
+    budget = None if args.iterations else args.budget
+    policy = ISMCTSPolicy(time_budget=budget, iterations=args.iterations, seed=args.seed)
+    rng = random.Random(args.seed)
+    rounds = round_wins = game_wins = 0
+    for _ in range(args.games):
+        game = HeadlessGame(args.players, seed=rng.getrandbits(64), cpu_policy=CPU_POLICIES[args.opponents]())
+        game.players[0].cpu_policy = policy
+        game.play()
+        game_wins += game.game_winner.id == 0
+        rounds += len(game.round_results)
+        round_wins += sum(1 for r in game.round_results if any(p.id == 0 for p in r.winners))
+
+    fair = 1 / args.players
+    print(f"Ghế 0 (ISMCTS) thắng {game_wins}/{args.games} ván ({game_wins / args.games:.3f}), "
+          f"{round_wins}/{rounds} vòng ({round_wins / rounds:.3f}); chia đều là {fair:.3f}.")
+    if policy.total_search_time > 0:
+        print(f"Mô phỏng: {policy.total_playouts} ván trong {policy.total_search_time:.2f}s "
+              f"({policy.total_playouts / policy.total_search_time:,.0f} ván/giây).")
+
+
+if __name__ == '__main__':
+    main()
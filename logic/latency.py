@@ -0,0 +1,266 @@
+# file: logic/latency.py
+"""
+Opt-in latency instrumentation for rounds.
+
+A LatencyRecorder keeps one HDR-style histogram per named span. Nothing is
+recorded unless a recorder is attached with `GameRound.instrument(recorder)`;
+an uninstrumented round only pays a `self.latency is None` check at each hook.
+Once attached, the round records:
+
+    phase.<phase>       run time of each phase handler (deal, draw, choose, ...)
+    turn                wall time of a turn, from its draw phase to the next advance/score
+    card_played         `_handle_card_played_logic`, plus any phases it runs inline (headless CPU turns)
+    cpu.delay           CPU "thinking" pause, from scheduling to the turn starting
+    cpu.policy          policy `begin_turn` until the policy is ready (background search)
+    effect.<card>       wall time of a card effect, animations and popups included
+    effect.<card>.cpu   time spent inside the effect generator itself
+    elimination(.cpu)   likewise for eliminations outside card effects (Princess)
+    ui.<callback>       synchronous run time of a UI callback
+    ui.<callback>.wait  time until the callback calls its continuation (animation, popup answer)
+
+Recorders merge, pickle (simulation workers) and export a text summary or JSON.
+
+    recorder = LatencyRecorder()
+    game_round.instrument(recorder)
+    ...
+    print(recorder.summary())
+"""
+import functools
+import json
+from contextlib import contextmanager
+from time import perf_counter
+
+SUB_BUCKET_BITS = 7  # 64-128 sub-buckets per power of two: values are kept within 1/64 (~1.6%)
+_SUB_BUCKET_MASK = (1 << SUB_BUCKET_BITS) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations in whole microseconds, in the style of HdrHistogram.
+
+    Values below 2**SUB_BUCKET_BITS are counted exactly; larger ones fall into buckets
+    whose width is at most 1/64 of their value, so percentiles keep ~1.6% precision
+    from microseconds to minutes in a few hundred buckets. Count, sum, min and max are exact.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = {}  # bucket key -> count
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def _bucket(value):
+        shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+        return (shift << SUB_BUCKET_BITS) | (value >> shift)
+
+    @staticmethod
+    def _highest_in_bucket(key):
+        shift = key >> SUB_BUCKET_BITS
+        return (((key & _SUB_BUCKET_MASK) + 1) << shift) - 1
+
+    def record(self, micros):
+        micros = max(int(micros), 0)
+        key = self._bucket(micros)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total += micros
+        if self.min is None or micros < self.min:
+            self.min = micros
+        if micros > self.max:
+            self.max = micros
+
+    def merge(self, other):
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """The smallest recorded value (to bucket precision) that `percent`% of samples do not exceed."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return min(self._highest_in_bucket(key), self.max)
+        return self.max
+
+
+class LatencyRecorder:
+    """Named latency histograms, with span, decorator and callback-wrapping hooks to fill them."""
+
+    def __init__(self):
+        self.histograms = {}
+        self._open = {}  # name -> start time of a span opened with begin()
+
+    def record(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(seconds * 1e6)
+
+    @contextmanager
+    def span(self, name):
+        """Context manager recording the time spent in its block."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - start)
+
+    def begin(self, name):
+        """Opens a span that `end(name)` closes, for intervals that cross callbacks."""
+        self._open[name] = perf_counter()
+
+    def end(self, name):
+        start = self._open.pop(name, None)
+        if start is not None:
+            self.record(name, perf_counter() - start)
+
+    def until(self, name, callback):
+        """Wraps `callback` to record the time from now until it is first called."""
+        start = perf_counter()
+        called = []
+
+        def timed_callback(*args, **kwargs):
+            if not called:
+                called.append(True)
+                self.record(name, perf_counter() - start)
+            return callback(*args, **kwargs)
+        return timed_callback
+
+    def timed_steps(self, name, steps):
+        """
+        Wraps an effect generator (see effect_requests.py): records its wall time as `name`
+        and the time spent running its own code as `name.cpu`. Cancelled effects are not recorded.
+        """
+        start = perf_counter()
+        busy = 0.0
+        answer = None
+        try:
+            while True:
+                resumed = perf_counter()
+                try:
+                    request = steps.send(answer)
+                except StopIteration:
+                    busy += perf_counter() - resumed
+                    break
+                busy += perf_counter() - resumed
+                answer = yield request
+        finally:
+            steps.close()
+        self.record(name, perf_counter() - start)
+        self.record(name + '.cpu', busy)
+
+    def wrap_callbacks(self, callbacks, prefix='ui.'):
+        """
+        A copy of a GameRound UI callback dict whose callbacks record their run time as
+        `ui.<name>`; continuations passed to them record `ui.<name>.wait` when called.
+        """
+        wrapped = {}
+        for key, callback in callbacks.items():
+            name = prefix + (key[:-len('_callback')] if key.endswith('_callback') else key)
+            wrapped[key] = self._wrap_callback(name, callback)
+        return wrapped
+
+    def _wrap_callback(self, name, callback):
+        wait_name = name + '.wait'
+
+        @functools.wraps(callback)
+        def timed_callback(*args):
+            if any(callable(arg) for arg in args):
+                # Continuations (e.g. select / cancel of a popup): the first one called ends the wait.
+                start = perf_counter()
+                called = []
+
+                def continuation(fn):
+                    def resume(*resume_args):
+                        if not called:
+                            called.append(True)
+                            self.record(wait_name, perf_counter() - start)
+                        return fn(*resume_args)
+                    return resume
+                args = tuple(continuation(arg) if callable(arg) else arg for arg in args)
+            started = perf_counter()
+            try:
+                return callback(*args)
+            finally:
+                self.record(name, perf_counter() - started)
+        return timed_callback
+
+    def merge(self, other):
+        for name, histogram in other.histograms.items():
+            into = self.histograms.get(name)
+            if into is None:
+                into = self.histograms[name] = LatencyHistogram()
+            into.merge(histogram)
+
+    def clear(self):
+        self.histograms.clear()
+        self._open.clear()
+
+    def to_dict(self):
+        """Per span: count, total seconds and mean/p50/p90/p99/max in milliseconds."""
+        return {
+            name: {
+                'count': h.count,
+                'total_s': h.total / 1e6,
+                'mean_ms': h.mean / 1e3,
+                'p50_ms': h.percentile(50) / 1e3,
+                'p90_ms': h.percentile(90) / 1e3,
+                'p99_ms': h.percentile(99) / 1e3,
+                'max_ms': h.max / 1e3,
+            }
+            for name, h in sorted(self.histograms.items(), key=lambda item: -item[1].total)
+        }
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary(self):
+        """A text table of every span, the ones taking the most total time first."""
+        rows = self.to_dict()
+        if not rows:
+            return "Chưa ghi nhận độ trễ nào."
+        width = max(len("Giai đoạn"), max(len(name) for name in rows))
+        lines = [f"{'Giai đoạn':<{width}} | {'Số lần':>7} | {'Tổng (s)':>9} | {'TB (ms)':>9} | "
+                 f"{'p50':>9} | {'p90':>9} | {'p99':>9} | {'Max':>9}"]
+        for name, row in rows.items():
+            lines.append(f"{name:<{width}} | {row['count']:>7} | {row['total_s']:>9.3f} | {row['mean_ms']:>9.3f} | "
+                         f"{row['p50_ms']:>9.3f} | {row['p90_ms']:>9.3f} | {row['p99_ms']:>9.3f} | "
+                         f"{row['max_ms']:>9.3f}")
+        return "\n".join(lines)
+
+
+def timed(name):
+    """
+    Decorator for GameRound methods: records each call as `name` while the round
+    is instrumented (`self.latency` set); otherwise just calls through.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            latency = self.latency
+            if latency is None:
+                return method(self, *args, **kwargs)
+            start = perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                latency.record(name, perf_counter() - start)
+        return wrapper
+    return decorator
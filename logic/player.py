@@ -1,6 +1,18 @@
 # file: logic/player.py
+from .constants import CARDS_BY_ID
+
+# Bit flags of the packed snapshot (see Player.pack).
+FLAG_ELIMINATED = 1
+FLAG_PROTECTED = 2
+FLAG_SYCOPHANT_TARGET_SELF = 4
+
+
 class Player:
-    def __init__(self, id_num, name, is_cpu=False):
+    __slots__ = ('id', 'name', 'hand', 'discard_pile', 'tokens', 'is_eliminated', 'is_protected', 'is_cpu',
+                 'sycophant_target_self', 'jester_on_player_id', 'effective_value_end_round',
+                 'discard_sum_end_round', 'cpu_policy')
+
+    def __init__(self, id_num, name, is_cpu=False, cpu_policy=None):
         self.id = id_num
         self.name = name
         self.hand = []
@@ -13,6 +25,7 @@ class Player:
         self.jester_on_player_id = None
         self.effective_value_end_round = 0
         self.discard_sum_end_round = 0
+        self.cpu_policy = cpu_policy  # None -> cpu_policy.DEFAULT_CPU_POLICY
 
     def reset_for_round(self):
         self.hand = []
@@ -24,6 +37,35 @@ class Player:
         self.effective_value_end_round = 0
         self.discard_sum_end_round = 0
 
+    def pack(self):
+        """
+        Packed snapshot of the per-round state: a flat tuple
+        (hand card ids as bytes, discard card ids as bytes, tokens, flag bits, jester_on_player_id).
+        Identity (id, name, is_cpu) is not included; `unpack` restores onto the same or an equivalent player.
+        """
+        flags = ((FLAG_ELIMINATED if self.is_eliminated else 0)
+                 | (FLAG_PROTECTED if self.is_protected else 0)
+                 | (FLAG_SYCOPHANT_TARGET_SELF if self.sycophant_target_self else 0))
+        return (bytes([c.card_id for c in self.hand]), bytes([c.card_id for c in self.discard_pile]),
+                self.tokens, flags, self.jester_on_player_id)
+
+    def unpack(self, packed):
+        """Restores the state captured by `pack`. End-of-round scoring values are reset."""
+        hand_ids, discard_ids, self.tokens, flags, self.jester_on_player_id = packed
+        self.hand = [CARDS_BY_ID[i] for i in hand_ids]
+        self.discard_pile = [CARDS_BY_ID[i] for i in discard_ids]
+        self.is_eliminated = bool(flags & FLAG_ELIMINATED)
+        self.is_protected = bool(flags & FLAG_PROTECTED)
+        self.sycophant_target_self = bool(flags & FLAG_SYCOPHANT_TARGET_SELF)
+        self.effective_value_end_round = 0
+        self.discard_sum_end_round = 0
+
+    def clone(self):
+        """An independent copy of this player (cards are shared, immutable prototypes)."""
+        twin = Player(self.id, self.name, self.is_cpu, self.cpu_policy)
+        twin.unpack(self.pack())
+        return twin
+
     def add_card_to_hand(self, card):
         if card:
             self.hand.append(card)
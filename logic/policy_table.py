@@ -0,0 +1,127 @@
+# file: logic/policy_table.py
+"""
+Precomputed CPU decisions, stored in a compact binary table read through mmap.
+
+A situation is (player count, two-card hand, bucket of the face-up cards). The
+bucket summarizes the visible discard multiset in one byte: how far the round
+has gone (face-up cards // 3, capped at 3) and which of the values 2-7 have
+no copy left unseen. Each situation has one entry byte:
+
+    bits 0-3  Guard guess (card value), NO_GUESS when there is no data
+    bits 4-5  card to play: PLAY_FIRST / PLAY_SECOND (the lower / higher card id), 0 when no data
+
+File layout (little-endian): the header below, then one byte per situation at
+`situation_index(...)`. The table is built offline by tools/build_policy_table.py
+from bulk headless simulation; the game maps the file read-only, so loading it
+costs one mmap call and every decision is a single byte read. Without a table
+file, `load_policy_table()` returns None and CPU players think as usual.
+"""
+import mmap
+import os
+import struct
+
+from .constants import CARD_NAMES_BY_ID, CARD_IDS, resource_path
+
+MAGIC = b'LLPT'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBHH')  # magic, version, min players, max players, hands, buckets
+MIN_PLAYERS, MAX_PLAYERS = 2, 8
+
+NUM_CARDS = len(CARD_NAMES_BY_ID)
+NUM_HANDS = NUM_CARDS * (NUM_CARDS + 1) // 2
+PHASES = 4
+PHASE_STEP = 3  # face-up cards per phase
+EXHAUSTED_VALUES = tuple(range(2, 8))
+NUM_BUCKETS = PHASES << len(EXHAUSTED_VALUES)
+
+NO_GUESS = 0xF
+PLAY_FIRST, PLAY_SECOND = 1, 2
+
+GUARD_ID = CARD_IDS['Guard']
+DEFAULT_TABLE_PATH = resource_path(os.path.join('assets', 'cpu_policy_table.bin'))
+
+
+def hand_index(card_id_a, card_id_b):
+    """Index of an unordered pair of card ids."""
+    low, high = (card_id_a, card_id_b) if card_id_a <= card_id_b else (card_id_b, card_id_a)
+    return high * (high + 1) // 2 + low
+
+
+def discard_bucket(game_round):
+    """Bucket of the cards the whole table has seen face up, from the round's BeliefTracker."""
+    remaining = game_round.beliefs.remaining
+    composition = game_round.composition
+    visible = composition.total - sum(remaining)
+    bucket = min(visible // PHASE_STEP, PHASES - 1) << len(EXHAUSTED_VALUES)
+    for bit, value in enumerate(EXHAUSTED_VALUES):
+        if composition.counts_by_value[value] and not remaining[value]:
+            bucket |= 1 << bit
+    return bucket
+
+
+def situation_index(num_players, card_id_a, card_id_b, bucket):
+    return ((num_players - MIN_PLAYERS) * NUM_HANDS + hand_index(card_id_a, card_id_b)) * NUM_BUCKETS + bucket
+
+
+def table_size():
+    return (MAX_PLAYERS - MIN_PLAYERS + 1) * NUM_HANDS * NUM_BUCKETS
+
+
+def write_policy_table(path, entries):
+    """Writes `entries` (a bytes-like of table_size() entry bytes) with its header."""
+    if len(entries) != table_size():
+        raise ValueError(f"expected {table_size()} entries, got {len(entries)}")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, MIN_PLAYERS, MAX_PLAYERS, NUM_HANDS, NUM_BUCKETS))
+        f.write(entries)
+
+
+class PolicyTable:
+    """A policy table mapped read-only into memory. Lookups return None where the table has no data."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, min_players, max_players, hands, buckets = HEADER.unpack_from(self._map, 0)
+        if (magic, version, min_players, max_players, hands, buckets) != (
+                MAGIC, VERSION, MIN_PLAYERS, MAX_PLAYERS, NUM_HANDS, NUM_BUCKETS):
+            self._map.close()
+            raise ValueError(f"{path} is not a policy table for this version of the game")
+        if len(self._map) != HEADER.size + table_size():
+            self._map.close()
+            raise ValueError(f"{path} is truncated")
+        self.path = path
+
+    def entry(self, num_players, card_id_a, card_id_b, bucket):
+        return self._map[HEADER.size + situation_index(num_players, card_id_a, card_id_b, bucket)]
+
+    def card_to_play(self, game_round, hand):
+        """Which of the two cards in `hand` to play, or None."""
+        a, b = hand[0].card_id, hand[1].card_id
+        play = self.entry(len(game_round.players), a, b, discard_bucket(game_round)) >> 4
+        if not play:
+            return None
+        first, second = (hand[0], hand[1]) if a <= b else (hand[1], hand[0])
+        return first if play == PLAY_FIRST else second
+
+    def guard_guess(self, game_round, kept_card):
+        """The value to name with a Guard just played next to `kept_card`, or None."""
+        guess = self.entry(len(game_round.players), GUARD_ID, kept_card.card_id, discard_bucket(game_round)) & 0xF
+        return None if guess == NO_GUESS else guess
+
+    def close(self):
+        self._map.close()
+
+
+_loaded = {}
+
+
+def load_policy_table(path=DEFAULT_TABLE_PATH):
+    """The table at `path`, mapped once per process; None if there is no usable table."""
+    if path not in _loaded:
+        try:
+            _loaded[path] = PolicyTable(path)
+        except (OSError, ValueError):
+            _loaded[path] = None
+    return _loaded[path]
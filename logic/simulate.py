@@ -0,0 +1,207 @@
+# file: logic/simulate.py
+"""
+Bulk Monte Carlo simulation of CPU-only games.
+
+Usage:
+    python -m logic.simulate --games 10000 --players 4 --seed 42
+    python -m logic.simulate --games 200 --latency   # plus per-phase latency histograms
+
+Games are split into fixed-size batches, each with its own seed derived from
+--seed and the batch index, and the batches are played across a process pool.
+Because the batch layout does not depend on --workers, the aggregated results
+are identical for a given (--games, --batch-size, --seed) on any machine.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from collections import Counter
+
+from .cpu_policy import CPU_POLICIES
+from .headless import HeadlessGame
+from .latency import LatencyRecorder
+
+MIN_PLAYERS, MAX_PLAYERS = 2, 8
+
+
+class SimulationStats:
+    """Aggregated counters for a batch of simulated games. Batches merge with `merge`."""
+
+    def __init__(self):
+        self.games = 0
+        self.rounds = 0
+        self.turns = 0
+        self.drawn_rounds = 0
+        self.game_wins_by_seat = Counter()
+        self.round_wins_by_seat = Counter()
+        self.round_wins_by_turn_order = Counter()  # 0 = the player who went first
+        self.cards_played = Counter()
+        self.cards_played_by_round_winner = Counter()
+        self.round_lengths = Counter()  # turns per round -> number of rounds
+        self.elapsed = 0.0
+        self.latency = None  # LatencyRecorder when the simulation measures latency
+
+    def record_game(self, game):
+        self.games += 1
+        self.game_wins_by_seat[game.game_winner.id] += 1
+        num_players = game.num_players
+        for result in game.round_results:
+            self.rounds += 1
+            self.turns += result.turns_played
+            self.round_lengths[result.turns_played] += 1
+            winner_ids = {p.id for p in result.winners}
+            if not winner_ids:
+                self.drawn_rounds += 1
+            for winner_id in winner_ids:
+                self.round_wins_by_seat[winner_id] += 1
+                self.round_wins_by_turn_order[(winner_id - result.first_player_idx) % num_players] += 1
+            for player_id, card_name in result.play_history:
+                self.cards_played[card_name] += 1
+                if player_id in winner_ids:
+                    self.cards_played_by_round_winner[card_name] += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.rounds += other.rounds
+        self.turns += other.turns
+        self.drawn_rounds += other.drawn_rounds
+        self.game_wins_by_seat.update(other.game_wins_by_seat)
+        self.round_wins_by_seat.update(other.round_wins_by_seat)
+        self.round_wins_by_turn_order.update(other.round_wins_by_turn_order)
+        self.cards_played.update(other.cards_played)
+        self.cards_played_by_round_winner.update(other.cards_played_by_round_winner)
+        self.round_lengths.update(other.round_lengths)
+        self.elapsed += other.elapsed
+        if other.latency is not None:
+            if self.latency is None:
+                self.latency = LatencyRecorder()
+            self.latency.merge(other.latency)
+
+    def to_dict(self, num_players):
+        seats = range(num_players)
+        return {
+            'games': self.games,
+            'rounds': self.rounds,
+            'drawn_rounds': self.drawn_rounds,
+            'mean_round_length': self.turns / self.rounds if self.rounds else 0.0,
+            'round_length_histogram': dict(sorted(self.round_lengths.items())),
+            'game_win_rate_by_seat': {s: self.game_wins_by_seat[s] / self.games for s in seats} if self.games else {},
+            'round_win_rate_by_seat': {s: self.round_wins_by_seat[s] / self.rounds for s in seats} if self.rounds else {},
+            'round_win_rate_by_turn_order': {s: self.round_wins_by_turn_order[s] / self.rounds for s in seats} if self.rounds else {},
+            'cards_played': dict(self.cards_played.most_common()),
+            'round_win_rate_by_card_played': {
+                name: self.cards_played_by_round_winner[name] / count
+                for name, count in self.cards_played.most_common()
+            },
+        }
+
+
+def batch_seed(base_seed, batch_index):
+    """Seed for one batch; independent of how batches are spread over workers."""
+    return base_seed * 1_000_003 + batch_index
+
+
+def run_batch(task):
+    """Worker entry point: plays `num_games` games and returns their SimulationStats."""
+    seed, num_games, num_players, tokens_to_win, policy_name, measure_latency = task
+    rng = random.Random(seed)
+    policy = CPU_POLICIES[policy_name]()
+    stats = SimulationStats()
+    if measure_latency:
+        stats.latency = LatencyRecorder()
+    start = time.perf_counter()
+    for _ in range(num_games):
+        game = HeadlessGame(num_players, tokens_to_win=tokens_to_win, seed=rng.getrandbits(64), cpu_policy=policy,
+                            latency=stats.latency)
+        game.play()
+        stats.record_game(game)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def run_simulation(num_games, num_players, tokens_to_win=None, seed=0, workers=None, batch_size=200, policy='belief',
+                   measure_latency=False):
+    """
+    Plays `num_games` games over a process pool and returns the merged SimulationStats.
+    With `measure_latency`, its `latency` holds the rounds' merged LatencyRecorder.
+    """
+    if not MIN_PLAYERS <= num_players <= MAX_PLAYERS:
+        raise ValueError(f"num_players must be between {MIN_PLAYERS} and {MAX_PLAYERS}, got {num_players}")
+    if policy not in CPU_POLICIES:
+        raise ValueError(f"unknown policy {policy!r}, expected one of {sorted(CPU_POLICIES)}")
+
+    tasks = []
+    for batch_index, first_game in enumerate(range(0, num_games, batch_size)):
+        games_in_batch = min(batch_size, num_games - first_game)
+        tasks.append((batch_seed(seed, batch_index), games_in_batch, num_players, tokens_to_win, policy, measure_latency))
+
+    total = SimulationStats()
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            total.merge(run_batch(task))
+        return total
+
+    with multiprocessing.Pool(processes=workers) as pool:
+        for stats in pool.imap_unordered(run_batch, tasks):
+            total.merge(stats)
+    return total
+
+
+def _format_report(report, num_players, wall_time):
+    lines = [
+        f"Trò chơi: {report['games']}  Vòng: {report['rounds']}  (hòa/không ai thắng: {report['drawn_rounds']})",
+        f"Thời gian: {wall_time:.2f}s  ({report['rounds'] / wall_time * 60:,.0f} vòng/phút)" if wall_time > 0 else "",
+        f"Độ dài vòng trung bình: {report['mean_round_length']:.2f} lượt",
+        "",
+        "Ghế | Thắng ván | Thắng vòng | Thắng vòng theo thứ tự đi",
+    ]
+    for seat in range(num_players):
+        lines.append(f"{seat:>3} | {report['game_win_rate_by_seat'].get(seat, 0):>9.3f} | "
+                     f"{report['round_win_rate_by_seat'].get(seat, 0):>10.3f} | "
+                     f"{report['round_win_rate_by_turn_order'].get(seat, 0):>10.3f}")
+    lines += ["", "Lá bài        | Số lần chơi | Tỉ lệ thắng vòng của người chơi"]
+    for name, count in report['cards_played'].items():
+        lines.append(f"{name:<13} | {count:>11} | {report['round_win_rate_by_card_played'][name]:.3f}")
+    lines += ["", "Độ dài vòng (lượt: số vòng): " +
+              ", ".join(f"{k}: {v}" for k, v in report['round_length_histogram'].items())]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m logic.simulate", description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=1000, help="number of full games to play")
+    parser.add_argument('--players', type=int, default=4, help=f"players per game ({MIN_PLAYERS}-{MAX_PLAYERS})")
+    parser.add_argument('--tokens', type=int, default=None, help="tokens needed to win (default: by player count)")
+    parser.add_argument('--seed', type=int, default=0, help="base seed; identical seeds give identical results")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--batch-size', type=int, default=200, help="games per worker task")
+    parser.add_argument('--policy', choices=sorted(CPU_POLICIES), default='belief', help="CPU policy for every seat")
+    parser.add_argument('--json', action='store_true', help="print the aggregated results as JSON")
+    parser.add_argument('--latency', action='store_true', help="also report per-phase latency histograms")
+    args = parser.parse_args(argv)
+
+    if not MIN_PLAYERS <= args.players <= MAX_PLAYERS:
+        parser.error(f"--players must be between {MIN_PLAYERS} and {MAX_PLAYERS}")
+
+    start = time.perf_counter()
+    stats = run_simulation(args.games, args.players, args.tokens, args.seed, args.workers, args.batch_size,
+                           args.policy, args.latency)
+    wall_time = time.perf_counter() - start
+    report = stats.to_dict(args.players)
+    if stats.latency is not None:
+        report['latency'] = stats.latency.to_dict()
+
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(_format_report(report, args.players, wall_time))
+        if stats.latency is not None:
+            print("\nĐộ trễ theo giai đoạn (ms):")
+            print(stats.latency.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# file: logic/transposition.py
+"""
+A bounded transposition table for search results.
+
+TranspositionTable maps position keys (any hashable canonical encoding of a
+position, e.g. the endgame solver's state tuples) to search results in bounded
+memory, with depth-preferred or LRU replacement and hit-rate counters.
+"""
+from collections import OrderedDict
+
+# Replacement policies of TranspositionTable.
+DEPTH_PREFERRED = 'depth'
+LRU = 'lru'
+
+
+class TranspositionTable:
+    """
+    Bounded cache of search results keyed by position.
+
+    DEPTH_PREFERRED: `capacity` slots addressed by the key's hash (lookups go through a
+    dict of the slots' occupants, so a hit costs one dict probe). A new entry
+    replaces the slot's occupant if it is the same position, comes from a later
+    search generation (`new_search()`), or was searched at least as deep; otherwise
+    it is dropped, so expensive results survive cheap ones.
+    LRU: up to `capacity` entries; the least recently used one is evicted.
+
+    `depth` is whatever measures the work behind a result (plies searched, cards
+    left in the deck). `probes`, `hits`, `stores` and `evictions` count table traffic.
+    """
+
+    def __init__(self, capacity=1 << 16, policy=DEPTH_PREFERRED):
+        if policy not in (DEPTH_PREFERRED, LRU):
+            raise ValueError(f"Unknown replacement policy: {policy!r}")
+        self.capacity = capacity
+        self.policy = policy
+        self.generation = 0
+        self.probes = self.hits = self.stores = self.evictions = 0
+        self._entries = {}  # key -> (value, depth, generation)
+        self._owners = [None] * capacity if policy == DEPTH_PREFERRED else None  # slot -> key stored there
+        self._lru = OrderedDict() if policy == LRU else None
+
+    def new_search(self):
+        """Marks every stored entry as replaceable by the next search (entries stay readable)."""
+        self.generation += 1
+
+    def get(self, key):
+        """The value stored for `key`, or None."""
+        self.probes += 1
+        if self._lru is not None:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+            return value
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def store(self, key, value, depth=0):
+        if self._lru is not None:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            self.stores += 1
+            if len(self._lru) > self.capacity:
+                self._lru.popitem(last=False)
+                self.evictions += 1
+            return
+        index = hash(key) % self.capacity
+        owner = self._owners[index]
+        if owner is not None and owner != key:
+            _, owner_depth, owner_generation = self._entries[owner]
+            if owner_generation == self.generation and owner_depth > depth:
+                return
+            del self._entries[owner]
+            self.evictions += 1
+        self._owners[index] = key
+        self._entries[key] = (value, depth, self.generation)
+        self.stores += 1
+
+    def clear(self):
+        if self._lru is not None:
+            self._lru.clear()
+        else:
+            self._entries.clear()
+            self._owners = [None] * self.capacity
+
+    def __len__(self):
+        return len(self._lru) if self._lru is not None else len(self._entries)
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
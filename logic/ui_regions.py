@@ -0,0 +1,17 @@
+# file: logic/ui_regions.py
+"""
+Screen regions a game state change can affect.
+
+GameRound ORs these together and passes them to the UI's
+`update_ui_full_callback(regions)`, so the UI can redraw only the stale parts
+and coalesce several requests into one redraw per frame. The log is not a
+region: the log panel appends its own lines as they arrive.
+"""
+
+UI_SCORE = 1        # tokens of every player
+UI_TURN = 2         # whose turn it is, round state, action button
+UI_DECK = 4         # draw pile count
+UI_DISCARDS = 8     # recently played cards
+UI_OPPONENTS = 16   # opponents' panels (hand back, protection, elimination, last discard)
+UI_HAND = 32        # the human player's hand
+UI_ALL = UI_SCORE | UI_TURN | UI_DECK | UI_DISCARDS | UI_OPPONENTS | UI_HAND
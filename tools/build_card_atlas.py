@@ -0,0 +1,73 @@
+# file: tools/build_card_atlas.py
+"""
+Packs the card art in assets/cards into Kivy atlases for ui/textures.py.
+
+    python tools/build_card_atlas.py
+
+writes, each with its PNG pages:
+    assets/atlas/cards-full.atlas   original size (hand, popups, effect panel)
+    assets/atlas/cards-small.atlas  downscaled (card flights, opponent panels)
+
+Requires Pillow. Rerun after changing any card image. The game falls back to
+the image files while no atlas exists, so the atlases are a build artifact.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from PIL import Image
+from kivy.atlas import Atlas
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARDS_DIR = os.path.join(ROOT, 'assets', 'cards')
+ATLAS_DIR = os.path.join(ROOT, 'assets', 'atlas')
+# Reference sheets and tutorial pictures are only shown on their own, never as card widgets.
+EXCLUDED_PREFIXES = ('card_list_', 'instruct')
+SMALL_SIZE = (100, 140)
+
+
+def card_images():
+    """Card image paths, one per name (PNG preferred over JPG, as in logic/constants.py)."""
+    by_name = {}
+    for filename in sorted(os.listdir(CARDS_DIR)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() not in ('.png', '.jpg') or filename.startswith(EXCLUDED_PREFIXES):
+            continue
+        if name not in by_name or ext.lower() == '.png':
+            by_name[name] = os.path.join(CARDS_DIR, filename)
+    return list(by_name.values())
+
+
+def build_variant(variant, images, page_size, scale_to=None):
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        if scale_to:
+            scaled = []
+            for path in images:
+                out = os.path.join(tmp, os.path.splitext(os.path.basename(path))[0] + '.png')
+                with Image.open(path) as image:
+                    image.convert('RGBA').resize(scale_to, Image.LANCZOS).save(out)
+                scaled.append(out)
+            images = scaled
+        result = Atlas.create(os.path.join(ATLAS_DIR, f'cards-{variant}'), images, page_size)
+    if not result:
+        sys.exit(f"Could not pack the '{variant}' atlas; try a larger --page-size.")
+    filename, meta = result
+    print(f"{filename}: {len(images)} images on {len(meta)} page(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the card texture atlases.")
+    parser.add_argument('--page-size', type=int, default=4096, help="Full-size atlas page size in pixels.")
+    parser.add_argument('--small-size', type=int, nargs=2, default=SMALL_SIZE, metavar=('W', 'H'),
+                        help="Size of the downscaled variant.")
+    args = parser.parse_args(argv)
+
+    images = card_images()
+    build_variant('full', images, args.page_size)
+    build_variant('small', images, 1024, scale_to=tuple(args.small_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+# file: tools/build_policy_table.py
+"""
+Builds assets/cpu_policy_table.bin for TablePolicy (see logic/policy_table.py).
+
+    python tools/build_policy_table.py --rounds 50000 --players 2-8
+
+Plays --rounds headless rounds per player count with card-counting CPUs. A share
+of their card choices (--explore) is made at random instead, and each of those
+is credited with whether the player went on to win the round; per situation the
+table keeps the card with the higher win rate. At every Guard play on an unknown
+hand the target's actual card is counted, and the table keeps the most frequent
+value. Situations seen fewer than --min-samples times (per option) stay empty,
+and the CPU thinks as usual there.
+
+Results depend only on --seed and the batch layout, never on --workers. Rerun
+after changing the deck or card rules; the game runs without the table.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from logic.constants import composition_for  # noqa: E402
+from logic.cpu_policy import BeliefPolicy  # noqa: E402
+from logic.headless import HeadlessGame  # noqa: E402
+from logic.policy_table import (DEFAULT_TABLE_PATH, GUARD_ID, MIN_PLAYERS, MAX_PLAYERS, NO_GUESS,  # noqa: E402
+                                NUM_BUCKETS, NUM_HANDS, PLAY_FIRST, PLAY_SECOND, discard_bucket,
+                                situation_index, table_size, write_policy_table)
+
+
+class RecordingPolicy(BeliefPolicy):
+    """BeliefPolicy that explores card choices and records what it needs for the table."""
+
+    def __init__(self, explore, rng):
+        self.explore = explore
+        self.rng = rng
+        self.pending = []  # (situation, option, player id) for this round's explored choices
+        self.guesses = {}  # situation -> count of each actual value at Guard plays
+
+    def choose_card(self, game_round, player, playable_cards):
+        if (len(playable_cards) == 2 and playable_cards[0].name != playable_cards[1].name
+                and self.rng.random() < self.explore):
+            a, b = playable_cards
+            card = self.rng.choice(playable_cards)
+            first = a if a.card_id <= b.card_id else b
+            situation = situation_index(len(game_round.players), a.card_id, b.card_id, discard_bucket(game_round))
+            self.pending.append((situation, 0 if card is first else 1, player.id))
+            return card
+        return super().choose_card(game_round, player, playable_cards)
+
+    def choose_guard_guess(self, game_round, player, target, possible_values):
+        if (target.hand and player.hand and game_round.play_history[-1] == (player.id, 'Guard')
+                and game_round.beliefs.known_value(player, target) is None):
+            situation = situation_index(len(game_round.players), GUARD_ID, player.hand[0].card_id,
+                                        discard_bucket(game_round))
+            counts = self.guesses.setdefault(situation, [0] * NO_GUESS)
+            counts[target.hand[0].value] += 1
+        return super().choose_guard_guess(game_round, player, target, possible_values)
+
+
+def run_batch(task):
+    """Worker entry point: plays `rounds` rounds and returns (play stats, guess counts)."""
+    seed, rounds, num_players, explore = task
+    rng = random.Random(seed)
+    policy = RecordingPolicy(explore, random.Random(rng.getrandbits(64)))
+    plays = {}  # situation -> [tries first, wins first, tries second, wins second]
+    game = None
+    for _ in range(rounds):
+        if game is None or game.game_winner is not None:
+            game = HeadlessGame(num_players, seed=rng.getrandbits(64), cpu_policy=policy)
+        result = game.play_round()
+        winner_ids = {p.id for p in result.winners}
+        for situation, option, player_id in policy.pending:
+            stats = plays.setdefault(situation, [0, 0, 0, 0])
+            stats[2 * option] += 1
+            stats[2 * option + 1] += player_id in winner_ids
+        policy.pending.clear()
+    return plays, policy.guesses
+
+
+def merge(total, part):
+    for situation, counts in part.items():
+        into = total.setdefault(situation, [0] * len(counts))
+        for i, count in enumerate(counts):
+            into[i] += count
+
+
+def build_entries(plays, guesses, min_samples):
+    """The table bytes, plus how many play and guess entries were filled."""
+    entries = bytearray([NO_GUESS]) * table_size()
+    filled_plays = filled_guesses = 0
+    for situation, (tries_a, wins_a, tries_b, wins_b) in plays.items():
+        if tries_a >= min_samples and tries_b >= min_samples:
+            entries[situation] |= (PLAY_FIRST if wins_a / tries_a >= wins_b / tries_b else PLAY_SECOND) << 4
+            filled_plays += 1
+    for situation, counts in guesses.items():
+        num_players = situation // (NUM_HANDS * NUM_BUCKETS) + MIN_PLAYERS
+        guessable = composition_for(num_players).guard_guess_values
+        if sum(counts) >= min_samples:
+            best = max(guessable, key=lambda v: counts[v])
+            entries[situation] = (entries[situation] & 0xF0) | best
+            filled_guesses += 1
+    return entries, filled_plays, filled_guesses
+
+
+def parse_players(text):
+    low, _, high = text.partition('-')
+    low, high = int(low), int(high or low)
+    if not MIN_PLAYERS <= low <= high <= MAX_PLAYERS:
+        raise argparse.ArgumentTypeError(f"player counts must be within {MIN_PLAYERS}-{MAX_PLAYERS}")
+    return range(low, high + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=50000, help="rounds to play per player count")
+    parser.add_argument('--players', type=parse_players, default=parse_players('2-8'), help="player counts, e.g. 2-4")
+    parser.add_argument('--explore', type=float, default=0.25, help="share of card choices made at random")
+    parser.add_argument('--min-samples', type=int, default=30, help="observations needed to fill an entry")
+    parser.add_argument('--seed', type=int, default=0, help="base seed")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--batch-size', type=int, default=2000, help="rounds per worker task")
+    parser.add_argument('--out', default=DEFAULT_TABLE_PATH, help="table file to write")
+    args = parser.parse_args(argv)
+
+    tasks = []
+    for num_players in args.players:
+        for batch_index, first_round in enumerate(range(0, args.rounds, args.batch_size)):
+            rounds = min(args.batch_size, args.rounds - first_round)
+            seed = (args.seed * 1_000_003 + batch_index) * 16 + num_players
+            tasks.append((seed, rounds, num_players, args.explore))
+
+    start = time.perf_counter()
+    plays, guesses = {}, {}
+    if args.workers == 1:
+        for part_plays, part_guesses in map(run_batch, tasks):
+            merge(plays, part_plays)
+            merge(guesses, part_guesses)
+    else:
+        with multiprocessing.Pool(processes=args.workers) as pool:
+            for part_plays, part_guesses in pool.imap_unordered(run_batch, tasks):
+                merge(plays, part_plays)
+                merge(guesses, part_guesses)
+
+    entries, filled_plays, filled_guesses = build_entries(plays, guesses, args.min_samples)
+    write_policy_table(args.out, entries)
+    print(f"{args.out}: {len(entries)} tình huống, {filled_plays} có nước đi, {filled_guesses} có lời đoán Cận vệ "
+          f"({time.perf_counter() - start:.1f}s).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# file: tools/check_instant_mode.py
+"""
+Checks that minimising the window or pressing "Tới lượt tôi" in the middle of a
+card flight does not stall the round.
+
+    python tools/check_instant_mode.py
+
+Plays CPU-only rounds on the real game screen. As soon as a draw or play
+flight is in the air, it either minimises the window or starts skipping, then
+runs the Kivy event loop until the round is scored. Flights that are cut short
+must still hand the round its continuation, so every round has to end.
+Exits with status 1 if one does not.
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from kivy.base import EventLoop  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+
+from logic.cpu_policy import RandomPolicy  # noqa: E402
+from logic.player import Player  # noqa: E402
+from ui.game_screen import LoveLetterGame  # noqa: E402
+
+TIMEOUT = 30.0  # seconds of event loop per phase of the check
+
+
+def run_until(condition, timeout=TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        EventLoop.idle()
+    return True
+
+
+def new_game(num_players=4):
+    game = LoveLetterGame()
+    Window.add_widget(game)  # flights need the screen on a window (see _animate_card_flight)
+    game.num_players_session = num_players
+    game.tokens_to_win_session = 99
+    game.human_player_id = -1
+    game.players_session_list = [Player(id_num=i, name=f"Máy {i + 1}", is_cpu=True, cpu_policy=RandomPolicy())
+                                 for i in range(num_players)]
+    game.time_scale.speed = 4.0
+    game.setup_main_ui()
+    return game
+
+
+def check(interrupt, label, rounds=3):
+    game = new_game()
+    failures = 0
+    for _ in range(rounds):
+        game._stop_skipping()
+        game.animation_manager._on_window_shown()
+        game.start_new_game_session() if game.current_round_manager is None else game.start_new_round()
+        round_manager = game.current_round_manager
+        # A draw or play flight: the deal's flights have no continuation, the round waits on these.
+        in_flight = lambda: ((game.animation_manager.card_sprites._active and round_manager.phase != 'deal')
+                             or not round_manager.round_active)
+        if not run_until(in_flight) or not round_manager.round_active:
+            print(f"{label}: không bắt được lá bài nào đang bay.")
+            failures += 1
+            continue
+        interrupt(game)
+        if run_until(lambda: not round_manager.round_active):
+            print(f"{label}: vòng kết thúc sau {round_manager.turns_played} lượt.")
+        else:
+            print(f"{label}: LỖI - vòng bị treo ở lượt {round_manager.turns_played} (pha {round_manager.phase}).")
+            failures += 1
+    Window.remove_widget(game)
+    return failures
+
+
+def minimise(game):
+    Window.dispatch('on_minimize')
+
+
+def skip(game):
+    game.skip_to_my_turn(None)
+
+
+def main():
+    EventLoop.ensure_window()
+    failures = check(minimise, "Thu nhỏ cửa sổ") + check(skip, "Tới lượt tôi")
+    print("OK" if not failures else f"{failures} lỗi")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
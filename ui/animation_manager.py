@@ -2,47 +2,185 @@
 
 from kivy.animation import Animation
 from kivy.uix.image import Image
-from kivy.uix.widget import Widget
-from .constants import CARD_BACK_IMAGE
+from kivy.uix.label import Label
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.metrics import dp
+from .constants import CARD_BACK_IMAGE, MAX_CARD_FLIGHTS, MAX_TOKEN_FLIGHTS, GAME_SPEED, ANIMATION_SPEEDS
+from .textures import card_textures, SMALL
+
+# Kinds of timed things on the game screen; each has its own speed multiplier in ANIMATION_SPEEDS.
+CARD_FLIGHT = 'card_flight'
+TOKEN_FLIGHT = 'token_flight'
+EFFECT = 'effect'
+NOTIFICATION = 'notification'
+CPU_THINK = 'cpu_think'
+
+
+class TimeScale:
+    """
+    Global pace of the game screen.
+
+    Durations are divided by `speed` and by the multiplier of their kind. While the
+    window is hidden or the player skips ahead to their own turn, everything is instant:
+    `seconds()` returns 0 and callers complete without drawing.
+    `schedule` has the GameRound scheduler signature, so CPU turns follow the same pace.
+    """
+
+    def __init__(self, speed=GAME_SPEED, multipliers=None):
+        self.speed = speed
+        self.multipliers = dict(ANIMATION_SPEEDS if multipliers is None else multipliers)
+        self.hidden = False
+        self.skipping = False
+
+    @property
+    def instant(self):
+        return self.hidden or self.skipping
+
+    def factor(self, kind):
+        """Multiplier for every duration of `kind` (0 when instant)."""
+        if self.instant:
+            return 0
+        return 1.0 / (self.speed * self.multipliers.get(kind, 1.0))
+
+    def seconds(self, kind, seconds):
+        return seconds * self.factor(kind)
+
+    def schedule(self, callback, delay, kind=CPU_THINK):
+        Clock.schedule_once(lambda dt: callback(), self.seconds(kind, delay))
+
+
+class SpritePool:
+    """
+    Reusable widgets for short-lived flights (cards, tokens).
+
+    `acquire(parent, on_complete)` puts a pooled widget on top of `parent`, or returns None
+    when `max_active` flights are already running; the caller then skips the visual.
+    `finish(widget)` ends a flight: the widget is released and the flight's `on_complete`
+    runs. `release(widget)` stops its animations, detaches it and keeps it for the next
+    flight without running `on_complete` (Kivy's cancel does not fire it either).
+    """
+
+    def __init__(self, factory, max_active, preallocate=0):
+        self.factory = factory
+        self.max_active = max_active
+        self.created = 0
+        self._active = []
+        self._continuations = {}  # active widget -> on_complete of its flight
+        self._free = [self._new() for _ in range(preallocate)]
+
+    def _new(self):
+        self.created += 1
+        widget = self.factory()
+        widget.is_temp_anim = True
+        return widget
+
+    def acquire(self, parent, on_complete=None):
+        if len(self._active) >= self.max_active:
+            return None
+        widget = self._free.pop() if self._free else self._new()
+        self._active.append(widget)
+        self._continuations[widget] = on_complete
+        parent.add_widget(widget)
+        return widget
+
+    def finish(self, widget):
+        on_complete = self._continuations.pop(widget, None)
+        self.release(widget)
+        if on_complete: on_complete()
+
+    def release(self, widget):
+        Animation.cancel_all(widget)
+        self._continuations.pop(widget, None)
+        if widget.parent:
+            widget.parent.remove_widget(widget)
+        if widget in self._active:
+            self._active.remove(widget)
+            self._free.append(widget)
+
+    def release_all(self, finish=False):
+        """Ends every flight; with `finish`, their continuations run as if they had landed."""
+        for widget in self._active[:]:
+            if finish:
+                self.finish(widget)
+            else:
+                self.release(widget)
+
+
+def _new_card_sprite():
+    return Image(size_hint=(None, None), size=(dp(100), dp(140)))
+
+
+def _new_token_sprite():
+    return Label(text="*", font_size=dp(40), bold=True, size_hint=(None, None), size=(dp(50), dp(50)))
+
 
 class AnimationManager:
+    """Card and token flights over the game screen, drawn with pooled sprites."""
+
     def __init__(self, game_screen):
         self.game_screen = game_screen
+        self.card_sprites = SpritePool(_new_card_sprite, MAX_CARD_FLIGHTS, preallocate=4)
+        self.token_sprites = SpritePool(_new_token_sprite, MAX_TOKEN_FLIGHTS, preallocate=1)
+        self.time_scale = TimeScale()
+        Window.bind(on_minimize=self._on_window_hidden, on_hide=self._on_window_hidden,
+                    on_restore=self._on_window_shown, on_show=self._on_window_shown)
+
+    def _on_window_hidden(self, *args):
+        self.time_scale.hidden = True
+        self.release_all(finish=True)  # The round goes on instantly while hidden.
+
+    def _on_window_shown(self, *args):
+        self.time_scale.hidden = False
 
     def get_widget_center(self, widget):
-        if widget.parent:
-            return widget.parent.to_window(*widget.center)
-        return widget.center
+        if not widget or not widget.parent:
+            return self.game_screen.center
+        return widget.parent.to_window(*widget.center)
+
+    def release_all(self, finish=False):
+        """Removes every flight. With `finish`, their `on_complete` callbacks still run (the round waits on them)."""
+        self.card_sprites.release_all(finish)
+        self.token_sprites.release_all(finish)
+
+    def fly_card(self, image_path, start_pos, end_pos, on_complete=None, duration=0.6, transition='out_quad'):
+        duration = self.time_scale.seconds(CARD_FLIGHT, duration)
+        sprite = self.card_sprites.acquire(self.game_screen, on_complete) if duration else None
+        if sprite is None:  # Instant mode, or too many flights at once: this one is skipped.
+            if on_complete: on_complete()
+            return
+        sprite.texture = card_textures.get(image_path, SMALL)
+        sprite.center = start_pos
+        sprite.opacity = 0.8
+        anim = Animation(center=end_pos, opacity=1, duration=duration, t=transition)
+        anim.bind(on_complete=lambda *args: self.card_sprites.finish(sprite))
+        anim.start(sprite)
+
+    def fly_token(self, target_widget, color, on_complete=None, duration=1.2):
+        duration = self.time_scale.seconds(TOKEN_FLIGHT, duration)
+        sprite = self.token_sprites.acquire(self.game_screen, on_complete) if duration else None
+        if sprite is None:
+            if on_complete: on_complete()
+            return
+        sprite.color = color
+        sprite.center = self.game_screen.center
+        sprite.opacity = 0
+        sprite.scale = 1.0
+        end_pos = self.get_widget_center(target_widget)
+        anim = (Animation(opacity=1, scale=1.5, duration=duration * 0.2, t='out_quad')
+                + Animation(center=end_pos, scale=0.5, duration=duration * 0.6, t='in_cubic')
+                + Animation(opacity=0, duration=duration * 0.2))
+        anim.bind(on_complete=lambda *args: self.token_sprites.finish(sprite))
+        anim.start(sprite)
 
     def deal_card(self, player_id, on_complete=None):
-        deck_pos = self.get_widget_center(self.game_screen.deck_image)
-
         player_widget = self.game_screen._get_player_widget_by_id(player_id)
         if not player_widget:
             if on_complete:
                 on_complete()
             return
-
-        target_pos = self.get_widget_center(player_widget)
-
-        card_image = Image(
-            source=CARD_BACK_IMAGE,
-            size_hint=(None, None),
-            size=(100, 140),
-            pos=deck_pos
-        )
-        self.game_screen.add_widget(card_image)
-
-        anim = Animation(
-            pos=target_pos,
-            duration=0.5,
-            transition='out_quad'
-        )
-        anim.bind(on_complete=lambda *args: (
-            self.game_screen.remove_widget(card_image),
-            on_complete() if on_complete else None
-        ))
-        anim.start(card_image)
+        self.fly_card(CARD_BACK_IMAGE, self.get_widget_center(self.game_screen.deck_image),
+                      self.get_widget_center(player_widget), on_complete, duration=0.5)
 
     def animate_card_to_discard(self, card, player_id, on_complete=None):
         player_widget = self.game_screen._get_player_widget_by_id(player_id)
@@ -50,56 +188,15 @@ class AnimationManager:
             if on_complete:
                 on_complete()
             return
-
-        start_pos = self.get_widget_center(player_widget)
-        discard_pos = self.get_widget_center(self.game_screen.last_played_card_container)
-
-        card_image = Image(
-            source=card.image_path,
-            size_hint=(None, None),
-            size=(100, 140),
-            pos=start_pos
-        )
-        self.game_screen.add_widget(card_image)
-
-        anim = Animation(
-            pos=discard_pos,
-            duration=0.7,
-            transition='out_quint'
-        )
-        anim.bind(on_complete=lambda *args: (
-            self.game_screen.remove_widget(card_image),
-            on_complete() if on_complete else None
-        ))
-        anim.start(card_image)
+        self.fly_card(card.image_path, self.get_widget_center(player_widget),
+                      self.get_widget_center(self.game_screen.last_played_card_container), on_complete,
+                      duration=0.7, transition='out_quint')
 
     def draw_card(self, player_id, on_complete=None):
-        deck_pos = self.get_widget_center(self.game_screen.deck_image)
-
         player_widget = self.game_screen._get_player_widget_by_id(player_id)
         if not player_widget:
             if on_complete:
                 on_complete()
             return
-
-        target_pos = self.get_widget_center(player_widget)
-
-        card_image = Image(
-            source=CARD_BACK_IMAGE,
-            size_hint=(None, None),
-            size=(100, 140),
-            pos=deck_pos
-        )
-        self.game_screen.add_widget(card_image)
-
-        anim = Animation(
-            pos=target_pos,
-            duration=0.5,
-            transition='out_quad'
-        )
-        anim.bind(on_complete=lambda *args: (
-            self.game_screen.remove_widget(card_image),
-            on_complete() if on_complete else None
-        ))
-        anim.start(card_image)
-
+        self.fly_card(CARD_BACK_IMAGE, self.get_widget_center(self.game_screen.deck_image),
+                      self.get_widget_center(player_widget), on_complete, duration=0.5)
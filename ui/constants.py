@@ -20,6 +20,7 @@ Config.set('input', 'mouse', 'mouse,multitouch_on_demand')
 # Đường dẫn tài nguyên
 ASSETS_DIR = resource_path("assets")
 CARD_FOLDER = os.path.join(ASSETS_DIR, "cards")
+CARD_ATLAS_DIR = os.path.join(ASSETS_DIR, "atlas")  # tạo bằng tools/build_card_atlas.py
 
 # Hình ảnh giao diện
 INTRO_BACKGROUND = os.path.join(ASSETS_DIR, "chill.webp")
@@ -45,7 +46,38 @@ CARD_VALUE_COLORS = {
     9: (0.9, 0.9, 1.0),
 }
 
+# Máy (AI): thời gian tìm kiếm ISMCTS cho mỗi nước đi, tính bằng giây (chạy nền, không chặn giao diện)
+CPU_SEARCH_TIME_BUDGET = 0.75
+# Máy (AI): giải chính xác phần cuối vòng (bộ bài cơ bản) khi chồng bài còn tối đa bấy nhiêu lá
+CPU_ENDGAME_MAX_DECK = 3
+# Máy (AI): chơi theo bảng nước đi tính sẵn (assets/cpu_policy_table.bin, tạo bằng tools/build_policy_table.py)
+# thay vì tìm kiếm trong lúc chơi; nếu chưa có bảng thì vẫn tìm kiếm như thường
+CPU_USE_POLICY_TABLE = False
+# Đo độ trễ từng giai đoạn của lượt chơi (logic/latency.py); bảng tổng kết được ghi vào log Kivy khi ván kết thúc
+PROFILE_LATENCY = False
+# Bảng đo khung hình (F3 để bật/tắt): FPS, phân vị thời gian khung hình, số widget và Animation; xuất CSV từng khung hình
+SHOW_FRAME_PROFILER = False
+FRAME_PROFILER_MAX_FRAMES = 36000  # số khung hình giữ lại để xuất CSV (~10 phút ở 60 FPS)
+FRAME_PROFILER_WINDOW = 300        # số khung hình gần nhất dùng để tính FPS và phân vị trên bảng
+
 # Áp dụng cấu hình cửa sổ
 Window.size = WINDOW_SIZE
 Window.clearcolor = WINDOW_CLEAR_COLOR
 
+# Hoạt ảnh: số lá bài / tín vật bay cùng lúc tối đa (vượt quá thì bỏ qua hoạt ảnh)
+MAX_CARD_FLIGHTS = 12
+MAX_TOKEN_FLIGHTS = 8
+
+# Tốc độ trò chơi: hệ số chung (lớn hơn = nhanh hơn), mức tua nhanh, và hệ số riêng cho từng loại hoạt ảnh
+GAME_SPEED = 1.0
+TURBO_SPEED = 4.0
+ANIMATION_SPEEDS = {
+    'card_flight': 1.0,   # lá bài bay (chia, rút, đánh, đổi bài)
+    'token_flight': 1.0,  # tín vật bay về người thắng
+    'effect': 1.0,        # bảng hiệu ứng lá bài và viền sáng người chơi
+    'notification': 1.0,  # thông báo giữa màn hình
+    'cpu_think': 1.0,     # thời gian Máy "suy nghĩ" trước khi chơi
+}
+
+# Nhật ký ván đấu: số dòng tối đa được giữ lại (chỉ các dòng đang hiển thị mới tạo widget)
+LOG_MAX_LINES = 5000
@@ -0,0 +1,219 @@
+# file: ui/frame_profiler.py
+"""
+Frame-time profiler for the game screen.
+
+While running, it samples the length of every frame from the Kivy clock and
+tags it with the round phase (GameRound.phase) and the UI actions in progress
+(deal, king swap, effect panel, ...; see `track`). An overlay shows FPS, the
+frame-time percentiles of the last FRAME_PROFILER_WINDOW frames, how many
+frames blew the 60 FPS budget, the widget count and the number of running
+Animations. `export_csv()` writes one row per frame, and the per-tag
+percentiles (a logic.latency.LatencyRecorder) show which actions stutter.
+
+Stopped, it costs nothing: no clock callback runs and `track` passes its
+callback through unchanged.
+"""
+import csv
+import os
+import time
+from collections import Counter, deque, namedtuple
+
+from kivy.animation import Animation
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.graphics import Color, RoundedRectangle
+from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+
+from logic.latency import LatencyRecorder
+from .constants import FRAME_PROFILER_MAX_FRAMES, FRAME_PROFILER_WINDOW
+from .ui_components import StyledLabel, create_selection_button
+
+FRAME_BUDGET_MS = 1000 / 60
+OVERLAY_REFRESH = 0.5  # seconds between overlay (and widget count) refreshes
+
+FrameSample = namedtuple('FrameSample', ['time', 'frame_ms', 'phase', 'actions', 'widgets', 'animations'])
+
+CSV_HEADER = ['frame', 'time_s', 'frame_ms', 'over_budget', 'phase', 'actions', 'widgets', 'animations']
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+def count_widgets():
+    """Widgets currently attached to the window, popups included."""
+    return sum(1 for root in Window.children for _ in root.walk())
+
+
+class FrameProfiler:
+    """
+    Per-frame timings of the UI, tagged with `phase_provider()` (the round phase, or None)
+    and the UI actions `track`ed at that moment. `toggle()` starts/stops sampling and the overlay;
+    samples are kept across stops until `clear()`.
+    """
+
+    def __init__(self, phase_provider, on_export=None):
+        self.phase_provider = phase_provider
+        self.on_export = on_export  # called with the written path, e.g. to log it
+        self.frames = deque(maxlen=FRAME_PROFILER_MAX_FRAMES)
+        self.recent = deque(maxlen=FRAME_PROFILER_WINDOW)
+        self.by_tag = LatencyRecorder()
+        self.over_budget = 0
+        self.actions = Counter()
+        self.running = False
+        self.widget_count = 0
+        self.overlay = None
+        self._label = None
+        self._epoch = time.perf_counter()
+        self._skip_frame = False
+
+    # --- Control ---
+
+    def toggle(self, *args):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._skip_frame = True  # The first callback measures the time since scheduling, not a frame.
+        self.widget_count = count_widgets()
+        Clock.schedule_interval(self._on_frame, 0)
+        Clock.schedule_interval(self._refresh_overlay, OVERLAY_REFRESH)
+        self._show_overlay()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        Clock.unschedule(self._on_frame)
+        Clock.unschedule(self._refresh_overlay)
+        self.actions.clear()
+        if self.overlay is not None and self.overlay.parent:
+            self.overlay.parent.remove_widget(self.overlay)
+
+    def clear(self):
+        self.frames.clear()
+        self.recent.clear()
+        self.by_tag.clear()
+        self.over_budget = 0
+        self._epoch = time.perf_counter()
+
+    def track(self, action, on_complete):
+        """
+        Tags frames with `action` until the returned callback runs (it then calls `on_complete`).
+        Returns `on_complete` itself while the profiler is stopped.
+        """
+        if not self.running:
+            return on_complete
+        self.actions[action] += 1
+        done = []
+
+        def tracked(*args):
+            if not done:
+                done.append(True)
+                self.actions[action] -= 1
+                if self.actions[action] <= 0:
+                    del self.actions[action]
+            if on_complete:
+                return on_complete(*args)
+        return tracked
+
+    # --- Sampling ---
+
+    def _on_frame(self, dt):
+        if self._skip_frame:
+            self._skip_frame = False
+            return
+        frame_ms = dt * 1000
+        phase = self.phase_provider() or '-'
+        actions = '+'.join(sorted(self.actions))
+        self.frames.append(FrameSample(time.perf_counter() - self._epoch, frame_ms, phase, actions,
+                                       self.widget_count, len(Animation._instances)))
+        self.recent.append(frame_ms)
+        if frame_ms > FRAME_BUDGET_MS:
+            self.over_budget += 1
+        self.by_tag.record(f"{phase}/{actions}" if actions else phase, dt)
+
+    def stats(self):
+        """FPS and frame-time percentiles (ms) over the recent window."""
+        recent = sorted(self.recent)
+        total = sum(recent)
+        return {
+            'fps': len(recent) * 1000 / total if total else 0.0,
+            'p50_ms': _percentile(recent, 50),
+            'p95_ms': _percentile(recent, 95),
+            'p99_ms': _percentile(recent, 99),
+            'max_ms': recent[-1] if recent else 0.0,
+        }
+
+    # --- Overlay ---
+
+    def _show_overlay(self):
+        if self.overlay is None:
+            self.overlay = BoxLayout(orientation='vertical', size_hint=(None, None), size=(dp(320), dp(170)),
+                                     pos=(dp(8), dp(8)), padding=dp(8), spacing=dp(4))
+            with self.overlay.canvas.before:
+                Color(0, 0, 0, 0.65)
+                self.overlay.bg = RoundedRectangle(radius=[8])
+            self.overlay.bind(pos=self._update_bg, size=self._update_bg)
+            self._label = StyledLabel(text="", font_size=dp(13), halign='left', valign='top')
+            self._label.bind(size=lambda label, size: setattr(label, 'text_size', size))
+            export_button = create_selection_button("Xuất CSV", lambda _: self.export_csv())
+            export_button.size_hint_y = None
+            export_button.height = dp(32)
+            self.overlay.add_widget(self._label)
+            self.overlay.add_widget(export_button)
+        if not self.overlay.parent:
+            Window.add_widget(self.overlay)
+        self._refresh_overlay()
+
+    @staticmethod
+    def _update_bg(instance, _value):
+        instance.bg.pos = instance.pos
+        instance.bg.size = instance.size
+
+    def _refresh_overlay(self, dt=None):
+        self.widget_count = count_widgets()
+        if self._label is None:
+            return
+        s = self.stats()
+        self._label.text = (f"FPS: {s['fps']:.0f}\n"
+                            f"Khung hình (ms): p50 {s['p50_ms']:.1f}  p95 {s['p95_ms']:.1f}  p99 {s['p99_ms']:.1f}\n"
+                            f"Chậm nhất: {s['max_ms']:.1f} ms  Vượt {FRAME_BUDGET_MS:.1f} ms: {self.over_budget}\n"
+                            f"Widget: {self.widget_count}  Animation: {len(Animation._instances)}\n"
+                            f"Đang chạy: {'+'.join(sorted(self.actions)) or '-'}")
+        if self.overlay.parent and Window.children[0] is not self.overlay:
+            # A popup opened after the overlay covers it; bring the overlay back on top.
+            Window.remove_widget(self.overlay)
+            Window.add_widget(self.overlay)
+
+    # --- Export ---
+
+    def summary(self):
+        """Frame-time percentiles per tag (phase/actions), the slowest tags first."""
+        return self.by_tag.summary()
+
+    def export_csv(self, path=None):
+        """Writes every kept frame to `path` (default: a timestamped file in the app's data folder)."""
+        if path is None:
+            app = App.get_running_app()
+            folder = app.user_data_dir if app else os.getcwd()
+            path = os.path.join(folder, time.strftime('frame_times_%Y%m%d_%H%M%S.csv'))
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for index, frame in enumerate(self.frames):
+                writer.writerow([index, f"{frame.time:.4f}", f"{frame.frame_ms:.3f}",
+                                 int(frame.frame_ms > FRAME_BUDGET_MS), frame.phase, frame.actions,
+                                 frame.widgets, frame.animations])
+        if self.on_export:
+            self.on_export(path)
+        return path
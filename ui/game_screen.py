@@ -2,6 +2,7 @@
 
 import os
 import time
+from collections import deque
 from functools import partial
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.floatlayout import FloatLayout
@@ -13,6 +14,8 @@ from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
 from kivy.clock import Clock
+from kivy.core.window import Window, Keyboard
+from kivy.logger import Logger
 from kivy.graphics import Color, Rectangle, RoundedRectangle, Line
 from kivy.animation import Animation
 from kivy.metrics import dp
@@ -24,13 +27,23 @@ from logic.player import Player
 from logic.deck import Deck
 from logic.game_round import GameRound
 from logic.card import Card
-from logic.constants import CARD_PROTOTYPES
+from logic.constants import CARD_PROTOTYPES, tokens_to_win_for
+from logic.ismcts import ISMCTSPolicy
+from logic.endgame import EndgamePolicy
+from logic.cpu_policy import TablePolicy
+from logic.policy_table import load_policy_table
+from logic.game_log import GameLog, DEBUG, text_sink
+from logic.latency import LatencyRecorder
+from logic.ui_regions import UI_ALL, UI_SCORE, UI_TURN, UI_DECK, UI_DISCARDS, UI_OPPONENTS, UI_HAND
 
 from .constants import (
     CARD_RULES_IMAGE, EMPTY_CARD_IMAGE, CARD_BACK_IMAGE, ELIMINATED_IMAGE,
-    CARD_VALUE_COLORS, VICTORY_IMAGE, DEFEAT_IMAGE
+    CARD_VALUE_COLORS, VICTORY_IMAGE, DEFEAT_IMAGE, CPU_SEARCH_TIME_BUDGET, CPU_ENDGAME_MAX_DECK, CPU_USE_POLICY_TABLE, PROFILE_LATENCY, SHOW_FRAME_PROFILER, LOG_MAX_LINES, GAME_SPEED, TURBO_SPEED
 )
-from ui.ui_components import StyledLabel, ImageButton, TurnNotificationPopup, EffectAnimationPanel, create_selection_button
+from ui.textures import card_textures, SMALL
+from ui.animation_manager import AnimationManager, CARD_FLIGHT, EFFECT, NOTIFICATION
+from ui.frame_profiler import FrameProfiler
+from ui.ui_components import StyledLabel, ImageButton, TurnNotificationPopup, EffectAnimationPanel, LogPanel, create_selection_button
 
 TUTORIAL_SCRIPT = [
     {
@@ -117,6 +130,17 @@ TUTORIAL_SCRIPT = [
     },
 ]
 
+class TutorialRound:
+    """Stand-in for GameRound while the tutorial moves the cards by hand: just the state the screen reads."""
+
+    def __init__(self):
+        self.round_active = False
+        self.deck = None
+        self.current_player_idx = 0
+        self.turns_played = 0
+        self.phase = None
+
+
 class TutorialManager:
     def __init__(self, game_screen):
         self.game = game_screen
@@ -124,8 +148,7 @@ class TutorialManager:
         self.script = TUTORIAL_SCRIPT
         self.popup = None
         self.temp_deck = None
-        self.temp_round_manager = lambda: None # Mock object
-        self.temp_round_manager.round_active = False
+        self.temp_round_manager = TutorialRound()
 
     def start(self):
         self.current_step_index = -1
@@ -191,7 +214,7 @@ class TutorialManager:
         self.game.log_message("--- Bắt đầu Vòng Hướng dẫn 1 ---")
         for p in self.game.players_session_list: p.reset_for_round()
         self.game.global_discard_pile.clear()
-        self.temp_deck = Deck(2, self.game.log_message)
+        self.temp_deck = Deck(2, self.game.event_log)
         self.temp_deck.cards = [self.get_card(c) for c in ['Guard', 'Priest', 'Baron', 'Princess']]
         an, binh = self.find_player("An"), self.find_player("Bình")
         an.add_card_to_hand(self.get_card('Guard')); binh.add_card_to_hand(self.get_card('Priest'))
@@ -208,6 +231,7 @@ class TutorialManager:
         player = self.find_player(player_name)
         player_idx = self.game.players_session_list.index(player)
         self.game.current_round_manager.current_player_idx = player_idx
+        self.game.current_round_manager.turns_played += 1
         self.game.turn_label.text = f"Lượt của: {player_name}"
         player.is_protected = False
 
@@ -238,7 +262,7 @@ class TutorialManager:
     def action_end_round_1(self, step):
         binh = self.find_player("Bình")
         binh.tokens += 1
-        self.game.animate_token_fly(Label(text="*", font_size=dp(40), color=(1, 0.6, 0.6, 1), bold=True), self.game._get_player_widget_by_id(binh.id), self.next_step)
+        self.game.animate_token_fly(self.game._get_player_widget_by_id(binh.id), self.next_step, color=(1, 0.6, 0.6, 1))
 
     def action_setup_round_2(self, step):
         self.game.log_message("--- Bắt đầu Vòng Hướng dẫn 2 ---")
@@ -269,20 +293,49 @@ class TutorialManager:
 class LoveLetterGame(FloatLayout):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.game_log = ["Chào mừng đến với Thư Tình (Kivy)!"]
+        self.game_log = deque(["Chào mừng đến với Thư Tình (Kivy)!"], maxlen=LOG_MAX_LINES)
+        # Game logic logs into this; only this sink turns its records into text.
+        self.event_log = GameLog(text_sink(self.log_message), level=DEBUG)
+        self.log_panel = None
         self.num_players_session = 0
         self.players_session_list = []
         self.human_player_id = 0
         self.current_round_manager = None
+        self.latency = None  # LatencyRecorder of the current game session when PROFILE_LATENCY is on
         self.tokens_to_win_session = 0
         self.game_over_session_flag = True
         self.active_popup = None
         self.waiting_for_input = False
         self.opponent_widgets_map = {}
+        # Incremental rendering (see update_ui_full): last rendered view per area, reusable widgets.
+        self._rendered_views = {}
+        self._discard_buttons = []
+        self._empty_discard_image = None
+        self._hand_slots = []
+        self._hand_tokens_label = None
+        self._hand_eliminated_widgets = None
+        # Widgets created by the render paths, in total and per turn, to check that steady state allocates nothing.
+        self.widgets_created = 0
+        self.widgets_created_per_turn = deque(maxlen=50)
+        self._widget_count_turn = None
+        self._widgets_created_at_turn_start = 0
+        # Redraw requests from the round are OR-ed here and applied once per frame.
+        self._dirty_regions = 0
+        self._ui_update_trigger = Clock.create_trigger(self._apply_ui_update)
         self.active_notification = None
+        self.animation_manager = AnimationManager(self)
+        self.time_scale = self.animation_manager.time_scale
+        self.speed_button = None
+        self.skip_button = None
         self.tutorial_manager = None
         self.log_container = None
         self.global_discard_pile = []
+        # Frame-time overlay (F3); UI actions below are `track`ed so slow frames can be traced to them.
+        self.frame_profiler = FrameProfiler(
+            lambda: getattr(self.current_round_manager, 'phase', None),
+            on_export=self._on_frame_times_exported)
+        Window.bind(on_key_down=self._on_key_down)
+        if SHOW_FRAME_PROFILER: Clock.schedule_once(lambda dt: self.frame_profiler.start(), 1)
 
         with self.canvas.before:
             Color(0.18, 0.07, 0.07, 1)
@@ -325,6 +378,17 @@ class LoveLetterGame(FloatLayout):
             # Adding the widget last in a FloatLayout automatically places it on top.
             self.add_widget(self.log_container)
 
+    def _on_key_down(self, window, key, *args):
+        if key == Keyboard.keycodes['f3']:
+            self.frame_profiler.toggle()
+            return True
+        return False
+
+    def _on_frame_times_exported(self, path):
+        self.log_message(f"Đã xuất thời gian từng khung hình ra {path}")
+        for line in ["Frame times by phase/UI action:"] + self.frame_profiler.summary().splitlines():
+            Logger.info(f"LoveLetter: {line}")
+
     # --- Game Lifecycle & UI Setup ---
 
     def initialize_game_setup(self):
@@ -338,15 +402,14 @@ class LoveLetterGame(FloatLayout):
         welcome_layout.add_widget(StyledLabel(text="Board Game Thư Tình", font_size=32, color=(0.9, 0.7, 0.8, 1), size_hint_y=0.3))
         image_box = BoxLayout(size_hint_y=0.4)
         if os.path.exists(CARD_BACK_IMAGE):
-            image_box.add_widget(Image(source=CARD_BACK_IMAGE, size_hint_max_x=0.7, pos_hint={'center_x': 0.5}))
+            image_box.add_widget(Image(texture=card_textures.get(CARD_BACK_IMAGE), size_hint_max_x=0.7, pos_hint={'center_x': 0.5}))
         welcome_layout.add_widget(image_box)
         welcome_layout.add_widget(StyledLabel(text="Đang chờ bắt đầu trò chơi...", font_size=24, size_hint_y=0.3))
         self.add_widget(welcome_layout)
 
     def prompt_player_count(self):
         # Displays a popup to ask for the number of players.
-        self.game_log = ["Chào mừng đến với Thư Tình (Kivy)!", "Vui lòng chọn số người chơi (2-4)."]
-        if hasattr(self, 'message_label'): self.log_message("", permanent=False)
+        self._reset_log("Chào mừng đến với Thư Tình (Kivy)!", "Vui lòng chọn số người chơi (2-4).")
         self.dismiss_active_popup()
 
         popup_layout = BoxLayout(orientation='vertical', spacing=20, padding=30)
@@ -375,21 +438,26 @@ class LoveLetterGame(FloatLayout):
         # Add this line to reset the widgets for a new game
         self.opponent_widgets_map.clear()
 
-        if self.num_players_session == 2: self.tokens_to_win_session = 7
-        elif self.num_players_session == 3: self.tokens_to_win_session = 5
-        else: self.tokens_to_win_session = 4
+        self.tokens_to_win_session = tokens_to_win_for(self.num_players_session)
 
         self.log_message(f"Số tín vật cần để chiến thắng: {self.tokens_to_win_session}")
         self.players_session_list = [Player(id_num=0, name="Người chơi 1 (Bạn)")]
         self.human_player_id = 0
+        if CPU_USE_POLICY_TABLE and load_policy_table() is not None:
+            cpu_policy = TablePolicy()
+        else:
+            cpu_policy = EndgamePolicy(ISMCTSPolicy(time_budget=CPU_SEARCH_TIME_BUDGET, background=True,
+                                                    tokens_to_win=self.tokens_to_win_session),
+                                       max_deck=CPU_ENDGAME_MAX_DECK, background=True)
         for i in range(1, self.num_players_session):
-            self.players_session_list.append(Player(id_num=i, name=f"Máy {i}", is_cpu=True))
+            self.players_session_list.append(Player(id_num=i, name=f"Máy {i}", is_cpu=True, cpu_policy=cpu_policy))
 
         self.setup_main_ui()
         self.start_new_game_session()
 
     def setup_main_ui(self):
         self.clear_widgets()
+        self._reset_render_cache()
 
         # --- Top Info Panel (Top-Left) ---
         info_bar = BoxLayout(
@@ -420,10 +488,18 @@ class LoveLetterGame(FloatLayout):
         buttons_layout.add_widget(rules_btn)
         buttons_layout.add_widget(log_toggle_btn)
 
+        speed_layout = BoxLayout(size_hint=(None, None), width=dp(220), height=dp(40), spacing=dp(10))
+        self.speed_button = create_selection_button("", self.toggle_turbo)
+        self.skip_button = create_selection_button("Tới lượt tôi", self.skip_to_my_turn)
+        speed_layout.add_widget(self.speed_button)
+        speed_layout.add_widget(self.skip_button)
+        self._update_speed_buttons()
+
         info_bar.add_widget(self.score_label)
         info_bar.add_widget(self.turn_label)
         info_bar.add_widget(Widget(size_hint_y=None, height=dp(10)))
         info_bar.add_widget(buttons_layout)
+        info_bar.add_widget(speed_layout)
         self.add_widget(info_bar)
 
         # --- Log Panel (Right) ---
@@ -431,11 +507,8 @@ class LoveLetterGame(FloatLayout):
         with self.log_container.canvas.before: Color(0, 0, 0, 0.4); self.log_container.bg = RoundedRectangle(radius=[10]);
         self.log_container.bind(pos=self._update_rect, size=self._update_rect)
         self.log_container.add_widget(StyledLabel(text="Nhật ký ván đấu", font_size=dp(18), bold=True, size_hint_y=None, height=dp(30)))
-        log_scroll_view = ScrollView()
-        self.message_label = Label(text="\n".join(self.game_log), size_hint_y=None, halign='left', valign='top', color=(0.95, 0.95, 0.98, 1), font_size=dp(14), padding=(10, 10))
-        self.message_label.bind(texture_size=self.message_label.setter('size'))
-        log_scroll_view.add_widget(self.message_label)
-        self.log_container.add_widget(log_scroll_view)
+        self.log_panel = LogPanel(self.game_log)
+        self.log_container.add_widget(self.log_panel)
 
         # --- Opponents Grid (Top-Center) ---
         self.opponents_grid = GridLayout(cols=min(3, self.num_players_session - 1 if self.num_players_session > 1 else 1),
@@ -446,7 +519,7 @@ class LoveLetterGame(FloatLayout):
         center_table = RelativeLayout(size_hint=(0.4, 0.25), pos_hint={'center_x': 0.5, 'center_y': 0.55})
         deck_area = BoxLayout(orientation='vertical', size_hint=(0.4, 1), pos_hint={'x': 0, 'center_y': 0.5})
         deck_area.add_widget(StyledLabel(text="Chồng bài", size_hint_y=0.15, font_size=dp(16)))
-        self.deck_image = Image(source=CARD_BACK_IMAGE, size_hint_y=0.7)
+        self.deck_image = Image(texture=card_textures.get(CARD_BACK_IMAGE), size_hint_y=0.7)
         self.deck_count_label = StyledLabel(text="0 lá", size_hint_y=0.15, font_size=dp(14))
         deck_area.add_widget(self.deck_image); deck_area.add_widget(self.deck_count_label)
         center_table.add_widget(deck_area)
@@ -481,23 +554,63 @@ class LoveLetterGame(FloatLayout):
     # --- UI Update & Rendering ---
 
     def log_message(self, msg, permanent=True):
-        if permanent:
-            self.game_log.append(f"[{time.strftime('%H:%M:%S')}] {msg}")
-            if len(self.game_log) > 100: self.game_log = self.game_log[-100:]
-        if hasattr(self, 'message_label') and self.message_label and self.message_label.parent:
-            self.message_label.text = "\n".join(self.game_log)
-            if isinstance(self.message_label.parent, ScrollView):
-                self.message_label.parent.scroll_y = 0
+        if not permanent:
+            return  # The log panel is always current; there is nothing to refresh.
+        line = f"[{time.strftime('%H:%M:%S')}] {msg}"
+        log = self.game_log
+        dropped = log[0] if len(log) == log.maxlen else None
+        log.append(line)
+        if self.log_panel:
+            self.log_panel.append(line, dropped)
+
+    def _reset_log(self, *lines):
+        self.game_log.clear()
+        self.game_log.extend(lines)
+        if self.log_panel:
+            self.log_panel.reload()
 
     def add_to_global_discard(self, player, card):
         self.global_discard_pile.append({'player': player, 'card': card})
 
-    def update_ui_full(self):
+    def remove_last_global_discard(self):
+        if self.global_discard_pile:
+            self.global_discard_pile.pop()
+
+    def request_ui_update(self, regions=UI_ALL):
+        """Marks screen regions (logic.ui_regions flags) stale; they are redrawn together on the next frame."""
+        self._dirty_regions |= regions
+        self._ui_update_trigger()
+
+    def _apply_ui_update(self, dt=None):
+        regions, self._dirty_regions = self._dirty_regions, 0
+        if regions:
+            self.update_ui_full(regions)
+
+    def update_ui_full(self, regions=UI_ALL):
         if not hasattr(self, 'score_label'): return
 
-        score_texts = [f"{p.name}: {'*' * p.tokens}" for p in self.players_session_list]
-        self.score_label.text = "\n".join(score_texts)
+        if regions & UI_SCORE:
+            score_texts = [f"{p.name}: {'*' * p.tokens}" for p in self.players_session_list]
+            self.score_label.text = "\n".join(score_texts)
+
+        if regions & UI_TURN:
+            self._update_turn_display()
+
+        if regions & UI_DECK:
+            self._update_deck_display()
 
+        if regions & UI_DISCARDS:
+            discards_to_show = self.global_discard_pile[-5:]
+            if self._view_changed('discards', tuple((d['player'].id, d['card'].card_id) for d in discards_to_show)):
+                self._render_discards(discards_to_show)
+
+        if regions & (UI_OPPONENTS | UI_SCORE):
+            self.update_opponents_display()
+        if regions & (UI_HAND | UI_SCORE):
+            self.update_player_hand()
+        self._count_widgets_per_turn()
+
+    def _update_turn_display(self):
         is_round_active = self.current_round_manager and self.current_round_manager.round_active
         if self.game_over_session_flag:
             self.turn_label.text = "Trò chơi kết thúc!"
@@ -512,56 +625,104 @@ class LoveLetterGame(FloatLayout):
             if self.tutorial_manager is None:
                 self.action_button.text = ""; self.action_button.disabled = True; self.action_button.opacity = 0
 
+    def _update_deck_display(self):
         if self.current_round_manager and self.current_round_manager.deck:
             deck = self.current_round_manager.deck
             self.deck_count_label.text = f"{deck.count()} lá"
-            self.deck_image.source = CARD_BACK_IMAGE if not deck.is_empty() else EMPTY_CARD_IMAGE
+            self.deck_image.texture = card_textures.get(CARD_BACK_IMAGE if not deck.is_empty() else EMPTY_CARD_IMAGE)
             self.deck_image.opacity = 1.0 if not deck.is_empty() else 0.3
         else:
-            self.deck_count_label.text = "0 lá"; self.deck_image.source = EMPTY_CARD_IMAGE; self.deck_image.opacity = 0.3
-
-        self.last_played_card_container.clear_widgets()
-        discards_to_show = self.global_discard_pile[-5:]
+            self.deck_count_label.text = "0 lá"; self.deck_image.texture = card_textures.get(EMPTY_CARD_IMAGE); self.deck_image.opacity = 0.3
+
+    # --- Incremental rendering ---
+    # update_ui_full runs several times per turn. Each area is summarised as a small view
+    # tuple; an area whose view did not change since the last render is left alone, and
+    # one that did is updated in place. Widgets are only created the first time an area
+    # needs them (through _create_widget, which counts them) and are reused afterwards.
+
+    def _reset_render_cache(self):
+        self._rendered_views.clear()
+        self._discard_buttons.clear()
+        self._empty_discard_image = None
+        self._hand_slots.clear()
+        self._hand_tokens_label = None
+        self._hand_eliminated_widgets = None
+
+    def _view_changed(self, key, view):
+        if self._rendered_views.get(key) == view:
+            return False
+        self._rendered_views[key] = view
+        return True
+
+    def _create_widget(self, widget_cls, **kwargs):
+        self.widgets_created += 1
+        return widget_cls(**kwargs)
+
+    def _count_widgets_per_turn(self):
+        turn = self.current_round_manager.turns_played if self.current_round_manager else None
+        if turn == self._widget_count_turn:
+            return
+        if self._widget_count_turn is not None:
+            created = self.widgets_created - self._widgets_created_at_turn_start
+            self.widgets_created_per_turn.append(created)
+            Logger.debug(f"LoveLetter: {created} widget(s) created during turn {self._widget_count_turn}")
+        self._widget_count_turn = turn
+        self._widgets_created_at_turn_start = self.widgets_created
+
+    def _render_discards(self, discards_to_show):
+        container = self.last_played_card_container
+        container.clear_widgets()
         if not discards_to_show:
-            self.last_played_card_container.add_widget(Image(source=EMPTY_CARD_IMAGE, opacity=0.3))
+            if self._empty_discard_image is None:
+                self._empty_discard_image = self._create_widget(Image, texture=card_textures.get(EMPTY_CARD_IMAGE), opacity=0.3)
+            container.add_widget(self._empty_discard_image)
             self.last_played_title.text = "Chưa có bài"
-        else:
-            last_played_info = discards_to_show[-1]
-            self.last_played_title.text = f"Bài của: {last_played_info['player'].name}"
-            num_cards = len(discards_to_show)
-            for i, discard_info in enumerate(discards_to_show):
-                x_offset = (i / (num_cards - 1) - 0.5) * 0.6 if num_cards > 1 else 0
-                card_widget = ImageButton(source=discard_info['card'].image_path, card_info_callback=self.display_card_info_popup,
-                                          card_data=discard_info['card'], size_hint=(0.7, 0.9),
-                                          pos_hint={'center_x': 0.5 + x_offset, 'center_y': 0.5})
-                self.last_played_card_container.add_widget(card_widget)
-
-        self.update_opponents_display()
-        self.update_player_hand()
-        self.log_message("", permanent=False)
+            return
+
+        self.last_played_title.text = f"Bài của: {discards_to_show[-1]['player'].name}"
+        buttons = self._discard_buttons
+        while len(buttons) < len(discards_to_show):
+            buttons.append(self._create_widget(ImageButton, card_info_callback=self.display_card_info_popup, size_hint=(0.7, 0.9)))
+        num_cards = len(discards_to_show)
+        for i, (discard_info, card_widget) in enumerate(zip(discards_to_show, buttons)):
+            x_offset = (i / (num_cards - 1) - 0.5) * 0.6 if num_cards > 1 else 0
+            card_widget.texture = card_textures.get(discard_info['card'].image_path)
+            card_widget.card_data = discard_info['card']
+            card_widget.pos_hint = {'center_x': 0.5 + x_offset, 'center_y': 0.5}
+            container.add_widget(card_widget)
 
     def _create_opponent_widgets(self):
         self.opponents_grid.clear_widgets()
         self.opponent_widgets_map.clear()
+        self._rendered_views = {k: v for k, v in self._rendered_views.items() if not (isinstance(k, tuple) and k[0] == 'opponent')}
         opponents = self.players_session_list if self.human_player_id == -1 else [p for p in self.players_session_list if p.id != self.human_player_id]
 
         for p_opponent in opponents:
-            container = BoxLayout(orientation='vertical', padding=dp(5), spacing=dp(3))
+            container = self._create_widget(BoxLayout, orientation='vertical', padding=dp(5), spacing=dp(3))
             with container.canvas.before:
                 container.bg_color = Color(0.1, 0.1, 0.2, 0.9)
                 container.bg = RoundedRectangle(radius=[dp(10)])
             container.bind(pos=self._update_rect, size=self._update_rect)
-
-            name_label = StyledLabel(text="", font_size='13sp', bold=True, size_hint_y=0.2)
-            card_image = Image(source=EMPTY_CARD_IMAGE, size_hint_y=0.6)
-            discard_info = StyledLabel(text="", font_size='10sp', size_hint_y=0.2)
+            # The protection outline is created once and shown or hidden through its colour's alpha.
+            with container.canvas.after:
+                protection_color = Color(0.3, 0.8, 1, 0)
+                protection_line = Line(width=dp(2))
+            container.bind(pos=partial(self._update_protection_line, protection_line),
+                           size=partial(self._update_protection_line, protection_line))
+
+            name_label = self._create_widget(StyledLabel, text="", font_size='13sp', bold=True, size_hint_y=0.2)
+            card_image = self._create_widget(Image, texture=card_textures.get(EMPTY_CARD_IMAGE, SMALL), size_hint_y=0.6)
+            discard_info = self._create_widget(StyledLabel, text="", font_size='10sp', size_hint_y=0.2)
             container.add_widget(name_label); container.add_widget(card_image); container.add_widget(discard_info)
             self.opponents_grid.add_widget(container)
             self.opponent_widgets_map[p_opponent.id] = {
                 'container': container, 'name_label': name_label,
-                'card_image': card_image, 'discard_info': discard_info
+                'card_image': card_image, 'discard_info': discard_info, 'protection_color': protection_color
             }
 
+    def _update_protection_line(self, line, container, _value):
+        line.rounded_rectangle = (container.x, container.y, container.width, container.height, dp(10))
+
     def update_opponents_display(self):
         if not self.opponent_widgets_map:
             self._create_opponent_widgets()
@@ -572,21 +733,21 @@ class LoveLetterGame(FloatLayout):
             widget_set = self.opponent_widgets_map.get(p_opponent.id)
             if not widget_set: continue
 
-            container = widget_set['container']
-            container.bg_color.rgba = (0.5, 0.1, 0.1, 0.9) if p_opponent.is_eliminated else (0.1, 0.1, 0.2, 0.9)
-            container.canvas.after.clear()
-            if p_opponent.is_protected:
-                with container.canvas.after:
-                    Color(0.3, 0.8, 1, 0.9)
-                    Line(rounded_rectangle=(container.x, container.y, container.width, container.height, dp(10)), width=dp(2))
-
-            widget_set['name_label'].text = f"{p_opponent.name[:10]} ({'*' * p_opponent.tokens})"
             card_img_src = ELIMINATED_IMAGE if p_opponent.is_eliminated else CARD_BACK_IMAGE if p_opponent.hand else EMPTY_CARD_IMAGE
             if self.human_player_id == -1 and p_opponent.hand:
                 card_img_src = p_opponent.hand[0].image_path
-            widget_set['card_image'].source = card_img_src
+            last_discard = p_opponent.discard_pile[-1] if p_opponent.discard_pile else None
+            view = (p_opponent.is_eliminated, p_opponent.is_protected, p_opponent.tokens, card_img_src,
+                    bool(p_opponent.hand), last_discard)
+            if not self._view_changed(('opponent', p_opponent.id), view):
+                continue
+
+            widget_set['container'].bg_color.rgba = (0.5, 0.1, 0.1, 0.9) if p_opponent.is_eliminated else (0.1, 0.1, 0.2, 0.9)
+            widget_set['protection_color'].a = 0.9 if p_opponent.is_protected else 0
+            widget_set['name_label'].text = f"{p_opponent.name[:10]} ({'*' * p_opponent.tokens})"
+            widget_set['card_image'].texture = card_textures.get(card_img_src, SMALL)
             widget_set['card_image'].opacity = 1.0 if p_opponent.hand or p_opponent.is_eliminated else 0.4
-            widget_set['discard_info'].text = f"Bỏ: {p_opponent.discard_pile[-1].name} ({p_opponent.discard_pile[-1].value})" if p_opponent.discard_pile else "Chưa bỏ bài"
+            widget_set['discard_info'].text = f"Bỏ: {last_discard.name} ({last_discard.value})" if last_discard else "Chưa bỏ bài"
 
     def update_player_hand(self):
         if self.human_player_id == -1: # Tutorial mode
@@ -594,24 +755,48 @@ class LoveLetterGame(FloatLayout):
             return
 
         human_player = self.players_session_list[self.human_player_id]
-        self.player_hand_area.clear_widgets()
+        is_player_turn = bool(self.current_round_manager and self.current_round_manager.round_active and self.current_round_manager.current_player_idx == self.human_player_id and not self.waiting_for_input)
+        view = (human_player.is_eliminated, human_player.tokens, tuple(c.card_id for c in human_player.hand), is_player_turn)
+        if not self._view_changed('hand', view):
+            return
+
+        hand_area = self.player_hand_area
+        hand_area.clear_widgets()
 
         if human_player.is_eliminated:
-            self.player_hand_area.add_widget(Image(source=ELIMINATED_IMAGE, color=(0.5,0.5,0.5,1)))
-            self.player_hand_area.add_widget(StyledLabel(text="Đã bị loại!", color=(1, 0.5, 0.5, 1), font_size=24))
+            if self._hand_eliminated_widgets is None:
+                self._hand_eliminated_widgets = (
+                    self._create_widget(Image, texture=card_textures.get(ELIMINATED_IMAGE), color=(0.5, 0.5, 0.5, 1)),
+                    self._create_widget(StyledLabel, text="Đã bị loại!", color=(1, 0.5, 0.5, 1), font_size=24))
+            for widget in self._hand_eliminated_widgets:
+                hand_area.add_widget(widget)
             return
 
-        is_player_turn = self.current_round_manager and self.current_round_manager.round_active and self.current_round_manager.current_player_idx == self.human_player_id and not self.waiting_for_input
-        self.player_hand_area.add_widget(StyledLabel(text=f"Tín vật:\n{'*' * human_player.tokens}", font_size='15sp', color=(1, 0.95, 0.5, 1), bold=True, halign='center', valign='middle'))
+        if self._hand_tokens_label is None:
+            self._hand_tokens_label = self._create_widget(StyledLabel, text="", font_size='15sp', color=(1, 0.95, 0.5, 1), bold=True, halign='center', valign='middle')
+        self._hand_tokens_label.text = f"Tín vật:\n{'*' * human_player.tokens}"
+        hand_area.add_widget(self._hand_tokens_label)
 
-        for card_obj in human_player.hand:
-            card_container = BoxLayout(orientation='vertical', size_hint_x=0.45, spacing=dp(5))
-            card_button = ImageButton(source=card_obj.image_path, card_info_callback=self.display_card_info_popup, card_data=card_obj, disabled=not is_player_turn, opacity=1.0 if is_player_turn else 0.7)
+        while len(self._hand_slots) < len(human_player.hand):
+            self._hand_slots.append(self._create_hand_slot())
+        for card_obj, (card_container, card_button, card_label) in zip(human_player.hand, self._hand_slots):
+            card_button.texture = card_textures.get(card_obj.image_path)
+            card_button.card_data = card_obj
             card_button.card_name = card_obj.name
-            card_button.bind(on_press=self.on_player_card_selected)
-            card_container.add_widget(card_button)
-            card_container.add_widget(StyledLabel(text=f"{card_obj.name} ({card_obj.value})", font_size='13sp', color=(1, 0.92, 0.7, 1), bold=True, size_hint_y=None, height=dp(25)))
-            self.player_hand_area.add_widget(card_container)
+            card_button.disabled = not is_player_turn
+            card_button.opacity = 1.0 if is_player_turn else 0.7
+            card_button.scale = 1.0
+            card_label.text = f"{card_obj.name} ({card_obj.value})"
+            hand_area.add_widget(card_container)
+
+    def _create_hand_slot(self):
+        card_container = self._create_widget(BoxLayout, orientation='vertical', size_hint_x=0.45, spacing=dp(5))
+        card_button = self._create_widget(ImageButton, card_info_callback=self.display_card_info_popup)
+        card_button.bind(on_press=self.on_player_card_selected)
+        card_label = self._create_widget(StyledLabel, text="", font_size='13sp', color=(1, 0.92, 0.7, 1), bold=True, size_hint_y=None, height=dp(25))
+        card_container.add_widget(card_button)
+        card_container.add_widget(card_label)
+        return card_container, card_button, card_label
 
     # --- Animation & Visual Effects ---
 
@@ -623,41 +808,35 @@ class LoveLetterGame(FloatLayout):
         if not self.parent:
             if on_complete: on_complete(); return
         start_pos, end_pos = self.get_widget_center(source_widget), self.get_widget_center(target_widget)
-        card_widget = Image(source=card_image_path, size_hint=(None, None), size=(dp(100), dp(140)), opacity=0.8)
-        card_widget.center = start_pos; card_widget.is_temp_anim = True
-        self.add_widget(card_widget)
-        anim = Animation(center=end_pos, opacity=1, duration=duration, t='out_quad')
-        def on_anim_end(*args):
-            if card_widget.parent: self.remove_widget(card_widget)
-            if on_complete: on_complete()
-        anim.bind(on_complete=on_anim_end); anim.start(card_widget)
+        self.animation_manager.fly_card(card_image_path, start_pos, end_pos, on_complete, duration=duration)
 
-    def animate_token_fly(self, token_widget, target_widget, on_complete=None, duration=1.2):
+    def animate_token_fly(self, target_widget, on_complete=None, duration=1.2, color=(1, 0.9, 0.4, 1)):
+        on_complete = self.frame_profiler.track('token', on_complete)
         if not self.parent:
             if on_complete: on_complete(); return
-        start_pos, end_pos = self.center, self.get_widget_center(target_widget)
-        token_widget.size_hint = (None, None); token_widget.size = (dp(50), dp(50)); token_widget.center = start_pos; token_widget.opacity = 0; token_widget.scale = 1.0
-        self.add_widget(token_widget)
-        anim = (Animation(opacity=1, scale=1.5, duration=duration*0.2, t='out_quad') + Animation(center=end_pos, scale=0.5, duration=duration*0.6, t='in_cubic') + Animation(opacity=0, duration=duration*0.2))
-        def final_callback(*args):
-            if token_widget.parent: self.remove_widget(token_widget)
-            self.update_ui_full()
+        def final_callback():
+            self.request_ui_update(UI_SCORE)
             if on_complete: on_complete()
-        anim.bind(on_complete=final_callback); anim.start(token_widget)
+        self.animation_manager.fly_token(target_widget, color, final_callback, duration=duration)
 
     def ui_animate_card_effect(self, data, on_complete):
+        on_complete = self.frame_profiler.track('effect_panel', on_complete)
+        f = self.time_scale.factor(EFFECT)
+        if not f:
+            if on_complete: on_complete()
+            return
         panel = EffectAnimationPanel(data=data, size_hint=(None, None), size=(dp(500), dp(180)), pos_hint={'center_x': 0.5, 'center_y': 0.55}, opacity=0, scale=0.8)
         self.add_widget(panel)
-        anim_appear = Animation(opacity=1, scale=1, duration=0.4, t='out_back')
-        anim_pause1 = Animation(duration=1.5)
-        anim_pause2 = Animation(duration=1.7)
-        anim_fade_out = Animation(opacity=0, scale=0.8, duration=0.4, t='in_back')
+        anim_appear = Animation(opacity=1, scale=1, duration=0.4 * f, t='out_back')
+        anim_pause1 = Animation(duration=1.5 * f)
+        anim_pause2 = Animation(duration=1.7 * f)
+        anim_fade_out = Animation(opacity=0, scale=0.8, duration=0.4 * f, t='in_back')
 
         anim_pause1.bind(on_start=lambda *a: panel.update_state('intermediate'))
         def set_final_state_and_highlight(*args):
             panel.update_state('final')
             target_id = data['target_player'].id
-            color_map = {'success': 'elimination', 'fail': 'target', 'reversed': 'elimination', 'win': 'target', 'loss': 'elimination', 'tie': 'target'}
+            color_map = {'success': 'elimination', 'fail': 'target', 'reversed': 'elimination', 'win': 'target', 'loss': 'elimination', 'tie': 'target', 'eliminated': 'elimination'}
             outcome = data['outcome']
             if outcome == 'reversed': target_id = data['acting_player'].id
             self.ui_animate_effect({'type': 'highlight_player', 'player_ids': [target_id], 'color_type': color_map.get(outcome, 'target')})
@@ -675,7 +854,8 @@ class LoveLetterGame(FloatLayout):
         colors = {'target': (0.5, 0.8, 1, 0.8), 'elimination': (1, 0.2, 0.2, 0.8), 'protection': (0.2, 1, 0.2, 0.8)}
         rgba = colors.get(effect_details.get('color_type', 'target'))
         target_ids = effect_details.get('player_ids', [])
-        if not target_ids:
+        f = self.time_scale.factor(EFFECT)
+        if not target_ids or not f:
             if on_complete_callback: on_complete_callback(); return
 
         completed_count = 0
@@ -690,8 +870,8 @@ class LoveLetterGame(FloatLayout):
                 with widget.canvas.after:
                     glow_color = Color(rgba=(*rgba[:3], 0))
                     glow_line = Line(rounded_rectangle=(widget.x, widget.y, widget.width, widget.height, dp(15)), width=1.5)
-                color_anim = (Animation(a=1.0, d=0.3, t='out_quad') + Animation(d=0.5) + Animation(a=0.0, d=0.4, t='in_quad'))
-                line_anim = (Animation(width=dp(3.5), d=0.3, t='out_quad') + Animation(d=0.5) + Animation(width=dp(1.0), d=0.4, t='in_quad'))
+                color_anim = (Animation(a=1.0, d=0.3 * f, t='out_quad') + Animation(d=0.5 * f) + Animation(a=0.0, d=0.4 * f, t='in_quad'))
+                line_anim = (Animation(width=dp(3.5), d=0.3 * f, t='out_quad') + Animation(d=0.5 * f) + Animation(width=dp(1.0), d=0.4 * f, t='in_quad'))
                 def cleanup(w, gc, gl, *args):
                     if w and w.canvas:
                         try: w.canvas.after.remove(gc); w.canvas.after.remove(gl)
@@ -703,17 +883,21 @@ class LoveLetterGame(FloatLayout):
     def show_turn_notification(self, title, details, stay_duration=2.5):
         if self.active_notification and self.active_notification.parent:
             Animation.cancel_all(self.active_notification); self.remove_widget(self.active_notification)
+        f = self.time_scale.factor(NOTIFICATION)
+        if not f: return
         notification = TurnNotificationPopup(title_text=title, detail_text=details)
         notification.pos_hint = {'center_x': 0.5, 'center_y': 0.65}; notification.opacity = 0; notification.scale = 0.8
         self.add_widget(notification); self.active_notification = notification
-        anim = (Animation(opacity=1, scale=1, d=0.4, t='out_back') + Animation(d=stay_duration) + Animation(opacity=0, scale=0.8, d=0.5, t='in_back'))
+        anim = (Animation(opacity=1, scale=1, d=0.4 * f, t='out_back') + Animation(d=stay_duration * f) + Animation(opacity=0, scale=0.8, d=0.5 * f, t='in_back'))
         def on_complete(*args):
             if notification.parent: notification.parent.remove_widget(notification)
             if self.active_notification == notification: self.active_notification = None
         anim.bind(on_complete=on_complete); anim.start(notification)
 
     def show_victory_defeat_effect(self, is_victory=True, on_complete=None):
-        if not self.parent:
+        on_complete = self.frame_profiler.track('victory' if is_victory else 'defeat', on_complete)
+        f = self.time_scale.factor(NOTIFICATION)
+        if not self.parent or not f:
             if on_complete: on_complete(); return
         img_path = VICTORY_IMAGE if is_victory else DEFEAT_IMAGE
         if not os.path.exists(img_path):
@@ -721,7 +905,7 @@ class LoveLetterGame(FloatLayout):
         effect_img = Image(source=img_path, size=(dp(600), dp(300)), allow_stretch=True, keep_ratio=False)
         scatter = Scatter(size_hint=(None, None), size=effect_img.size, pos_hint={'center_x': 0.5, 'center_y': 0.5}, do_rotation=False, do_translation=False, do_scale=True, scale=0.5, opacity=0, auto_bring_to_front=False)
         scatter.add_widget(effect_img); scatter.is_temp_anim = True; self.add_widget(scatter)
-        anim = Animation(opacity=1, scale=1, d=0.5, t='out_elastic') + Animation(d=1.6) + Animation(opacity=0, scale=1.5, d=0.5, t='in_quad')
+        anim = Animation(opacity=1, scale=1, d=0.5 * f, t='out_elastic') + Animation(d=1.6 * f) + Animation(opacity=0, scale=1.5, d=0.5 * f, t='in_quad')
         def remove_img(*_):
             if scatter.parent: self.remove_widget(scatter)
             if on_complete: on_complete()
@@ -746,12 +930,48 @@ class LoveLetterGame(FloatLayout):
 
     def set_waiting_for_input_flag(self, is_waiting):
         self.waiting_for_input = is_waiting
-        self.update_ui_full()
+        if not is_waiting and self.time_scale.skipping and self._is_human_turn():
+            self._stop_skipping()
+        self.request_ui_update(UI_HAND)
+
+    def _is_human_turn(self):
+        round_manager = self.current_round_manager
+        return (round_manager is not None and round_manager.round_active
+                and round_manager.players[round_manager.current_player_idx].id == self.human_player_id)
+
+    # --- Game Speed ---
+
+    def _update_speed_buttons(self):
+        if self.speed_button:
+            self.speed_button.text = f"Tốc độ x{self.time_scale.speed:g}"
+        if self.skip_button:
+            self.skip_button.disabled = self.time_scale.skipping
+
+    def toggle_turbo(self, instance):
+        self.time_scale.speed = GAME_SPEED if self.time_scale.speed != GAME_SPEED else TURBO_SPEED
+        self._update_speed_buttons()
+
+    def skip_to_my_turn(self, instance):
+        """Resolves everything instantly until the human's next turn (or the end of the round)."""
+        round_manager = self.current_round_manager
+        if self.time_scale.skipping or not round_manager or not round_manager.round_active or self._is_human_turn():
+            return
+        self.time_scale.skipping = True
+        self._clear_animations_and_proceed(None, finish_flights=True)
+        if self.active_notification and self.active_notification.parent:
+            Animation.cancel_all(self.active_notification); self.remove_widget(self.active_notification)
+        self._update_speed_buttons()
+
+    def _stop_skipping(self):
+        self.time_scale.skipping = False
+        self._update_speed_buttons()
 
     def dismiss_active_popup(self):
         if self.active_popup: self.active_popup.dismiss(); self.active_popup = None
 
-    def _clear_animations_and_proceed(self, on_complete_callback):
+    def _clear_animations_and_proceed(self, on_complete_callback, finish_flights=False):
+        """Removes animation widgets. `finish_flights` keeps the round going: flights in progress land at once."""
+        self.animation_manager.release_all(finish_flights)
         if self.parent:
             for w in self.children[:]:
                 if hasattr(w, 'is_temp_anim'): self.remove_widget(w)
@@ -764,11 +984,13 @@ class LoveLetterGame(FloatLayout):
         self.log_message(f"--- Bắt đầu ván chơi mới với {self.num_players_session} người chơi ---")
         for p in self.players_session_list: p.tokens = 0
         self.game_over_session_flag = False
+        self.latency = LatencyRecorder() if PROFILE_LATENCY else None
+        self._stop_skipping()
         self.start_new_round()
 
     def start_tutorial(self):
         self._clear_animations_and_proceed(None)
-        self.game_log = ["Chào mừng đến với Hướng dẫn Thư Tình!"]
+        self._reset_log("Chào mừng đến với Hướng dẫn Thư Tình!")
         self.global_discard_pile.clear()
         self.num_players_session = 2
         self.players_session_list = [Player(id_num=0, name="An", is_cpu=True), Player(id_num=1, name="Bình", is_cpu=True)]
@@ -807,13 +1029,13 @@ class LoveLetterGame(FloatLayout):
         if self.game_over_session_flag:
             self.log_message("Trò chơi đã kết thúc."); self.update_ui_full(); return
 
-        game_deck = Deck(self.num_players_session, self.log_message)
+        game_deck = Deck(self.num_players_session, self.event_log)
         game_deck.burn_one_card(self.num_players_session)
         if game_deck.count() < self.num_players_session:
             self.log_message("Lỗi: Không đủ bài trong chồng bài."); self.game_over_session_flag = True; self.update_ui_full(); return
 
         ui_callbacks = {
-            'update_ui_full_callback': self.update_ui_full,
+            'update_ui_full_callback': self.request_ui_update,
             'set_waiting_flag_callback': self.set_waiting_for_input_flag,
             'get_active_popup_callback': lambda: self.active_popup,
             'dismiss_active_popup_callback': self.dismiss_active_popup,
@@ -830,16 +1052,21 @@ class LoveLetterGame(FloatLayout):
             'animate_play_card_callback': self.ui_animate_play_card,
             'animate_elimination_callback': self.ui_animate_elimination,
             'animate_king_swap_callback': self.ui_animate_king_swap,
-            'add_to_global_discard_callback': self.add_to_global_discard
+            'add_to_global_discard_callback': self.add_to_global_discard,
+            'remove_last_global_discard_callback': self.remove_last_global_discard
         }
-        self.current_round_manager = GameRound(self.players_session_list, game_deck, self.human_player_id, self.log_message, ui_callbacks)
+        self.current_round_manager = GameRound(self.players_session_list, game_deck, self.human_player_id, self.event_log, ui_callbacks,
+                                               scheduler=self.time_scale.schedule)
+        if self.latency is not None:
+            self.current_round_manager.instrument(self.latency)
         self.current_round_manager.start_round()
 
     def award_round_tokens_and_check_game_over(self, list_of_winner_players, reason_for_win=""):
-        self.update_ui_full()
+        if self.time_scale.skipping: self._stop_skipping()  # The round result is always shown.
+        self.request_ui_update()
         if not list_of_winner_players or not list_of_winner_players[0]:
             self.show_turn_notification("Vòng đấu kết thúc", reason_for_win or "Không có người chiến thắng.", stay_duration=3.5)
-            Clock.schedule_once(lambda dt: self.update_ui_full(), 1.5)
+            self.time_scale.schedule(lambda: self.request_ui_update(), 1.5, NOTIFICATION)
             return
 
         winner_names = ", ".join([p.name for p in list_of_winner_players])
@@ -852,10 +1079,10 @@ class LoveLetterGame(FloatLayout):
             winner_of_round.tokens += 1
             if self.check_game_over_on_token_gain(winner_of_round): final_winner_of_game = winner_of_round
             player_widget = self._get_player_widget_by_id(winner_of_round.id)
-            if player_widget: self.animate_token_fly(Label(text="*", font_size=dp(40), color=(1, 0.9, 0.4, 1), bold=True), player_widget)
+            if player_widget: self.animate_token_fly(player_widget)
 
-        if final_winner_of_game: Clock.schedule_once(lambda dt: self.handle_game_over_from_round(final_winner_of_game), 1.5)
-        else: Clock.schedule_once(lambda dt: self.update_ui_full(), 1.5)
+        if final_winner_of_game: self.time_scale.schedule(lambda: self.handle_game_over_from_round(final_winner_of_game), 1.5, NOTIFICATION)
+        else: self.time_scale.schedule(lambda: self.request_ui_update(), 1.5, NOTIFICATION)
 
     def check_game_over_on_token_gain(self, player):
         return not self.game_over_session_flag and player.tokens >= self.tokens_to_win_session
@@ -865,6 +1092,9 @@ class LoveLetterGame(FloatLayout):
         self.log_message(f"--- TRÒ CHƠI KẾT THÚC! {winner_of_game.name} chiến thắng! ---")
         self.game_over_session_flag = True
         if self.current_round_manager: self.current_round_manager.round_active = False
+        if self.latency is not None:
+            for line in ["Latency summary of this game:"] + self.latency.summary().splitlines():
+                Logger.info(f"LoveLetter: {line}")
         self.update_ui_full()
         self.display_victory_screen(winner_of_game)
 
@@ -910,7 +1140,7 @@ class LoveLetterGame(FloatLayout):
         name_box = BoxLayout(orientation='vertical', size_hint_x=0.7); name_box.add_widget(StyledLabel(text=f"{card_data.name}", font_size=dp(24), bold=True, halign='left')); name_box.add_widget(StyledLabel(text=f"({card_data.vietnamese_name})", font_size=dp(16), italic=True, halign='left'))
         header.add_widget(name_box); header.add_widget(StyledLabel(text=f"Giá trị: {card_data.value}", font_size=dp(20), bold=True, size_hint_x=0.3))
         popup_layout.add_widget(header)
-        content = BoxLayout(padding=15, spacing=10); content.add_widget(Image(source=card_data.image_path, size_hint_x=0.4))
+        content = BoxLayout(padding=15, spacing=10); content.add_widget(Image(texture=card_textures.get(card_data.image_path), size_hint_x=0.4))
         effect_panel = BoxLayout(orientation='vertical', size_hint_x=0.6, spacing=10)
         effect_panel.add_widget(StyledLabel(text="Hiệu ứng:", font_size=dp(22), bold=True, color=(0.9, 0.8, 0.3, 1), size_hint_y=None, height=dp(40)))
         effect_box = ScrollView();
@@ -920,24 +1150,29 @@ class LoveLetterGame(FloatLayout):
         footer = BoxLayout(size_hint_y=None, height=dp(60), padding=[dp(100), dp(5), dp(100), 0]); footer.add_widget(create_selection_button("Đóng", lambda x: self.dismiss_active_popup(), color_scheme='cancel')); popup_layout.add_widget(footer)
         self.active_popup = Popup(title="", content=popup_layout, size_hint=(0.85, 0.8), separator_height=0, auto_dismiss=True, background_color=(0.1, 0.1, 0.1, 0.95)); self.active_popup.open()
 
-    def ui_display_target_selection_popup(self, acting_player, card_played, valid_targets, on_select, on_cancel):
+    def ui_display_target_selection_popup(self, acting_player, card_played, valid_targets, on_select, on_cancel, on_skip=None):
         self.dismiss_active_popup(); self.set_waiting_for_input_flag(True)
         popup_layout = BoxLayout(orientation='vertical', spacing=dp(20), padding=dp(30))
-        header_box = BoxLayout(size_hint_y=None, height=dp(80), spacing=18); header_box.add_widget(Image(source=card_played.image_path, size_hint_x=0.25))
+        header_box = BoxLayout(size_hint_y=None, height=dp(80), spacing=18); header_box.add_widget(Image(texture=card_textures.get(card_played.image_path), size_hint_x=0.25))
         info_box = BoxLayout(orientation='vertical', size_hint_x=0.75); info_box.add_widget(StyledLabel(text=f"{card_played.name}", font_size=20, color=(1, 0.92, 0.7, 1), bold=True)); info_box.add_widget(StyledLabel(text=card_played.description, font_size=15, color=(1, 1, 1, 0.85)))
-        popup_layout.add_widget(header_box); popup_layout.add_widget(StyledLabel(text=f"Chọn mục tiêu:", font_size=18, color=(1, 0.92, 0.7, 1), size_hint_y=None, height=dp(36)))
+        popup_layout.add_widget(header_box); popup_layout.add_widget(StyledLabel(text="Chọn thêm mục tiêu (không bắt buộc):" if on_skip else "Chọn mục tiêu:", font_size=18, color=(1, 0.92, 0.7, 1), size_hint_y=None, height=dp(36)))
         target_grid = GridLayout(cols=1, spacing=dp(10), size_hint_y=None); target_grid.bind(minimum_height=target_grid.setter('height'))
         for target in valid_targets:
             btn_text = f"{target.name}{' (Chính mình)' if target == acting_player else ''}"
             target_grid.add_widget(create_selection_button(btn_text, lambda _, t=target.id: (self.dismiss_active_popup(), on_select(acting_player, t))))
         scroll_view = ScrollView(); scroll_view.add_widget(target_grid); popup_layout.add_widget(scroll_view)
-        popup_layout.add_widget(create_selection_button("Quay lại (Chọn lá khác)", lambda _: on_cancel(acting_player), color_scheme='cancel'))
+        if on_skip:  # The card's required targets are already chosen
+            popup_layout.add_widget(create_selection_button("Xong (không chọn thêm)", lambda _: (self.dismiss_active_popup(), on_skip(acting_player)), color_scheme='confirm'))
+        if on_cancel:  # None once the effect can no longer be taken back
+            popup_layout.add_widget(create_selection_button("Quay lại (Chọn lá khác)", lambda _: on_cancel(acting_player), color_scheme='cancel'))
         self.active_popup = Popup(title=f"Chơi {card_played.name}", content=popup_layout, size_hint=(0.8, 0.85), auto_dismiss=False, title_size='20sp', background_color=(0.18, 0.07, 0.07, 0.98)); self.active_popup.open()
 
-    def ui_display_confirmation_popup(self, acting_player, card_played, on_confirm, on_cancel):
+    def ui_display_confirmation_popup(self, acting_player, card_played, on_confirm, on_cancel, question=None):
+        if question:
+            self.ui_display_question_popup(acting_player, card_played, question, on_confirm, on_cancel); return
         self.dismiss_active_popup(); self.set_waiting_for_input_flag(True)
         popup_layout = BoxLayout(orientation='vertical', spacing=dp(24), padding=dp(36))
-        header_box = BoxLayout(size_hint_y=0.6, spacing=18); header_box.add_widget(Image(source=card_played.image_path, size_hint_x=0.35))
+        header_box = BoxLayout(size_hint_y=0.6, spacing=18); header_box.add_widget(Image(texture=card_textures.get(card_played.image_path), size_hint_x=0.35))
         info_box = BoxLayout(orientation='vertical', size_hint_x=0.65); info_box.add_widget(StyledLabel(text=f"{card_played.name} (Giá trị: {card_played.value})", font_size=20, color=(1, 0.92, 0.7, 1), bold=True)); info_box.add_widget(StyledLabel(text=f"[b]Hiệu ứng:[/b] {card_played.description}", font_size=15, markup=True, color=(1, 1, 1, 0.85)))
         popup_layout.add_widget(header_box)
         button_box = BoxLayout(orientation='vertical', size_hint_y=0.4, spacing=15)
@@ -946,6 +1181,19 @@ class LoveLetterGame(FloatLayout):
         popup_layout.add_widget(button_box)
         self.active_popup = Popup(title="Xác nhận chơi bài", content=popup_layout, size_hint=(0.7, 0.6), auto_dismiss=False, title_size='20sp', background_color=(0.18, 0.07, 0.07, 0.98)); self.active_popup.open()
 
+    def ui_display_question_popup(self, player, card, question, on_yes, on_no):
+        """A yes/no choice about `card` asked by another player's effect; it cannot be dismissed without an answer."""
+        self.dismiss_active_popup(); self.set_waiting_for_input_flag(True)
+        popup_layout = BoxLayout(orientation='vertical', spacing=dp(24), padding=dp(36))
+        header_box = BoxLayout(size_hint_y=0.6, spacing=18); header_box.add_widget(Image(texture=card_textures.get(card.image_path), size_hint_x=0.35))
+        header_box.add_widget(StyledLabel(text=question, font_size=18, color=(1, 0.92, 0.7, 1), halign='center', valign='middle', size_hint_x=0.65))
+        popup_layout.add_widget(header_box)
+        button_box = BoxLayout(orientation='vertical', size_hint_y=0.4, spacing=15)
+        button_box.add_widget(create_selection_button("Có", lambda _: (self.dismiss_active_popup(), on_yes(player)), color_scheme='confirm'))
+        button_box.add_widget(create_selection_button(f"Không, giữ lại {card.name}", lambda _: (self.dismiss_active_popup(), on_no(player)), color_scheme='cancel'))
+        popup_layout.add_widget(button_box)
+        self.active_popup = Popup(title=f"{player.name}, bạn chọn gì?", content=popup_layout, size_hint=(0.7, 0.6), auto_dismiss=False, title_size='20sp', background_color=(0.18, 0.07, 0.07, 0.98)); self.active_popup.open()
+
     def ui_display_guard_value_popup(self, acting_player, target_player, possible_values, on_select, on_cancel):
         self.dismiss_active_popup(); self.set_waiting_for_input_flag(True)
         popup_layout = BoxLayout(orientation='vertical', spacing=dp(15), padding=dp(20))
@@ -959,49 +1207,59 @@ class LoveLetterGame(FloatLayout):
 
     # --- Animation Callbacks for GameRound ---
     def ui_animate_deal(self, on_complete):
-        self.update_ui_full()
+        on_complete = self.frame_profiler.track('deal', on_complete)
+        self.request_ui_update()
         def _start_deal_animation(dt):
+            f = self.time_scale.factor(CARD_FLIGHT)
+            if not f:
+                on_complete(); return
             delay = 0.0
             players_to_animate = self.players_session_list
             for player in players_to_animate:
                 target_widget = self._get_player_widget_by_id(player.id)
                 if target_widget:
                     Clock.schedule_once(lambda _, p=player, t=target_widget: self._animate_card_flight(self.deck_image, t, CARD_BACK_IMAGE, None), delay)
-                    delay += 0.2
-            Clock.schedule_once(lambda _, oc=on_complete: oc(), delay + 0.5)
+                    delay += 0.2 * f
+            Clock.schedule_once(lambda _, oc=on_complete: oc(), delay + 0.5 * f)
         Clock.schedule_once(_start_deal_animation)
 
     def ui_animate_draw(self, player, on_complete):
+        on_complete = self.frame_profiler.track('draw', on_complete)
         target_widget = self._get_player_widget_by_id(player.id)
         if target_widget: self._animate_card_flight(self.deck_image, target_widget, CARD_BACK_IMAGE, on_complete)
         elif on_complete: on_complete()
 
     def ui_animate_play_card(self, player, card, on_complete):
+        on_complete = self.frame_profiler.track('play_card', on_complete)
         source_widget = self._get_player_widget_by_id(player.id)
         if source_widget: self._animate_card_flight(source_widget, self.last_played_card_container, card.image_path, on_complete)
         elif on_complete: on_complete()
 
     def ui_animate_elimination(self, player, on_complete):
+        on_complete = self.frame_profiler.track('elimination', on_complete)
         self.ui_animate_effect({'type': 'highlight_player', 'player_ids': [player.id], 'color_type': 'elimination'}, on_complete)
-        self.update_ui_full()
+        self.request_ui_update(UI_OPPONENTS | UI_HAND)
 
     def ui_animate_king_swap(self, player1, player2, card1_obj, card2_obj, on_complete):
+        on_complete = self.frame_profiler.track('king_swap', on_complete)
         p1_widget, p2_widget = self._get_player_widget_by_id(player1.id), self._get_player_widget_by_id(player2.id)
-        if not self.parent or not p1_widget or not p2_widget:
+        duration = self.time_scale.seconds(CARD_FLIGHT, 0.8)
+        if not self.parent or not p1_widget or not p2_widget or not duration:
+            self.request_ui_update(UI_OPPONENTS | UI_HAND)
             if on_complete: on_complete(); return
         p1_pos, p2_pos = self.get_widget_center(p1_widget), self.get_widget_center(p2_widget)
-        card1 = Image(source=card1_obj.image_path, size_hint=(None, None), size=(dp(80), dp(112)), center=p1_pos); card1.is_temp_anim = True
-        card2 = Image(source=card2_obj.image_path, size_hint=(None, None), size=(dp(80), dp(112)), center=p2_pos); card2.is_temp_anim = True
+        card1 = Image(texture=card_textures.get(card1_obj.image_path, SMALL), size_hint=(None, None), size=(dp(80), dp(112)), center=p1_pos); card1.is_temp_anim = True
+        card2 = Image(texture=card_textures.get(card2_obj.image_path, SMALL), size_hint=(None, None), size=(dp(80), dp(112)), center=p2_pos); card2.is_temp_anim = True
         self.add_widget(card1); self.add_widget(card2)
-        anim1 = Animation(center=p2_pos, duration=0.8, t='in_out_sine')
-        anim2 = Animation(center=p1_pos, duration=0.8, t='in_out_sine')
+        anim1 = Animation(center=p2_pos, duration=duration, t='in_out_sine')
+        anim2 = Animation(center=p1_pos, duration=duration, t='in_out_sine')
         completion_data = {'count': 0}
         def on_single_anim_end(*args):
             completion_data['count'] += 1
             if completion_data['count'] >= 2:
                 if card1.parent: self.remove_widget(card1)
                 if card2.parent: self.remove_widget(card2)
-                self.update_ui_full()
+                self.request_ui_update(UI_OPPONENTS | UI_HAND)
                 if on_complete: on_complete()
         anim1.bind(on_complete=on_single_anim_end); anim2.bind(on_complete=on_single_anim_end)
         anim1.start(card1); anim2.start(card2)
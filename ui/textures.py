@@ -0,0 +1,58 @@
+# file: ui/textures.py
+"""
+Card texture cache.
+
+Each card image is decoded and uploaded to the GPU once; widgets then bind the
+shared texture (`Image(texture=card_textures.get(card.image_path))`) instead
+of loading a `source` of their own. Textures come from the atlases built by
+tools/build_card_atlas.py when they exist, otherwise from the image files.
+
+Variants: FULL is the original art (hand, played cards, popups); SMALL is the
+downscaled art for card flights and opponent panels. Without a small atlas,
+SMALL shares the full-size texture.
+"""
+import os
+
+from kivy.atlas import Atlas
+from kivy.core.image import Image as CoreImage
+
+from .constants import CARD_ATLAS_DIR
+
+FULL = 'full'
+SMALL = 'small'
+
+
+class TextureCache:
+    def __init__(self, atlas_dir=CARD_ATLAS_DIR):
+        self.atlas_dir = atlas_dir
+        self._atlases = {}
+        # (card image name, variant) -> Texture, or None if the image could not be loaded.
+        self._textures = {}
+
+    def get(self, image_path, variant=FULL):
+        key = (os.path.splitext(os.path.basename(image_path))[0], variant)
+        try:
+            return self._textures[key]
+        except KeyError:
+            texture = self._textures[key] = self._load(key[0], image_path, variant)
+            return texture
+
+    def _atlas(self, variant):
+        if variant not in self._atlases:
+            path = os.path.join(self.atlas_dir, f"cards-{variant}.atlas")
+            self._atlases[variant] = Atlas(path) if os.path.exists(path) else None
+        return self._atlases[variant]
+
+    def _load(self, name, image_path, variant):
+        atlas = self._atlas(variant)
+        if atlas is not None and name in atlas.textures:
+            return atlas.textures[name]
+        if variant != FULL:
+            return self.get(image_path, FULL)
+        try:
+            return CoreImage(image_path).texture
+        except Exception:
+            return None  # Same as an Image widget with a missing source: nothing is drawn.
+
+
+card_textures = TextureCache()
@@ -6,10 +6,16 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.button import Button
 from kivy.uix.behaviors import ButtonBehavior
+from kivy.uix.textinput import TextInput
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.graphics import Color, RoundedRectangle
 from kivy.metrics import dp
 from kivy.properties import NumericProperty, ListProperty
 
+from .textures import card_textures
+
 
 class StyledLabel(Label):
     def __init__(self, **kwargs):
@@ -132,8 +138,19 @@ class TurnNotificationPopup(BoxLayout):
 
 
 class EffectAnimationPanel(BoxLayout):
+    """Shows a card effect in three steps. Texts are chosen by the effect action (see logic/card_effects.py)."""
     scale = NumericProperty(1.0)
 
+    INTERMEDIATE_TEXT = {
+        'compare': "So bài...",
+        'swap': "Tráo đổi bài...",
+        'reveal': "Nhìn trộm bài...",
+        'discard_draw': "Bắt bỏ bài...",
+        'protect': "Tự bảo vệ!",
+        'bet_on_winner': "Đặt cược...",
+        'force_self_target': "Nịnh bợ...",
+    }
+
     def __init__(self, data, **kwargs):
         super().__init__(**kwargs)
         self.data = data
@@ -169,57 +186,59 @@ class EffectAnimationPanel(BoxLayout):
         target_player = self.data['target_player']
         outcome = self.data['outcome']
         details = self.data['details']
-        card_name = self.data['card'].name
+        action = self.data['action']
 
         text, color = "...", (1, 1, 1, 1)
 
-        if card_name == 'Guard':
+        if outcome == 'fail' and details.get('reason'):
+            text, color = details['reason'], (1, 0.4, 0.4, 1)
+        elif action == 'guess':
             if outcome == 'success': text, color = f"[b]{target_player.name}[/b] đã bị loại!", (0.4, 1, 0.4, 1)
+            elif outcome == 'token': text, color = f"[b]{acting_player.name}[/b] đoán đúng và nhận một tín vật!", (0.4, 1, 0.4, 1)
             elif outcome == 'fail': text, color = f"[b]{acting_player.name}[/b] đã đoán sai!", (1, 0.4, 0.4, 1)
             elif outcome == 'reversed': text, color = f"[b]{acting_player.name}[/b] đã bị Sát thủ loại!", (1, 0.2, 0.8, 1)
-        elif card_name == 'Priest':
+        elif action == 'reveal':
             card_name_seen = details['target_card'].name
             text = f"Bạn thấy lá [b]{card_name_seen}[/b] của [b]{target_player.name}[/b]." if not acting_player.is_cpu else f"[b]{acting_player.name}[/b] đã xem bài của [b]{target_player.name}[/b]."
-        elif card_name == 'Baron':
+        elif action == 'compare':
             if outcome == 'win': text, color = f"[b]{acting_player.name}[/b] thắng! [b]{target_player.name}[/b] bị loại.", (0.4, 1, 0.4, 1)
             elif outcome == 'loss': text, color = f"[b]{acting_player.name}[/b] thua và bị loại!", (1, 0.4, 0.4, 1)
             else: text = f"[b]{acting_player.name}[/b] và [b]{target_player.name}[/b] hòa nhau!"
-        elif card_name == 'King':
+        elif action == 'swap':
             text, color = f"[b]{acting_player.name}[/b] tráo bài với [b]{target_player.name}[/b]!", (0.9, 0.7, 0.2, 1)
-        elif card_name == 'Prince':
+        elif action == 'discard_draw':
             if outcome == 'eliminated': text, color = f"[b]{target_player.name}[/b] phải bỏ Công chúa và bị loại!", (1, 0.2, 0.2, 1)
             else:
                 discarded_name = details['discarded_card'].name if details.get('discarded_card') else "bài"
                 text = f"[b]{target_player.name}[/b] bỏ lá [b]{discarded_name}[/b] và rút bài mới."
-        elif card_name == 'Handmaid':
+        elif action == 'protect':
             text, color = f"[b]{acting_player.name}[/b] đã được bảo vệ!", (0.5, 0.8, 1, 1)
+        elif action == 'bet_on_winner':
+            text, color = f"[b]{acting_player.name}[/b] đặt cược vào [b]{target_player.name}[/b]!", (0.9, 0.7, 0.2, 1)
+        elif action == 'force_self_target':
+            text, color = f"[b]{target_player.name}[/b] phải tự chọn mình ở lá bài tiếp theo!", (0.9, 0.7, 0.2, 1)
 
         return text, color
 
 
     def update_state(self, state):
         self.mid_section.clear_widgets()
-        card_name = self.data['card'].name
+        action = self.data.get('action')
         details = self.data.get('details', {})
 
         if state == 'initial':
             self.footer.text = "Đang chơi..."
-            self.mid_section.add_widget(Image(source=self.data['card'].image_path, size_hint=(0.25, 1), pos_hint={'center_x': 0.5, 'center_y': 0.5}))
+            self.mid_section.add_widget(Image(texture=card_textures.get(self.data['card'].image_path), size_hint=(0.25, 1), pos_hint={'center_x': 0.5, 'center_y': 0.5}))
 
         elif state == 'intermediate':
-            if card_name == 'Guard': self.footer.text = f"Đoán giá trị là [b]{details.get('guessed_value', '?')}[/b]"
-            elif card_name == 'Baron': self.footer.text = "So bài..."
-            elif card_name == 'King': self.footer.text = "Tráo đổi bài..."
-            elif card_name == 'Priest': self.footer.text = "Nhìn trộm bài..."
-            elif card_name == 'Prince': self.footer.text = "Bắt bỏ bài..."
-            elif card_name == 'Handmaid': self.footer.text = "Tự bảo vệ!"
-            else: self.footer.text = "..."
+            self.footer.text = self.INTERMEDIATE_TEXT.get(action, "...")
+            if action == 'guess': self.footer.text = f"Đoán giá trị là [b]{details.get('guessed_value', '?')}[/b]"
 
         elif state == 'final':
-            if card_name == 'Baron':
+            if action == 'compare':
                 p_card, o_card = details.get('player_card'), details.get('opponent_card')
-                if p_card: self.mid_section.add_widget(Image(source=p_card.image_path, size_hint=(0.25, 1), pos_hint={'center_x': 0.25, 'center_y': 0.5}))
-                if o_card: self.mid_section.add_widget(Image(source=o_card.image_path, size_hint=(0.25, 1), pos_hint={'center_x': 0.75, 'center_y': 0.5}))
+                if p_card: self.mid_section.add_widget(Image(texture=card_textures.get(p_card.image_path), size_hint=(0.25, 1), pos_hint={'center_x': 0.25, 'center_y': 0.5}))
+                if o_card: self.mid_section.add_widget(Image(texture=card_textures.get(o_card.image_path), size_hint=(0.25, 1), pos_hint={'center_x': 0.75, 'center_y': 0.5}))
 
             outcome_text, outcome_color = self._get_outcome_text_and_color()
             self.footer.text = outcome_text
@@ -228,3 +247,80 @@ class EffectAnimationPanel(BoxLayout):
     def _update_rect(self, instance, value):
         self.bg.pos = self.pos
         self.bg.size = self.size
+
+
+class LogRow(RecycleDataViewBehavior, Label):
+    """One line of a LogPanel. Wraps to the panel width and reports its wrapped height back to the data."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.halign = 'left'
+        self.valign = 'top'
+        self.font_size = dp(14)
+        self.color = (0.95, 0.95, 0.98, 1)
+        self.padding = (dp(10), dp(2))
+        self.size_hint_y = None
+        self._rv = None
+        self._index = 0
+        self.bind(width=lambda *x: setattr(self, 'text_size', (self.width, None)))
+
+    def refresh_view_attrs(self, rv, index, data):
+        self._rv, self._index = rv, index
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_texture_size(self, instance, size):
+        rv, index = self._rv, self._index
+        if rv is None or index >= len(rv.data):
+            return
+        item = rv.data[index]
+        if item['text'] is self.text and item.get('height') != size[1]:
+            rv.data[index] = dict(item, height=size[1])  # relayouts this row only
+
+
+class LogPanel(BoxLayout):
+    """
+    The game log: a search box over a RecycleView of `lines`, a deque with a
+    maxlen owned by the game. Only the visible rows are widgets, so the history
+    can be long and appending a line renders one row, not the whole text.
+    """
+
+    def __init__(self, lines, **kwargs):
+        super().__init__(orientation='vertical', spacing=dp(5), **kwargs)
+        self.lines = lines
+        self.query = ''
+
+        self.search_input = TextInput(hint_text="Tìm trong nhật ký...", multiline=False, size_hint_y=None,
+                                      height=dp(32), font_size=dp(14))
+        self.search_input.bind(text=self._on_query)
+        self.add_widget(self.search_input)
+
+        self.view = RecycleView(viewclass=LogRow, do_scroll_x=False)
+        self.rows_layout = RecycleBoxLayout(orientation='vertical', size_hint_y=None,
+                                            default_size=(None, dp(24)), default_size_hint=(1, None))
+        self.rows_layout.bind(minimum_height=self.rows_layout.setter('height'))
+        self.view.add_widget(self.rows_layout)
+        self.add_widget(self.view)
+        self.reload()
+
+    def _matches(self, line):
+        return not self.query or self.query in line.lower()
+
+    def append(self, line, dropped=None):
+        """`line` was appended to `lines`; `dropped` is the line the deque evicted to make room, if any."""
+        data = self.view.data
+        if dropped is not None and data and data[0]['text'] is dropped:
+            del data[0]
+        if self._matches(line):
+            # Keep following new lines unless the player scrolled up to read older ones.
+            follow = self.view.scroll_y <= 0.01 or self.rows_layout.height <= self.view.height
+            data.append({'text': line})
+            if follow:
+                self.view.scroll_y = 0
+
+    def reload(self):
+        self.view.data = [{'text': line} for line in self.lines if self._matches(line)]
+        self.view.scroll_y = 0
+
+    def _on_query(self, instance, text):
+        self.query = text.strip().lower()
+        self.reload()